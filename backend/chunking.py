@@ -0,0 +1,112 @@
+"""
+Uzun videolar için map-reduce özetleme ön adımı.
+
+Transcript, zaman/token sınırlarında parçalara bölünür; her parça için
+Gemini'den zaman damgalı notlar eş zamanlı olarak (sınırlı paralellikle)
+alınır. Notlar sırayla birleştirilip asıl prompt'lara transcript yerine
+verilir. Notlardaki zaman damgaları parçadaki gerçek satırlarla doğrulanır;
+böylece son özetteki [mm:ss-mm:ss] referansları geçerli kalır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Awaitable, Callable
+
+from prompts import CHUNK_NOTES_PROMPT
+from transcript_store import Transcript
+
+_TIMESTAMP_LINE = re.compile(r"^\s*\[(\d{1,3}:\d{2}-\d{1,3}:\d{2})\]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Kaba token tahmini (ortalama ~4 karakter/token)."""
+    return len(text) // 4 + 1
+
+
+def split_transcript(
+    transcript: Transcript, max_tokens: int, max_seconds: float | None = None
+) -> list[list[str]]:
+    """
+    Transcript satırlarını token bütçesini ve (verildiyse) süre sınırını
+    aşmayacak parçalara böler. Satırlar asla ortadan bölünmez.
+    """
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    chunk_start_ms = 0
+
+    for (start_ms, _, _), line in zip(transcript.segments(), transcript.lines()):
+        line_tokens = estimate_tokens(line)
+        too_long = (
+            max_seconds is not None
+            and current
+            and (start_ms - chunk_start_ms) / 1000 >= max_seconds
+        )
+        if current and (current_tokens + line_tokens > max_tokens or too_long):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        if not current:
+            chunk_start_ms = start_ms
+        current.append(line)
+        current_tokens += line_tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def keep_valid_timestamps(notes: str, chunk_lines: list[str]) -> str:
+    """Parçada bulunmayan zaman damgasıyla başlayan satırları notlardan çıkarır."""
+    valid = {m.group(1) for line in chunk_lines if (m := _TIMESTAMP_LINE.match(line))}
+    kept = []
+    for line in notes.splitlines():
+        m = _TIMESTAMP_LINE.match(line)
+        if m and m.group(1) not in valid:
+            continue
+        kept.append(line.strip())
+    return "\n".join(line for line in kept if line)
+
+
+async def map_reduce_transcript(
+    transcript: Transcript,
+    generate: Callable[[str], Awaitable[str]],
+    max_tokens: int,
+    concurrency: int,
+    max_seconds: float | None = None,
+) -> tuple[str, int]:
+    """
+    Parçaları eş zamanlı özetler ve notları video sırasıyla birleştirir.
+    generate: prompt alıp model çıktısını döndüren async fonksiyon.
+    Returns: (birleştirilmiş notlar, parça sayısı)
+    """
+    chunks = split_transcript(transcript, max_tokens, max_seconds)
+    if not chunks:
+        return "", 0
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def summarize_chunk(index: int, lines: list[str]) -> str:
+        prompt = CHUNK_NOTES_PROMPT.format(
+            part=index + 1, total=len(chunks), transcript="\n".join(lines)
+        )
+        async with semaphore:
+            notes = await generate(prompt)
+        return keep_valid_timestamps(notes, lines)
+
+    # Bir parça hata verirse diğerleri iptal edilir (fanout.generate_sections
+    # ile aynı): kalan Gemini çağrıları boşuna kota harcamaz.
+    tasks = [
+        asyncio.create_task(summarize_chunk(i, lines)) for i, lines in enumerate(chunks)
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks:
+            if task in done and task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    results = [task.result() for task in tasks]
+    return "\n\n".join(r for r in results if r), len(chunks)
@@ -0,0 +1,60 @@
+"""
+Transcript'i tek seferde gönderen birleşik özet akışının ayrıştırıcısı.
+
+COMBINED_SUMMARY_PROMPT önce ana başlıkları, ardından ayırıcı satırı ve
+detaylı özeti üretir. Akış parçaları ayırıcının ortasından bölünebileceği
+için, ayırıcı görülene kadar sonundaki olası ayırıcı öneki bekletilir.
+"""
+
+from __future__ import annotations
+
+from prompts import SUMMARY_DELIMITER
+
+BULLETS = "bullets"
+DETAIL = "detail"
+
+
+class CombinedOutputSplitter:
+    """Akış parçalarını ("bullets" | "detail", metin) çiftlerine ayırır."""
+
+    def __init__(self, delimiter: str = SUMMARY_DELIMITER):
+        self.delimiter = delimiter
+        self.in_detail = False
+        self._pending = ""
+        self.has_detail = False
+
+    def feed(self, text: str) -> list[tuple[str, str]]:
+        if self.in_detail:
+            return self._detail(text)
+
+        buffer = self._pending + text
+        index = buffer.find(self.delimiter)
+        if index >= 0:
+            self.in_detail = True
+            self._pending = ""
+            parts = [(BULLETS, buffer[:index])] if index else []
+            return parts + self._detail(buffer[index + len(self.delimiter) :])
+
+        # Ayırıcının başı olabilecek son karakterler bir sonraki parçaya kalır
+        keep = self._partial_delimiter(buffer)
+        safe = buffer[: len(buffer) - keep]
+        self._pending = buffer[len(safe) :]
+        return [(BULLETS, safe)] if safe else []
+
+    def _partial_delimiter(self, buffer: str) -> int:
+        """buffer'ın, ayırıcının başıyla aynı olan en uzun sonekinin uzunluğu."""
+        for size in range(min(len(buffer), len(self.delimiter) - 1), 0, -1):
+            if buffer.endswith(self.delimiter[:size]):
+                return size
+        return 0
+
+    def _detail(self, text: str) -> list[tuple[str, str]]:
+        if not self.has_detail:
+            text = text.lstrip()
+            self.has_detail = bool(text)
+        return [(DETAIL, text)] if text else []
+
+    def flush(self) -> list[tuple[str, str]]:
+        """Akış bittiğinde bekletilen metni döndürür."""
+        pending, self._pending = self._pending, ""
+        return [(BULLETS, pending)] if pending else []
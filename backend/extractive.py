@@ -0,0 +1,108 @@
+"""
+Gemini'ye gitmeden önce yerel, çıkarımsal (extractive) ön özetleme.
+
+Transcript satırları TF-IDF ile vektörleştirilir; satırlar arası kosinüs
+benzerliği üzerinde TextRank çalıştırılarak en bilgilendirici satırlar
+seçilir. Seçim, videonun tamamını kapsaması için ardışık bloklar içinde
+yapılır ve satırlar zaman damgalarıyla, kronolojik sırada korunur. Böylece
+prompt'lar küçülürken [mm:ss-mm:ss] referansları geçerli kalır.
+
+Benzerlik matrisi blok başına kurulur; bellek ve süre transcript
+uzunluğuyla doğrusal artar.
+"""
+
+from __future__ import annotations
+
+import re
+
+import numpy as np
+
+from transcript_store import Transcript
+
+_TOKEN = re.compile(r"\w{3,}", re.UNICODE)
+_TIMESTAMP_PREFIX = re.compile(r"^\s*\[[^\]]*\]\s*")
+
+
+def _tokenize(line: str) -> list[str]:
+    return [t.casefold() for t in _TOKEN.findall(_TIMESTAMP_PREFIX.sub("", line))]
+
+
+def textrank(
+    vectors: np.ndarray, damping: float = 0.85, iterations: int = 30
+) -> np.ndarray:
+    """Satır vektörlerinin kosinüs benzerlik grafiği üzerinde TextRank puanları."""
+    n = vectors.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.maximum(norms, 1e-9)
+    similarity = unit @ unit.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    # Hiçbir satıra benzemeyen satırlar puanını eşit dağıtır
+    transition = np.where(row_sums > 0, similarity / np.maximum(row_sums, 1e-9), 1 / n)
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+    return scores.astype(np.float32)
+
+
+def select_lines(lines: list[str], ratio: float, block_lines: int = 300) -> list[int]:
+    """
+    Karakter bütçesinin yaklaşık ratio kadarını dolduracak en önemli satırların
+    indekslerini kronolojik sırada döndürür.
+    """
+    if ratio >= 1 or len(lines) <= 1:
+        return list(range(len(lines)))
+
+    tokenized = [_tokenize(line) for line in lines]
+    vocabulary: dict[str, int] = {}
+    for tokens in tokenized:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+    if not vocabulary:
+        return list(range(len(lines)))
+
+    # IDF tüm transcript üzerinden hesaplanır
+    document_freq = np.zeros(len(vocabulary), dtype=np.float32)
+    for tokens in tokenized:
+        for token_id in {vocabulary[t] for t in tokens}:
+            document_freq[token_id] += 1
+    idf = np.log((1 + len(lines)) / (1 + document_freq)) + 1
+
+    selected: list[int] = []
+    for block_start in range(0, len(lines), block_lines):
+        block = range(block_start, min(block_start + block_lines, len(lines)))
+        ids = sorted({vocabulary[t] for i in block for t in tokenized[i]})
+        local = {token_id: j for j, token_id in enumerate(ids)}
+        vectors = np.zeros((len(block), len(ids)), dtype=np.float32)
+        for row, i in enumerate(block):
+            for token in tokenized[i]:
+                vectors[row, local[vocabulary[token]]] += 1
+        vectors *= idf[ids] if ids else 1
+
+        scores = textrank(vectors)
+        budget = ratio * sum(len(lines[i]) for i in block)
+        used = 0
+        for row in np.argsort(-scores, kind="stable"):
+            length = len(lines[block.start + row])
+            if used and used + length > budget:
+                continue
+            selected.append(block.start + int(row))
+            used += length
+    return sorted(selected)
+
+
+def extract_transcript(
+    transcript: Transcript, ratio: float, block_lines: int = 300
+) -> Transcript:
+    """Yalnızca seçilen satırları içeren yeni bir transcript döndürür."""
+    keep = set(select_lines(list(transcript.lines()), ratio, block_lines))
+    return Transcript.from_segments(
+        (segment for i, segment in enumerate(transcript.segments()) if i in keep),
+        meta=transcript.meta,
+    )
@@ -0,0 +1,124 @@
+"""
+Detaylı özetin madde başına paralel üretimi.
+
+İlk çağrıdan dönen ana başlıklar ayrıştırılır; her "Madde #n" bölümü,
+transcript'in yalnızca o maddeyle ilgili pencereleriyle ayrı bir Gemini
+çağrısında eş zamanlı üretilir. Bölümler tamamlandıkça sırasıyla birleştirilip
+on_progress ile bildirilir; toplam süre en yavaş bölümün süresine iner.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Awaitable, Callable
+
+from prompts import DETAILED_SECTION_PROMPT
+
+_WORD = re.compile(r"\w{4,}", re.UNICODE)
+
+
+def parse_bullets(bullet_text: str) -> list[str]:
+    """Model çıktısındaki "• " (veya "- ", "* ") ile başlayan maddeleri döndürür."""
+    if "•" in bullet_text:
+        parts = bullet_text.split("•")[1:]
+    else:
+        parts = re.split(r"(?m)^\s*[-*]\s+", bullet_text)[1:]
+    bullets = [" ".join(part.split()) for part in parts]
+    return [b for b in bullets if len(b) > 2]
+
+
+def _words(text: str) -> set[str]:
+    return {w.casefold() for w in _WORD.findall(text)}
+
+
+def select_windows(
+    lines: list[str],
+    bullet: str,
+    index: int,
+    total: int,
+    window_lines: int = 20,
+    max_windows: int = 3,
+) -> str:
+    """
+    Madde için en alakalı transcript pencerelerini seçer. Puan, kelime
+    örtüşmesi ile maddenin video içindeki beklenen konumuna yakınlığın
+    toplamıdır (maddeler video sırasıyla yazılır). Pencereler kronolojik
+    sırayla birleştirilir.
+    """
+    if not lines:
+        return ""
+    windows = [
+        (start, lines[start : start + window_lines])
+        for start in range(0, len(lines), window_lines)
+    ]
+    if len(windows) <= max_windows:
+        return "\n".join(lines)
+
+    bullet_words = _words(bullet)
+    expected = (index + 0.5) / max(total, 1)
+    scored = []
+    for position, (start, window) in enumerate(windows):
+        overlap = len(bullet_words & _words(" ".join(window)))
+        lexical = overlap / max(len(bullet_words), 1)
+        distance = abs((position + 0.5) / len(windows) - expected)
+        scored.append((lexical + (1 - distance), start, window))
+
+    best = sorted(scored, key=lambda item: item[0], reverse=True)[:max_windows]
+    best.sort(key=lambda item: item[1])
+    return "\n...\n".join("\n".join(window) for _, _, window in best)
+
+
+async def generate_sections(
+    bullet_points: str,
+    transcript_text: str,
+    generate: Callable[[str], Awaitable[str]],
+    on_progress: Callable[[list[str | None]], Awaitable[None]] | None = None,
+    window_lines: int = 20,
+    max_windows: int = 3,
+) -> str:
+    """
+    Her madde için bölümü eş zamanlı üretir ve sırasıyla birleştirir.
+    on_progress, her bölüm tamamlandığında güncel bölüm listesiyle çağrılır.
+    Maddeler ayrıştırılamazsa ValueError; çağıran önce parse_bullets ile
+    kontrol edip tek çağrılı üretime dönebilir.
+    """
+    bullets = parse_bullets(bullet_points)
+    if not bullets:
+        raise ValueError("Ana başlıklar ayrıştırılamadı")
+
+    lines = transcript_text.splitlines()
+    sections: list[str | None] = [None] * len(bullets)
+
+    async def build(index: int, bullet: str) -> None:
+        prompt = DETAILED_SECTION_PROMPT.format(
+            number=index + 1,
+            bullet_point=bullet,
+            bullet_points=bullet_points,
+            transcript=select_windows(
+                lines, bullet, index, len(bullets), window_lines, max_windows
+            ),
+        )
+        sections[index] = (await generate(prompt)).strip()
+        if on_progress is not None:
+            await on_progress(sections)
+
+    # Bir bölüm hata verirse diğerleri iptal edilir; aksi halde iş hata
+    # olarak işaretlendikten sonra da Gemini çağrıları ve ilerleme yazımları
+    # sürer. İptal edilenlerin bitmesi beklenir, sonra ilk hata yükseltilir.
+    tasks = [asyncio.create_task(build(i, b)) for i, b in enumerate(bullets)]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks:
+            if task in done and task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return join_sections(sections)
+
+
+def join_sections(sections: list[str | None]) -> str:
+    """Tamamlanmış bölümleri madde sırasıyla birleştirir."""
+    return "\n\n".join(s for s in sections if s)
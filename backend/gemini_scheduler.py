@@ -0,0 +1,279 @@
+"""
+Gemini çağrıları için kota farkındalıklı merkezi zamanlayıcı.
+
+- Dakikalık istek (RPM) ve token (TPM) limitleri için iki token bucket,
+- Etkileşimli işleri (ana başlıklar) arka plan işlerinin (detaylı özet)
+  önüne alan öncelik kuyruğu,
+- 429 alındığında tüm kuyruğu birlikte bekleten, varsa sunucunun
+  "retry after" ipucuna uyan, jitter'lı geri çekilme,
+- Kuyruk çok uzunsa yeni etkileşimli işleri reddeden kabul kontrolü.
+
+Gemini istemcisinden bağımsızdır; run() herhangi bir async çağrıyı alır,
+bu yüzden sahte bir istemciyle test edilebilir. Saat (clock) de verilebilir;
+testler event loop'un sanal saatini kullanır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+_RETRY_HINT_PATTERNS = (
+    re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE),
+    re.compile(r"retry[- ]after[:\s]+([\d.]+)", re.IGNORECASE),
+)
+
+
+_RATE_LIMIT_TEXT = re.compile(
+    r"\b429\b|\brate[ _-]?limit|\bresource[ _]exhausted\b", re.IGNORECASE
+)
+
+
+class QueueFullError(Exception):
+    """Kuyruk kabul sınırını aştı; istemci retry_after saniye sonra denemeli."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Gemini kuyruğu dolu, {retry_after:.0f}s sonra deneyin")
+        self.retry_after = retry_after
+
+
+class RetriesExhaustedError(Exception):
+    """Rate limit nedeniyle tüm denemeler başarısız oldu."""
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """
+    429 / RESOURCE_EXHAUSTED hatalarını tanır. Önce tür ve durum koduna
+    bakılır; metin yalnızca durum kodu taşımayan sarmalanmış hatalar için
+    ve tam ifadelerle ("429", "rate limit", "resource exhausted") aranır.
+    """
+    if type(e).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    for attr in ("code", "status_code"):
+        if getattr(e, attr, None) == 429:
+            return True
+    return _RATE_LIMIT_TEXT.search(str(e)) is not None
+
+
+def retry_after_hint(e: Exception) -> float | None:
+    """Hatadan sunucunun önerdiği bekleme süresini (saniye) çıkarır."""
+    value = getattr(e, "retry_after", None)
+    if isinstance(value, (int, float)):
+        return float(value)
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers and headers.get("Retry-After"):
+        try:
+            return float(headers["Retry-After"])
+        except ValueError:
+            pass
+    text = str(e)
+    for pattern in _RETRY_HINT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """Dakikalık kapasiteyle sürekli dolan basit token bucket."""
+
+    def __init__(self, per_minute: float, now: float | None = None):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount kadar token için beklenmesi gereken süre (saniye)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class GeminiScheduler:
+    def __init__(
+        self,
+        requests_per_minute: float = 15,
+        tokens_per_minute: float = 1_000_000,
+        max_queue: int = 20,
+        max_retries: int = 3,
+        backoff_base: float = 5.0,
+        backoff_max: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self._rpm = TokenBucket(requests_per_minute, clock())
+        self._tpm = TokenBucket(tokens_per_minute, clock())
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._heap: list[tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._counters = {
+            "dispatched": 0,
+            "rate_limited": 0,
+            "rejected": 0,
+            "retries_exhausted": 0,
+        }
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _queued(self, priority: int | None = None) -> int:
+        return sum(
+            1
+            for p, _, _, fut in self._heap
+            if not fut.done() and (priority is None or p == priority)
+        )
+
+    async def acquire(
+        self,
+        tokens: float,
+        priority: int = PRIORITY_INTERACTIVE,
+        seq: int | None = None,
+    ) -> int:
+        """
+        Kota uygun olduğunda sıra gelene kadar bekler. Etkileşimli işler
+        kuyruk max_queue'ya ulaştıysa QueueFullError ile reddedilir.
+        Returns: kuyruk sıra numarası (retry'da aynı sırayı korumak için).
+        """
+        self._ensure_dispatcher()
+        if seq is None and priority == PRIORITY_INTERACTIVE:
+            self.check_admission()
+
+        seq = next(self._seq) if seq is None else seq
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, seq, tokens, fut))
+        self._wakeup.set()
+        await fut
+        return seq
+
+    def check_admission(self) -> None:
+        """Etkileşimli kuyruk doluysa QueueFullError yükseltir."""
+        if self._queued(PRIORITY_INTERACTIVE) >= self.max_queue:
+            self._counters["rejected"] += 1
+            raise QueueFullError(self.estimated_wait())
+
+    def estimated_wait(self) -> float:
+        """Kuyruğun boşalması için tahmini süre (saniye)."""
+        pause = max(self._paused_until - self._clock(), 0.0)
+        return pause + (self._queued() + 1) / self._rpm.rate
+
+    def on_rate_limited(self, e: Exception, attempt: int) -> float:
+        """
+        429 sonrası bekleme süresini hesaplar ve tüm kuyruğu o süre durdurur;
+        böylece bekleyen istekler aynı anda tekrar denemez.
+        """
+        self._counters["rate_limited"] += 1
+        hint = retry_after_hint(e)
+        if hint is not None:
+            delay = hint + random.uniform(0, 1)
+        else:
+            ceiling = min(self.backoff_max, self.backoff_base * (2**attempt))
+            delay = random.uniform(ceiling / 2, ceiling)
+        self._paused_until = max(self._paused_until, self._clock() + delay)
+        # Kota aşıldığına göre bucket'ı da boşalt
+        self._rpm.tokens = 0.0
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return delay
+
+    def on_retries_exhausted(self) -> None:
+        """Tüm denemeleri 429 ile biten çağrıyı sayar."""
+        self._counters["retries_exhausted"] += 1
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        tokens: float,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Any:
+        """call'ı kota/öncelik kurallarına göre çalıştırır, 429'da yeniden dener."""
+        seq = None
+        for attempt in range(self.max_retries):
+            seq = await self.acquire(tokens, priority, seq)
+            try:
+                return await call()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                delay = self.on_rate_limited(e, attempt)
+                logger.warning(
+                    "Rate limit aşıldı. Kuyruk %.1fs bekletiliyor... (%d/%d)",
+                    delay,
+                    attempt + 1,
+                    self.max_retries,
+                )
+        self.on_retries_exhausted()
+        raise RetriesExhaustedError("Gemini rate limit denemeleri tükendi")
+
+    async def _dispatch(self) -> None:
+        while True:
+            while self._heap and self._heap[0][3].done():
+                heapq.heappop(self._heap)  # İptal edilmiş bekleyenler
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, _, tokens, fut = self._heap[0]
+            now = self._clock()
+            wait = max(
+                self._paused_until - now,
+                self._rpm.wait_time(1, now),
+                self._tpm.wait_time(tokens, now),
+            )
+            if wait > 0:
+                # Daha öncelikli bir iş gelirse erken uyanılır
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            self._rpm.take(1)
+            self._tpm.take(tokens)
+            self._counters["dispatched"] += 1
+            fut.set_result(None)
+
+    def stats(self) -> dict:
+        now = self._clock()
+        return {
+            **self._counters,
+            "queued_interactive": self._queued(PRIORITY_INTERACTIVE),
+            "queued_background": self._queued(PRIORITY_BACKGROUND),
+            "paused_for": round(max(self._paused_until - now, 0.0), 1),
+            "request_tokens": round(self._rpm.tokens, 2),
+            "token_budget": round(self._tpm.tokens),
+        }
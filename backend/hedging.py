@@ -0,0 +1,160 @@
+"""
+Transcript yöntemleri için hedge'lenmiş yarış ve yöntem başına devre kesici.
+
+Yöntemler sırayla başlatılır: ilki hedge_delay içinde bitmezse (veya hata
+verirse) bir sonraki de başlatılır; ilk başarılı sonuç kazanır, diğerleri
+iptal edilir. Art arda başarısız olan bir yöntemin devresi açılır ve
+reset_timeout boyunca atlanır; süre dolunca tek bir deneme ile yoklanır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class AllMethodsFailedError(Exception):
+    """Tüm yöntemler başarısız oldu; errors yöntem başına hata mesajlarıdır."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__(" | ".join(errors))
+        self.errors = errors
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 60.0,
+        latency_window: int = 100,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._counters = {"successes": 0, "failures": 0, "skipped": 0, "cancelled": 0}
+
+    def allow(self) -> bool:
+        """Yöntem şu anda denenebilir mi? Yarı açık durumda tek yoklamaya izin verir."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self._counters["skipped"] += 1
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                self._counters["skipped"] += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self, latency: float) -> None:
+        self._counters["successes"] += 1
+        self._latencies.append(latency)
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = CLOSED
+
+    def record_failure(self, latency: float) -> None:
+        self._counters["failures"] += 1
+        self._latencies.append(latency)
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if (
+            self.state == HALF_OPEN
+            or self._consecutive_failures >= self.failure_threshold
+        ):
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        """Yarışı kaybeden deneme; başarı oranına sayılmaz."""
+        self._counters["cancelled"] += 1
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        finished = self._counters["successes"] + self._counters["failures"]
+        latencies = sorted(self._latencies)
+        return {
+            "state": self.state,
+            **self._counters,
+            "success_rate": (
+                round(self._counters["successes"] / finished, 4) if finished else None
+            ),
+            "latency_avg": (
+                round(sum(latencies) / len(latencies), 3) if latencies else None
+            ),
+            "latency_p95": (
+                round(latencies[int(0.95 * (len(latencies) - 1))], 3)
+                if latencies
+                else None
+            ),
+        }
+
+
+async def hedged_race(
+    methods: list[tuple[str, Callable[[], Awaitable[Any]]]],
+    breakers: dict[str, CircuitBreaker],
+    hedge_delay: float,
+) -> tuple[Any, str]:
+    """
+    Yöntemleri hedge'leyerek yarıştırır.
+    Returns: (sonuç, kazanan_yöntem_adı)
+    Raises: AllMethodsFailedError
+    """
+    errors: list[str] = []
+    pending_methods = list(methods)
+    running: dict[asyncio.Task, tuple[str, float]] = {}
+    ignore_breakers = False
+
+    def start_next() -> None:
+        # Devre yalnızca yöntem gerçekten başlatılırken sorulur: yarı açık
+        # devrenin yoklama hakkı, hiç başlatılmayacak bir yönteme harcanmaz
+        while pending_methods:
+            name, call = pending_methods.pop(0)
+            if ignore_breakers or breakers[name].allow():
+                running[asyncio.ensure_future(call())] = (name, time.monotonic())
+                return
+            errors.append(f"{name}: devre açık, atlandı")
+
+    start_next()
+    if not running:
+        # Tüm devreler açıksa hiç denememek yerine hepsini dene
+        pending_methods, errors, ignore_breakers = list(methods), [], True
+        start_next()
+    try:
+        while running:
+            timeout = hedge_delay if pending_methods else None
+            done, _ = await asyncio.wait(
+                running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                # Hedge süresi doldu: sıradaki yöntemi de başlat
+                start_next()
+                continue
+            for task in done:
+                name, started = running.pop(task)
+                latency = time.monotonic() - started
+                error = task.exception()
+                if error is None:
+                    breakers[name].record_success(latency)
+                    return task.result(), name
+                breakers[name].record_failure(latency)
+                errors.append(f"{name}: {str(error)[:300]}")
+            if not running and pending_methods:
+                start_next()
+    finally:
+        for task, (name, _) in running.items():
+            task.cancel()
+            breakers[name].record_cancelled()
+
+    raise AllMethodsFailedError(errors)
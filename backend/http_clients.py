@@ -0,0 +1,148 @@
+"""
+Süreç genelinde paylaşılan HTTP istemcileri.
+
+- Altyazı indirme vb. için keep-alive bağlantı havuzlu tek bir requests.Session,
+- cookies.txt yalnızca dosya değiştiğinde yeniden okunan tek bir cookie jar ve
+  onu kullanan youtube_transcript_api istemcisi,
+- thread başına bir kez kurulan YouTube Data API istemcisi (httplib2 tabanlı
+  istemci thread-safe olmadığından thread'ler arasında paylaşılmaz).
+
+Import edildiğinde yan etkisi yoktur; istemciler ilk kullanımda oluşturulur.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from http.cookiejar import MozillaCookieJar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_SIZE = 16
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_counters = {
+    "sessions_created": 0,
+    "cookie_reloads": 0,
+    "transcript_api_builds": 0,
+    "youtube_clients_built": 0,
+}
+
+
+def _new_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    _counters["sessions_created"] += 1
+    return session
+
+
+def get_session() -> requests.Session:
+    """Bağlantıları yeniden kullanan paylaşılan oturum."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _new_session()
+    return _session
+
+
+class CookieJarCache:
+    """cookies.txt'yi bir kez ayrıştırır; dosya değişince (mtime/boyut) yeniden okur."""
+
+    def __init__(self):
+        self._jar: MozillaCookieJar | None = None
+        self._signature: tuple | None = None
+        self._lock = threading.Lock()
+
+    def get(self, path: str | None) -> MozillaCookieJar | None:
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._signature:
+                jar = MozillaCookieJar(path)
+                try:
+                    jar.load(ignore_discard=True, ignore_expires=True)
+                except Exception as e:
+                    logger.error("Cookie yükleme hatası: %s", e)
+                    return self._jar
+                self._jar, self._signature = jar, signature
+                _counters["cookie_reloads"] += 1
+                logger.info("cookies.txt yüklendi (%d cookie)", len(jar))
+            return self._jar
+
+
+cookie_jars = CookieJarCache()
+
+_transcript_api = None
+_transcript_api_key: tuple | None = None
+
+
+def get_transcript_api(cookie_path: str | None, proxy: str | None):
+    """
+    Cookie ve proxy ayarlarıyla kurulmuş youtube_transcript_api istemcisi.
+    Ayarlar veya cookie dosyası değişmedikçe aynı istemci (ve bağlantı
+    havuzu) kullanılır.
+    """
+    global _transcript_api, _transcript_api_key
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    jar = cookie_jars.get(cookie_path)
+    key = (id(jar), proxy)
+    with _lock:
+        if _transcript_api is not None and key == _transcript_api_key:
+            return _transcript_api
+
+        api_kwargs = {}
+        if jar is not None or proxy:
+            # Proxy ayarı oturumu değiştirdiği için paylaşılan oturumdan ayrıdır
+            session = _new_session()
+            if jar is not None:
+                session.cookies = jar
+            api_kwargs["http_client"] = session
+        if proxy:
+            from youtube_transcript_api.proxies import GenericProxyConfig
+
+            api_kwargs["proxy_config"] = GenericProxyConfig(
+                http_url=proxy,
+                https_url=proxy,
+            )
+
+        _transcript_api = YouTubeTranscriptApi(**api_kwargs)
+        _transcript_api_key = key
+        _counters["transcript_api_builds"] += 1
+        return _transcript_api
+
+
+_youtube_local = threading.local()
+
+
+def get_youtube_client(api_key: str | None):
+    """Thread başına bir kez kurulan YouTube Data API v3 istemcisi."""
+    client = getattr(_youtube_local, "client", None)
+    if client is not None and _youtube_local.api_key == api_key:
+        return client
+
+    from googleapiclient.discovery import build
+
+    client = build("youtube", "v3", developerKey=api_key, cache_discovery=False)
+    _youtube_local.client = client
+    _youtube_local.api_key = api_key
+    with _lock:
+        _counters["youtube_clients_built"] += 1
+    return client
+
+
+def stats() -> dict:
+    return dict(_counters)
@@ -0,0 +1,492 @@
+"""
+Süreç yeniden başlatmalarına dayanıklı, SQLite tabanlı iş kuyruğu.
+
+- En az bir kez çalıştırma: alınan iş bir kira (visibility timeout) süresince
+  o worker'a ayrılır; worker kirayı düzenli olarak uzatır. Worker çökerse
+  kira dolar ve iş başka bir worker tarafından yeniden alınır.
+- İdempotent anahtarlar: aynı anahtarla bekleyen, çalışan veya yakın zamanda
+  biten bir iş varsa yeni iş oluşturulmaz, mevcut işin kimliği döner.
+- max_attempts denemeden sonra iş "failed" olarak işaretlenir.
+- Kuyruk dışında (ör. API sürecinde) başlamış bir iş JobLease ile kuyruğa
+  kiralanmış olarak kaydedilir; süreç çökerse iş kuyruktan devam eder.
+- Kapanışta worker yeni iş almayı bırakır, çalışan işlerin bitmesini
+  drain_timeout kadar bekler; bitmeyenler deneme sayılmadan kuyruğa geri konur.
+
+WAL modunda SQLite kullanıldığından API süreçleri ve ayrı worker süreçleri
+aynı makinede aynı dosyayı paylaşabilir.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    payload: dict
+    attempts: int
+
+
+class JobQueue:
+    def __init__(
+        self,
+        db_path: Path,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 3,
+        retention_seconds: float = 6 * 3600,
+    ):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        self._last_cleanup = 0.0
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " key TEXT,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker TEXT,"
+            " lease_until REAL,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_key ON jobs (key)")
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)"
+        )
+
+    def _db(self) -> sqlite3.Connection:
+        # Bağlantılar thread başına açılır; işlemler BEGIN IMMEDIATE ile yönetilir
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            self._local.db = db
+        return db
+
+    def _transaction(self, func):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(db)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return result
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict,
+        key: str | None = None,
+        job_id: str | None = None,
+        claim_by: str | None = None,
+    ) -> tuple[str, bool]:
+        """
+        İşi kuyruğa ekler. claim_by verilirse iş, o worker'a kiralanmış
+        (çalışıyor) olarak eklenir; bkz. JobLease.
+        Returns: (job_id, yeni_mi). Aynı anahtarla başarısız olmamış bir iş
+        varsa onun kimliği ve False döner.
+        """
+        now = time.time()
+
+        def insert(db: sqlite3.Connection) -> tuple[str, bool]:
+            if key is not None:
+                row = db.execute(
+                    "SELECT job_id, status FROM jobs WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] != FAILED:
+                    return row[0], False
+                if row is not None:
+                    db.execute("DELETE FROM jobs WHERE job_id = ?", (row[0],))
+            new_id = job_id or str(uuid.uuid4())
+            db.execute(
+                "INSERT INTO jobs (job_id, key, kind, payload, status, attempts,"
+                " worker, lease_until, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    new_id,
+                    key,
+                    kind,
+                    json.dumps(payload, ensure_ascii=False),
+                    QUEUED if claim_by is None else RUNNING,
+                    0 if claim_by is None else 1,
+                    claim_by,
+                    None if claim_by is None else now + self.visibility_timeout,
+                    now,
+                    now,
+                ),
+            )
+            return new_id, True
+
+        return self._transaction(insert)
+
+    def claim(self, worker_id: str) -> Job | None:
+        """Sıradaki işi (veya kirası dolmuş bir işi) bu worker'a kiralar."""
+        now = time.time()
+
+        def take(db: sqlite3.Connection) -> Job | None:
+            row = db.execute(
+                "SELECT job_id, kind, payload, attempts FROM jobs"
+                " WHERE (status = ? OR (status = ? AND lease_until < ?))"
+                " AND attempts < ?"
+                " ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, kind, payload, attempts = row
+            db.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_until = ?,"
+                " attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                (RUNNING, worker_id, now + self.visibility_timeout, now, job_id),
+            )
+            return Job(job_id, kind, json.loads(payload), attempts + 1)
+
+        return self._transaction(take)
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Kirayı uzatır; iş artık bu worker'da değilse False döner."""
+        cursor = self._db().execute(
+            "UPDATE jobs SET lease_until = ? WHERE job_id = ? AND worker = ?"
+            " AND status = ?",
+            (time.time() + self.visibility_timeout, job_id, worker_id, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str) -> None:
+        now = time.time()
+        db = self._db()
+        db.execute(
+            "UPDATE jobs SET status = ?, lease_until = NULL, payload = '{}',"
+            " updated_at = ? WHERE job_id = ? AND worker = ?",
+            (DONE, now, job_id, worker_id),
+        )
+        if now - self._last_cleanup >= 60:
+            self._last_cleanup = now
+            db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at <= ?",
+                (DONE, FAILED, now - self.retention_seconds),
+            )
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """
+        Başarısız denemeyi kaydeder. Deneme hakkı kaldıysa iş kuyruğa geri
+        konur. Returns: iş kalıcı olarak başarısız olduysa True.
+        """
+
+        def update(db: sqlite3.Connection) -> bool:
+            row = db.execute(
+                "SELECT attempts FROM jobs WHERE job_id = ? AND worker = ?",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return False
+            final = row[0] >= self.max_attempts
+            db.execute(
+                "UPDATE jobs SET status = ?, lease_until = NULL, error = ?,"
+                " updated_at = ? WHERE job_id = ?",
+                (FAILED if final else QUEUED, error[:1000], time.time(), job_id),
+            )
+            return final
+
+        return self._transaction(update)
+
+    def release(self, job_id: str, worker_id: str) -> None:
+        """Kapanışta bitmeyen işi deneme saymadan kuyruğa geri koyar."""
+        self._db().execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL,"
+            " attempts = MAX(attempts - 1, 0), updated_at = ?"
+            " WHERE job_id = ? AND worker = ? AND status = ?",
+            (QUEUED, time.time(), job_id, worker_id, RUNNING),
+        )
+
+    def reap_expired(self) -> list[Job]:
+        """
+        Deneme hakkı bittiği halde kirası dolmuş (worker'ı çökmüş) işleri
+        "failed" olarak işaretler ve döndürür.
+        """
+        now = time.time()
+
+        def reap(db: sqlite3.Connection) -> list[Job]:
+            rows = db.execute(
+                "SELECT job_id, kind, payload, attempts FROM jobs"
+                " WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (RUNNING, now, self.max_attempts),
+            ).fetchall()
+            for row in rows:
+                db.execute(
+                    "UPDATE jobs SET status = ?, lease_until = NULL, error = ?,"
+                    " updated_at = ? WHERE job_id = ?",
+                    (FAILED, "kira süresi doldu", now, row[0]),
+                )
+            return [Job(r[0], r[1], json.loads(r[2]), r[3]) for r in rows]
+
+        return self._transaction(reap)
+
+    def status(self, job_id: str) -> tuple[str, str | None] | None:
+        """İşin (durum, son hata) bilgisi; iş yoksa None."""
+        row = (
+            self._db()
+            .execute("SELECT status, error FROM jobs WHERE job_id = ?", (job_id,))
+            .fetchone()
+        )
+        return (row[0], row[1]) if row else None
+
+    def stats(self) -> dict:
+        db = self._db()
+        by_status = dict(
+            db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        )
+        (oldest,) = db.execute(
+            "SELECT MIN(created_at) FROM jobs WHERE status = ?", (QUEUED,)
+        ).fetchone()
+        return {
+            "path": str(self.db_path),
+            "by_status": by_status,
+            "oldest_queued_age": round(time.time() - oldest, 1) if oldest else None,
+            "visibility_timeout": self.visibility_timeout,
+            "max_attempts": self.max_attempts,
+        }
+
+
+Handler = Callable[[Job], Awaitable[None]]
+
+
+class JobLease:
+    """
+    Kuyruk worker'ı dışında zaten çalışmakta olan bir işi (ör. API sürecinde
+    süren birleşik özet akışı) kuyruğa bu sürece kiralanmış olarak kaydeder
+    ve kirayı uzatır. Süreç çökerse kira dolar ve iş bir JobWorker
+    tarafından payload'dan yeniden çalıştırılır; iptal/kapanışta release()
+    ile hemen kuyruğa geri konur, hata alırsa fail() ile yeniden denenir.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: str,
+        run_blocking: Callable[..., Awaitable] | None = None,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.run_blocking = run_blocking or asyncio.to_thread
+        self.job_id: str | None = None
+        self._heartbeat: asyncio.Task | None = None
+
+    async def acquire(self, kind: str, payload: dict, job_id: str) -> None:
+        """İşi bu sürece kiralanmış olarak ekler ve kirayı uzatmaya başlar."""
+        self.job_id, _ = await self.run_blocking(
+            self.queue.enqueue, kind, payload, None, job_id, self.worker_id
+        )
+        self._heartbeat = asyncio.create_task(self._renew())
+
+    async def _renew(self) -> None:
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            owned = await self.run_blocking(
+                self.queue.heartbeat, self.job_id, self.worker_id
+            )
+            if not owned:
+                logger.warning(
+                    "İşin kirası başka bir worker'a geçti",
+                    extra={"job_id": self.job_id},
+                )
+                return
+
+    def _stop(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+
+    async def complete(self) -> None:
+        self._stop()
+        await self.run_blocking(self.queue.complete, self.job_id, self.worker_id)
+
+    async def fail(self, error: str) -> bool:
+        """Returns: iş kalıcı olarak başarısız olduysa True (yeniden denenmez)."""
+        self._stop()
+        return await self.run_blocking(
+            self.queue.fail, self.job_id, self.worker_id, error
+        )
+
+    async def release(self) -> None:
+        """İşi deneme saymadan kuyruğa geri koyar; bir JobWorker devralır."""
+        self._stop()
+        await self.run_blocking(self.queue.release, self.job_id, self.worker_id)
+
+
+class JobWorker:
+    """
+    Kuyruktan iş alıp handlers[job.kind] ile çalıştıran asyncio worker'ı.
+    SQLite çağrıları run_blocking ile event loop dışında yapılır.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: dict[str, Handler],
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        drain_timeout: float = 30.0,
+        on_dead: Callable[[Job, str], Awaitable[None]] | None = None,
+        run_blocking: Callable[..., Awaitable] | None = None,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.drain_timeout = drain_timeout
+        self.on_dead = on_dead
+        self.run_blocking = run_blocking or asyncio.to_thread
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._running: dict[str, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._counters = {
+            "completed": 0,
+            "failed": 0,
+            "retried": 0,
+            "released": 0,
+            "lost_lease": 0,
+        }
+
+    def notify(self) -> None:
+        """Yeni iş eklendiğini bildirir; bekleme süresi dolmadan kuyruğa bakılır."""
+        self._wakeup.set()
+
+    def stop(self) -> None:
+        """Yeni iş almayı bırakır; run() çalışan işler bitince döner."""
+        self._stopping = True
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        logger.info(
+            "İş kuyruğu worker'ı başladı (%s, eşzamanlılık: %d)",
+            self.worker_id,
+            self.concurrency,
+        )
+        while not self._stopping:
+            for job in await self.run_blocking(self.queue.reap_expired):
+                await self._dead(job, "kira süresi doldu")
+            while len(self._running) < self.concurrency and not self._stopping:
+                job = await self.run_blocking(self.queue.claim, self.worker_id)
+                if job is None:
+                    break
+                task = asyncio.create_task(self._execute(job))
+                self._running[job.job_id] = task
+                task.add_done_callback(
+                    lambda _, job_id=job.job_id: self._running.pop(job_id, None)
+                )
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        await self._drain()
+
+    async def _drain(self) -> None:
+        if not self._running:
+            return
+        logger.info("İş kuyruğu boşaltılıyor: %d iş bekleniyor", len(self._running))
+        tasks = dict(self._running)
+        _, pending = await asyncio.wait(tasks.values(), timeout=self.drain_timeout)
+        for job_id, task in tasks.items():
+            if task in pending:
+                task.cancel()
+                await self.run_blocking(self.queue.release, job_id, self.worker_id)
+                self._counters["released"] += 1
+        if pending:
+            await asyncio.wait(pending)
+
+    async def _heartbeat(self, job: Job, task: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            owned = await self.run_blocking(
+                self.queue.heartbeat, job.job_id, self.worker_id
+            )
+            if not owned:
+                # Kira başka worker'a geçti; aynı işi iki kez sürdürme
+                self._counters["lost_lease"] += 1
+                task.cancel()
+                return
+
+    async def _execute(self, job: Job) -> None:
+        handler = self.handlers.get(job.kind)
+        work = asyncio.create_task(handler(job) if handler else self._unknown(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job, work))
+        try:
+            await work
+        except asyncio.CancelledError:
+            if self._stopping or work.cancelled():
+                return
+            raise
+        except Exception as e:
+            error = str(e)[:500]
+            final = await self.run_blocking(
+                self.queue.fail, job.job_id, self.worker_id, error
+            )
+            if final:
+                await self._dead(job, error)
+            else:
+                self._counters["retried"] += 1
+                logger.warning(
+                    "İş başarısız, yeniden denenecek: %s",
+                    error,
+                    extra={"job_id": job.job_id, "attempt": job.attempts},
+                )
+            return
+        finally:
+            heartbeat.cancel()
+            if not work.done():
+                work.cancel()
+        await self.run_blocking(self.queue.complete, job.job_id, self.worker_id)
+        self._counters["completed"] += 1
+
+    async def _unknown(self, job: Job) -> None:
+        raise ValueError(f"Bilinmeyen iş türü: {job.kind}")
+
+    async def _dead(self, job: Job, error: str) -> None:
+        self._counters["failed"] += 1
+        logger.error(
+            "İş kalıcı olarak başarısız: %s", error, extra={"job_id": job.job_id}
+        )
+        if self.on_dead is not None:
+            await self.on_dead(job, error)
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": len(self._running),
+            "stopping": self._stopping,
+            **self._counters,
+        }
@@ -0,0 +1,230 @@
+"""
+Kuyruk tabanlı, bloklamayan yapılandırılmış (JSON) loglama.
+
+- Log çağrısı yapan thread (ör. event loop) yalnızca kaydı hazırlayıp bir
+  kuyruğa koyar; biçimlendirme ve stdout'a yazma QueueListener thread'inde
+  yapılır.
+- log_context() ile bağlanan kimlikler (video_id, task_id, ...) ve
+  context_providers ile verilen değerler (ör. trace_id) kayda çağrı anında
+  eklenir; contextvars kullanıldığından asyncio task'larına da geçer.
+- RateLimitFilter aynı yerden gelen tekrarlı mesajları pencere başına
+  burst adetle sınırlar; bastırılan kayıt sayısı bir sonraki kayıtta
+  "suppressed" alanıyla raporlanır.
+
+    logger = logging.getLogger(__name__)
+    logger.info("Transcript alındı", extra={"method": "yt-dlp"})
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import AsyncIterator, Callable
+
+_context: ContextVar[dict] = ContextVar("log_context", default={})
+
+# LogRecord'un kendi alanları; bunların dışındaki öznitelikler extra'dır
+_RECORD_FIELDS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "context",
+}
+
+
+@contextmanager
+def log_context(**ids):
+    """Blok boyunca yazılan loglara ids alanlarını ekler."""
+    token = _context.set({**_context.get(), **ids})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+async def bind_async_iter(iterator: AsyncIterator, **ids) -> AsyncIterator:
+    """
+    Async generator'ı her adımda log_context(**ids) içinde ilerletir.
+    Generator'ın içinde contextvar değiştirmek, adımlar farklı context'lerde
+    çalışabildiği için güvenli değildir.
+    """
+    try:
+        while True:
+            with log_context(**ids):
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield item
+    finally:
+        with log_context(**ids):
+            await iterator.aclose()
+
+
+class ContextFilter(logging.Filter):
+    """Bağlı kimlikleri kayda çağrı anında (çağıran thread'de) ekler."""
+
+    def __init__(self, providers: dict[str, Callable[[], object]] | None = None):
+        super().__init__()
+        self.providers = providers or {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = dict(_context.get())
+        for name, provider in self.providers.items():
+            value = provider()
+            if value is not None:
+                context.setdefault(name, value)
+        record.context = context
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Aynı logger/satır/mesaj şablonundan gelen kayıtları interval saniyelik
+    pencere başına burst adetle sınırlar. WARNING üstü kayıtlar da
+    sınırlanır; bastırılanların sayısı kaybolmaz.
+    """
+
+    def __init__(self, interval: float = 60.0, burst: int = 5):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        # anahtar -> [pencere başlangıcı, penceredeki kayıt, bastırılan]
+        self._windows: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        self.suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0:
+            return True
+        key = (record.name, record.lineno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+                if len(self._windows) > 10_000:
+                    self._windows = {key: window}
+            else:
+                suppressed = 0
+            window[1] += 1
+            if window[1] > self.burst:
+                window[2] += 1
+                self.suppressed_total += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Geliştirme için okunabilir tek satırlık biçim."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {**getattr(record, "context", {})}
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                fields[key] = value
+        line = (
+            f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:<7} "
+            f"{record.name}: {record.getMessage()}"
+        )
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class _PreparedQueueHandler(QueueHandler):
+    """
+    Mesajı çağrı anında birleştirir (argümanlar sonradan değişebilir) ama
+    biçimlendirmeyi listener'a bırakır; istisna metni ayrı alanda kalır.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: QueueListener | None = None
+_queue_handler: _PreparedQueueHandler | None = None
+_rate_limit: RateLimitFilter | None = None
+
+
+def setup_logging(
+    level: str = "INFO",
+    fmt: str = "json",
+    rate_limit_interval: float = 60.0,
+    rate_limit_burst: int = 5,
+    context_providers: dict[str, Callable[[], object]] | None = None,
+    stream=None,
+) -> None:
+    """Kök logger'ı kuyruk + arka plan yazıcı ile kurar (tekrar çağrılabilir)."""
+    global _listener, _queue_handler, _rate_limit
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _rate_limit = RateLimitFilter(rate_limit_interval, rate_limit_burst)
+    _queue_handler = _PreparedQueueHandler(log_queue)
+    _queue_handler.addFilter(_rate_limit)
+    _queue_handler.addFilter(ContextFilter(context_providers))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Kuyruktaki kayıtları yazıp arka plan thread'ini durdurur."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def stats() -> dict:
+    return {
+        "running": _listener is not None,
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "suppressed": _rate_limit.suppressed_total if _rate_limit else 0,
+    }
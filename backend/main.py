@@ -1,29 +1,77 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
+import asyncio
+import json
+import threading
 import time
 import uuid
 import base64
+import socket
 import tempfile
-from collections import defaultdict
-import yt_dlp
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import google.generativeai as genai
-import requests as http_requests
 from pydantic import BaseModel
 import os
 from pathlib import Path
 from youtube_transcript_api import YouTubeTranscriptApi
 import re
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
-
-from prompts import BULLET_POINTS_PROMPT, DETAILED_SUMMARY_PROMPT
+import logging
+
+from chunking import estimate_tokens, map_reduce_transcript
+from combined import BULLETS, CombinedOutputSplitter
+from extractive import extract_transcript
+from fanout import generate_sections, join_sections, parse_bullets
+from gemini_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    GeminiScheduler,
+    QueueFullError,
+    RetriesExhaustedError,
+    is_rate_limit_error,
+)
+from hedging import AllMethodsFailedError, CircuitBreaker, hedged_race
+import http_clients
+from logging_setup import bind_async_iter, log_context, setup_logging
+import logging_setup
+from job_queue import FAILED, QUEUED, RUNNING, Job, JobLease, JobQueue, JobWorker
+import metrics
+import tracing
+from normalize import build_transcript
+from prompts import (
+    BULLET_POINTS_PROMPT,
+    COMBINED_SUMMARY_PROMPT,
+    DETAILED_SECTION_PROMPT,
+    DETAILED_SUMMARY_PROMPT,
+)
+from singleflight import SingleFlight
+from state_backend import create_state_backend
+from summary_cache import SummaryCache, content_hash
+from task_store import TaskStore
+from transcript_store import Transcript, TranscriptStore
+from video_details import VideoDetailsService
+from ytdlp_fetcher import YtdlpProcessPool, fetch_subtitles
 
 load_dotenv()
 
+# ---- Loglama ----
+# Loglar bir kuyruğa yazılır ve ayrı bir thread'de JSON satırları olarak
+# stdout'a aktarılır; event loop log G/Ç'si için beklemez. Kayıtlara bağlı
+# video_id/task_id ile aktif izin trace_id'si eklenir.
+LOG_CONFIG = {
+    "level": os.getenv("LOG_LEVEL", "INFO"),
+    "fmt": os.getenv("LOG_FORMAT", "json"),
+    "rate_limit_interval": float(os.getenv("LOG_RATE_LIMIT_INTERVAL", "60")),
+    "rate_limit_burst": int(os.getenv("LOG_RATE_LIMIT_BURST", "5")),
+}
+setup_logging(**LOG_CONFIG, context_providers={"trace_id": tracing.current_trace_id})
+logger = logging.getLogger(__name__)
+
 
 # ---- Cookie Desteği ----
 # Aranacak cookie yolları (öncelik sırasıyla):
@@ -71,13 +119,14 @@ def _sanitize_cookies(source: Path, dest: Path) -> None:
                 if len(parts) < 7 or not parts[6].strip():
                     empty_value_count += 1
         else:
-            print(f"Cookie: hatalı satır atlandı → {line!r}")
+            logger.warning("Cookie: hatalı satır atlandı → %r", line)
     dest.write_text("\n".join(good_lines) + "\n", encoding="utf-8")
-    print(f"Cookie: {len(good_lines)} geçerli satır → {dest}")
+    logger.info("Cookie: %d geçerli satır → %s", len(good_lines), dest)
     if empty_value_count > 0:
-        print(
-            f"⚠️  Cookie UYARI: {empty_value_count} cookie'nin value alanı boş! "
-            "Cookies'i tarayıcıdan tekrar export edin."
+        logger.warning(
+            "Cookie UYARI: %d cookie'nin value alanı boş! "
+            "Cookies'i tarayıcıdan tekrar export edin.",
+            empty_value_count,
         )
 
 
@@ -92,13 +141,13 @@ def _init_cookies() -> Path | None:
     # Mevcut dosyaları kontrol et
     for path in _COOKIE_PATHS:
         if path.exists():
-            print(f"cookies.txt bulundu: {path} ({path.stat().st_size} byte)")
+            logger.info("cookies.txt bulundu: %s (%d byte)", path, path.stat().st_size)
             try:
                 # Read-only olabilir, yazılabilir bir yere kopyala + temizle
                 _sanitize_cookies(path, writable_path)
                 return writable_path
             except Exception as e:
-                print(f"Cookie kopyalama/temizleme hatası: {e}")
+                logger.error("Cookie kopyalama/temizleme hatası: %s", e)
                 return path  # En azından orijinali dene
 
     # Hiçbiri yoksa base64 env'den oluştur
@@ -107,14 +156,14 @@ def _init_cookies() -> Path | None:
         try:
             cookie_bytes = base64.b64decode(cookie_b64)
             writable_path.write_bytes(cookie_bytes)
-            print(f"cookies.txt env'den oluşturuldu ({len(cookie_bytes)} byte)")
+            logger.info("cookies.txt env'den oluşturuldu (%d byte)", len(cookie_bytes))
             # Oluşturulan dosyayı da doğrula
             _sanitize_cookies(writable_path, writable_path)
             return writable_path
         except Exception as e:
-            print(f"Cookie decode hatası: {e}")
+            logger.error("Cookie decode hatası: %s", e)
 
-    print("UYARI: cookies.txt bulunamadı!")
+    logger.warning("cookies.txt bulunamadı!")
     return None
 
 
@@ -131,25 +180,47 @@ def _get_cookies_path() -> str | None:
 # ---- Rate Limiting ----
 RATE_LIMIT_WINDOW = 60  # saniye
 RATE_LIMIT_MAX = 5  # pencere başına maks istek (IP başına)
-_rate_limit_store: dict[str, list[float]] = defaultdict(list)
 
 
-def _check_rate_limit(client_ip: str):
-    """IP başına dakikada max RATE_LIMIT_MAX istek izni verir."""
-    now = time.time()
-    _rate_limit_store[client_ip] = [
-        t for t in _rate_limit_store[client_ip] if now - t < RATE_LIMIT_WINDOW
-    ]
-    if len(_rate_limit_store[client_ip]) >= RATE_LIMIT_MAX:
+async def _check_rate_limit(client_ip: str):
+    """
+    IP başına dakikada max RATE_LIMIT_MAX istek izni verir.
+    Sayaçlar state backend'de tutulur; böylece tüm worker'lar aynı limiti görür.
+    """
+    if not await run_state(
+        state.hit_rate_limit, f"ip:{client_ip}", RATE_LIMIT_WINDOW, RATE_LIMIT_MAX
+    ):
+        RATE_LIMIT_REJECTIONS.inc()
         raise HTTPException(
             status_code=429,
             detail=f"Çok fazla istek. Lütfen {RATE_LIMIT_WINDOW} saniye sonra tekrar deneyin.",
         )
-    _rate_limit_store[client_ip].append(now)
 
 
 app = FastAPI()
 
+# ---- İzleme ----
+# TRACE_PATHS ile başlayan istekler için aşama süreleri Server-Timing
+# başlığında döner ve span kayıtları JSON satırları olarak yazılır
+# (TRACE_LOG_PATH boşsa stdout'a). TRACE_PROFILE_THRESHOLD > 0 ise bu
+# süreyi aşan isteklerin örneklenen yığınları kök span'e eklenir.
+tracing.recorder.configure(os.getenv("TRACE_LOG_PATH"))
+TRACE_PROFILE_THRESHOLD = float(os.getenv("TRACE_PROFILE_THRESHOLD", "0"))
+app.add_middleware(
+    tracing.TracingMiddleware,
+    paths=tuple(
+        p.strip() for p in os.getenv("TRACE_PATHS", "/summarize").split(",") if p
+    ),
+    profiler=(
+        tracing.SlowRequestProfiler(
+            TRACE_PROFILE_THRESHOLD,
+            interval=float(os.getenv("TRACE_PROFILE_INTERVAL", "0.01")),
+        )
+        if TRACE_PROFILE_THRESHOLD > 0
+        else None
+    ),
+)
+
 # CORS ayarları (frontend ile backend arasında kullanılacak)
 app.add_middleware(
     CORSMiddleware,
@@ -168,32 +239,411 @@ if not GOOGLE_API_KEY:
 
 genai.configure(api_key=GOOGLE_API_KEY)
 
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-2.0-flash")
+
+# Detaylı özet modu: "single" tek çağrı, "fanout" madde başına paralel çağrı
+DETAILED_MODE = os.getenv("DETAILED_MODE", "single").lower()
+if DETAILED_MODE not in ("single", "fanout"):
+    raise ValueError(f"Bilinmeyen DETAILED_MODE: {DETAILED_MODE}")
+
+# Özet akışı: "combined" transcript'i tek çağrıda gönderip ana başlıkları ve
+# detaylı özeti birlikte üretir, "separate" iki ayrı çağrı yapar. Fan-out
+# madde başına çağrı yaptığından varsayılan olarak "separate" ile çalışır.
+SUMMARY_PIPELINE = os.getenv(
+    "SUMMARY_PIPELINE", "separate" if DETAILED_MODE == "fanout" else "combined"
+).lower()
+if SUMMARY_PIPELINE not in ("combined", "separate"):
+    raise ValueError(f"Bilinmeyen SUMMARY_PIPELINE: {SUMMARY_PIPELINE}")
+
+# Yerel çıkarımsal ön özetleme: bu eşiği aşan transcript'lerin yalnızca
+# en bilgilendirici satırları (yaklaşık EXTRACTIVE_RATIO oranında) gönderilir.
+EXTRACTIVE_RATIO = float(os.getenv("EXTRACTIVE_RATIO", "1"))
+EXTRACTIVE_MIN_TOKENS = int(os.getenv("EXTRACTIVE_MIN_TOKENS", "8000"))
+
+# Prompt metinleri veya özeti etkileyen ayarlar değiştiğinde eski özetler
+# önbellekten kullanılmasın diye hepsinin hash'i önbellek anahtarına dahil edilir.
+PROMPT_VERSION = content_hash(
+    COMBINED_SUMMARY_PROMPT if SUMMARY_PIPELINE == "combined" else "",
+    BULLET_POINTS_PROMPT,
+    DETAILED_SECTION_PROMPT if DETAILED_MODE == "fanout" else DETAILED_SUMMARY_PROMPT,
+    f"extractive={EXTRACTIVE_RATIO}/{EXTRACTIVE_MIN_TOKENS}",
+)[:16]
+
+
+# ---- Özet Önbelleği ----
+SUMMARY_CACHE_DIR = Path(
+    os.getenv(
+        "SUMMARY_CACHE_DIR",
+        str(Path(tempfile.gettempdir()) / "yt_summarizer_cache"),
+    )
+)
+summary_cache = SummaryCache(
+    SUMMARY_CACHE_DIR / "summaries.sqlite3",
+    max_memory_entries=int(os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", "256")),
+    max_disk_entries=int(os.getenv("SUMMARY_CACHE_DISK_ENTRIES", "5000")),
+    ttl_seconds=float(os.getenv("SUMMARY_CACHE_TTL", str(7 * 24 * 3600))),
+)
+
+# ---- Transcript Önbelleği ----
+# İlk indirmeden sonra transcript'ler sütunlu formatta diske yazılır;
+# tekrar eden isteklerde YouTube'a gidilmez. Dizin boyut ve kayıt sayısıyla
+# sınırlıdır (LRU), süresi dolanlar periyodik taramada silinir.
+transcript_store = TranscriptStore(
+    SUMMARY_CACHE_DIR / "transcripts",
+    ttl_seconds=float(os.getenv("TRANSCRIPT_CACHE_TTL", str(7 * 24 * 3600))),
+    max_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+    max_entries=int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "10000")),
+    sweep_interval=float(os.getenv("TRANSCRIPT_CACHE_SWEEP_INTERVAL", "600")),
+)
+
+# ---- Task Durumları ----
+# Sınırlı, TTL ile temizlenen depo; eski sonuçlar diske taşınabilir.
+# TASK_SPILL_DIR boş bırakılırsa diske taşıma kapatılır. TASK_PROCESSING_TTL
+# boyunca güncellenmeyen işlenen task'lar takılı kalmış sayılıp düşürülür.
+_task_spill_dir = os.getenv("TASK_SPILL_DIR", str(SUMMARY_CACHE_DIR / "tasks"))
+TASK_TTL = float(os.getenv("TASK_TTL", str(6 * 3600)))
+
+# Task durumları, sonuçlar ve rate-limit sayaçları state backend üzerinden
+# tutulur. Birden fazla worker/instance için STATE_BACKEND=sqlite veya redis.
+#   STATE_BACKEND=sqlite STATE_BACKEND_URL=/var/lib/ytsum/state.sqlite3
+#   STATE_BACKEND=redis  STATE_BACKEND_URL=redis://:parola@host:6379/0
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").strip().lower()
+state = create_state_backend(
+    STATE_BACKEND,
+    os.getenv("STATE_BACKEND_URL")
+    or (
+        str(SUMMARY_CACHE_DIR / "state.sqlite3") if STATE_BACKEND == "sqlite" else None
+    ),
+    task_store=TaskStore(
+        max_entries=int(os.getenv("TASK_STORE_MAX_ENTRIES", "1000")),
+        max_bytes=int(os.getenv("TASK_STORE_MAX_BYTES", str(64 * 1024 * 1024))),
+        ttl_seconds=TASK_TTL,
+        spill_dir=Path(_task_spill_dir) if _task_spill_dir else None,
+        processing_ttl_seconds=float(os.getenv("TASK_PROCESSING_TTL", str(TASK_TTL))),
+    ),
+    ttl_seconds=TASK_TTL,
+)
+
+
+# ---- Bloklayan İşler için Executor ----
+# youtube_transcript_api, yt-dlp, requests ve Gemini istemcisi senkron çalışır.
+# Event loop'u kilitlememeleri için sınırlı bir thread havuzunda çalıştırılırlar.
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "8"))
+_io_executor = ThreadPoolExecutor(
+    max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io"
+)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Senkron bir fonksiyonu thread havuzunda çalıştırır ve sonucunu bekler."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, partial(func, *args, **kwargs))
+
+
+# State backend çağrıları (Redis soket turu, SQLite kilidi) ayrı ve küçük bir
+# havuzda yapılır; uzun Gemini çağrıları _io_executor'ı doldurduğunda da task
+# durumu ve rate-limit kontrolleri sıra beklemez.
+_state_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("STATE_BACKEND_WORKERS", "4")),
+    thread_name_prefix="state",
+)
+
+
+async def run_state(func, *args):
+    """State backend çağrısını event loop dışında yapar."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_state_executor, partial(func, *args))
+
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/stats")
+async def get_stats():
+    """Önbellek ve iç bileşenlerin sayaçlarını döndürür."""
+    # Sayaçların bir kısmı SQLite/Redis sorgusu olduğundan loop dışında toplanır
+    return await run_state(_collect_stats)
+
+
+def _collect_stats() -> dict:
+    return {
+        "summary_cache": summary_cache.stats(),
+        "transcript_store": transcript_store.stats(),
+        "summarize_single_flight": summarize_flight.stats(),
+        "state": state.stats(),
+        "gemini_scheduler": gemini_scheduler.stats(),
+        "summary_pipeline": {"mode": SUMMARY_PIPELINE, **pipeline_stats},
+        "ytdlp_pool": ytdlp_pool.stats(),
+        "http_clients": http_clients.stats(),
+        "video_details": video_details.stats(),
+        "logging": logging_setup.stats(),
+        "job_queue": (
+            {
+                **job_queue.stats(),
+                "worker": job_worker.stats() if job_worker else None,
+            }
+            if job_queue
+            else None
+        ),
+        "transcript_methods": {
+            name: breaker.stats() for name, breaker in transcript_breakers.items()
+        },
+    }
+
+
+# ---- Metrikler ----
+# GET /metrics, Prometheus metin formatında döner. Bileşenlerin kendi
+# tuttuğu sayaçlar tekrar sayılmaz, okuma anında alınır.
+TRANSCRIPT_FETCH_SECONDS = metrics.registry.histogram(
+    "ytsum_transcript_fetch_seconds",
+    "Transcript alma süresi (yönteme ve sonuca göre)",
+    ("method", "outcome"),
+)
+GEMINI_CALL_SECONDS = metrics.registry.histogram(
+    "ytsum_gemini_call_seconds",
+    "Kuyrukta bekleme dahil Gemini çağrı süresi (aşamaya göre)",
+    ("stage",),
+)
+SUMMARIZE_SECONDS = metrics.registry.histogram(
+    "ytsum_summarize_seconds",
+    "Özet isteğinin uçtan uca süresi",
+    ("endpoint", "outcome"),
+)
+CACHE_LOOKUPS = metrics.registry.counter(
+    "ytsum_cache_lookups_total",
+    "Önbellek sorguları (önbelleğe ve sonuca göre)",
+    ("cache", "result"),
+)
+RATE_LIMIT_REJECTIONS = metrics.registry.counter(
+    "ytsum_rate_limit_rejections_total",
+    "IP başına istek sınırı nedeniyle reddedilen istekler",
+)
+GEMINI_EVENTS = metrics.registry.counter(
+    "ytsum_gemini_events_total",
+    "Gemini zamanlayıcısı olayları (429, yeniden deneme, tükenen deneme, kuyruk reddi)",
+    ("event",),
+)
+TASKS_IN_FLIGHT = metrics.registry.gauge(
+    "ytsum_tasks_in_flight",
+    "Devam eden işler (türe göre)",
+    ("kind",),
+)
+SUMMARY_STATUS_ENTRIES = metrics.registry.gauge(
+    "ytsum_summary_status_entries",
+    "Task durum deposundaki (summary_status) kayıt sayısı",
+)
+
+
+def _gemini_counter(name: str):
+    return lambda: gemini_scheduler.stats()[name]
+
+
+GEMINI_EVENTS.set_function(_gemini_counter("rate_limited"), event="rate_limited")
+GEMINI_EVENTS.set_function(
+    lambda: gemini_scheduler.stats()["rate_limited"]
+    - gemini_scheduler.stats()["retries_exhausted"],
+    event="retried",
+)
+GEMINI_EVENTS.set_function(
+    _gemini_counter("retries_exhausted"), event="retries_exhausted"
+)
+GEMINI_EVENTS.set_function(_gemini_counter("rejected"), event="queue_rejected")
+CACHE_LOOKUPS.set_function(
+    lambda: video_details.stats()["hits"], cache="video_details", result="hit"
+)
+CACHE_LOOKUPS.set_function(
+    lambda: video_details.stats()["misses"], cache="video_details", result="miss"
+)
+TASKS_IN_FLIGHT.set_function(lambda: len(_background_jobs), kind="background")
+TASKS_IN_FLIGHT.set_function(
+    lambda: summarize_flight.stats()["in_flight"], kind="summarize"
+)
+TASKS_IN_FLIGHT.set_function(
+    lambda: job_worker.stats()["running"] if job_worker else 0, kind="job_worker"
+)
+TASKS_IN_FLIGHT.set_function(lambda: ytdlp_pool.stats()["in_flight"], kind="ytdlp")
+SUMMARY_STATUS_ENTRIES.set_function(lambda: state.task_count())
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Metrikleri Prometheus metin formatında döndürür."""
+    # Gauge fonksiyonları state backend'i sorgulayabildiğinden loop dışında
+    content = await run_state(metrics.registry.render)
+    return Response(content=content, media_type=metrics.CONTENT_TYPE)
+
+
+# ---- Gemini Zamanlayıcısı ----
+# Tüm Gemini çağrıları RPM/TPM bütçesine ve önceliğe göre tek kuyruktan geçer.
+gemini_scheduler = GeminiScheduler(
+    requests_per_minute=float(os.getenv("GEMINI_RPM", "15")),
+    tokens_per_minute=float(os.getenv("GEMINI_TPM", "1000000")),
+    max_queue=int(os.getenv("GEMINI_MAX_QUEUE", "20")),
+    max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "3")),
+    backoff_base=float(os.getenv("GEMINI_BACKOFF_BASE", "5")),
+    backoff_max=float(os.getenv("GEMINI_BACKOFF_MAX", "120")),
+)
+
+
+def _queue_full_exception(e: QueueFullError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Sunucu şu anda yoğun. Lütfen biraz sonra tekrar deneyin.",
+        headers={"Retry-After": str(max(int(e.retry_after), 1))},
+    )
+
+
+def _retries_exhausted_exception() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="API limiti aşıldı. Lütfen birkaç dakika sonra tekrar deneyin.",
+    )
+
+
 # Retry mekanizması ile Gemini API çağrısı
-def generate_with_retry(model, prompt, max_retries=3, initial_delay=45):
-    """Rate limit hatalarında otomatik retry yapan fonksiyon."""
-    for attempt in range(max_retries):
+async def generate_with_retry(
+    model, prompt, priority=PRIORITY_INTERACTIVE, stage: str = "other"
+):
+    """
+    Gemini çağrısını zamanlayıcı üzerinden yapar. Kota doluysa sıra beklenir,
+    429 alınırsa tüm kuyruk birlikte geri çekilir ve yeniden denenir.
+    Çağrı thread havuzunda yapılır; bekleyen istek event loop'u durdurmaz.
+    Süre, stage etiketiyle ytsum_gemini_call_seconds'a yazılır.
+    """
+    try:
+        with GEMINI_CALL_SECONDS.time(stage=stage), tracing.span(f"gemini.{stage}"):
+            return await gemini_scheduler.run(
+                lambda: run_blocking(model.generate_content, prompt),
+                tokens=estimate_tokens(prompt),
+                priority=priority,
+            )
+    except QueueFullError as e:
+        raise _queue_full_exception(e)
+    except RetriesExhaustedError:
+        raise _retries_exhausted_exception()
+
+
+async def stream_with_retry(
+    model, prompt, priority=PRIORITY_INTERACTIVE, stage: str = "other"
+):
+    """
+    Gemini'den streaming yanıt alır ve metin parçalarını geldikçe yield eder.
+    Üretim thread havuzunda yapılır, parçalar bir asyncio.Queue ile aktarılır.
+    Retry yalnızca ilk parça gelmeden önce yapılır; sonrasında hata yükseltilir.
+    Tamamlanan akışın süresi ytsum_gemini_call_seconds'a yazılır.
+    """
+    loop = asyncio.get_running_loop()
+    tokens = estimate_tokens(prompt)
+    seq = None
+    call_started = time.perf_counter()
+
+    for attempt in range(gemini_scheduler.max_retries):
+        try:
+            seq = await gemini_scheduler.acquire(tokens, priority, seq)
+        except QueueFullError as e:
+            raise _queue_full_exception(e)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for chunk in model.generate_content(prompt, stream=True):
+                    if stop.is_set():
+                        return
+                    loop.call_soon_threadsafe(queue.put_nowait, ("chunk", chunk.text))
+                loop.call_soon_threadsafe(queue.put_nowait, ("done", None))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, ("error", e))
+
+        loop.run_in_executor(_io_executor, produce)
+        started = False
         try:
-            return model.generate_content(prompt)
+            while True:
+                kind, payload = await queue.get()
+                if kind == "chunk":
+                    started = True
+                    yield payload
+                elif kind == "done":
+                    elapsed = time.perf_counter() - call_started
+                    GEMINI_CALL_SECONDS.observe(elapsed, stage=stage)
+                    tracing.record_span(f"gemini.{stage}", elapsed)
+                    return
+                else:
+                    raise payload
         except Exception as e:
-            error_str = str(e)
-            if any(k in error_str.lower() for k in ["429", "quota", "rate"]):
-                wait_time = initial_delay * (attempt + 1)
-                print(
-                    f"Rate limit aşıldı. {wait_time}s bekleniyor... ({attempt + 1}/{max_retries})"
-                )
-                time.sleep(wait_time)
-            else:
+            if started or not is_rate_limit_error(e):
                 raise
-    raise HTTPException(
-        status_code=429,
-        detail="API limiti aşıldı. Lütfen birkaç dakika sonra tekrar deneyin.",
+            delay = gemini_scheduler.on_rate_limited(e, attempt)
+            logger.warning(
+                "Rate limit aşıldı (stream). Kuyruk %.1fs bekletiliyor... (%d/%d)",
+                delay,
+                attempt + 1,
+                gemini_scheduler.max_retries,
+            )
+        finally:
+            # İstemci bağlantıyı kapattıysa üretici thread de dursun
+            stop.set()
+
+    gemini_scheduler.on_retries_exhausted()
+    raise _retries_exhausted_exception()
+
+
+# ---- Uzun Videolar (Map-Reduce) ----
+# Transcript bu eşiği aşarsa parçalara bölünüp önce parça notları çıkarılır.
+CHUNKING_THRESHOLD_TOKENS = int(os.getenv("CHUNKING_THRESHOLD_TOKENS", "30000"))
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "12000"))
+CHUNK_MAX_SECONDS = float(os.getenv("CHUNK_MAX_SECONDS", "0")) or None
+CHUNK_CONCURRENCY = int(os.getenv("CHUNK_CONCURRENCY", "4"))
+
+
+async def prepare_transcript_text(transcript: Transcript, model) -> str:
+    """
+    Prompt'lara verilecek transcript metnini hazırlar. Kısa videolarda tam
+    transcript, uzun videolarda (açıksa çıkarımsal seçimden sonra) parça
+    notlarının birleşimi döner.
+    """
+    text = transcript.render()
+    tokens = estimate_tokens(text)
+    if EXTRACTIVE_RATIO < 1 and tokens > EXTRACTIVE_MIN_TOKENS:
+        started = time.monotonic()
+        with tracing.span("extractive", tokens=tokens):
+            transcript = await run_blocking(
+                extract_transcript, transcript, EXTRACTIVE_RATIO
+            )
+        text = transcript.render()
+        logger.info(
+            "Çıkarımsal seçim: ~%d → ~%d token (%.2fs)",
+            tokens,
+            estimate_tokens(text),
+            time.monotonic() - started,
+        )
+        tokens = estimate_tokens(text)
+    if tokens <= CHUNKING_THRESHOLD_TOKENS:
+        return text
+
+    async def generate(prompt: str) -> str:
+        return (await generate_with_retry(model, prompt, stage="chunk")).text
+
+    started = time.monotonic()
+    with tracing.span("chunking", tokens=tokens):
+        notes, chunk_count = await map_reduce_transcript(
+            transcript,
+            generate,
+            max_tokens=CHUNK_MAX_TOKENS,
+            concurrency=CHUNK_CONCURRENCY,
+            max_seconds=CHUNK_MAX_SECONDS,
+        )
+    logger.info(
+        "Uzun transcript %d parçada özetlendi (~%d → ~%d token, %.1fs)",
+        chunk_count,
+        tokens,
+        estimate_tokens(notes),
+        time.monotonic() - started,
     )
+    return notes
 
 
 class VideoURL(BaseModel):
@@ -217,32 +667,28 @@ def extract_video_id(url: str) -> str:
     )
 
 
+# ---- Video Detayları (YouTube Data API) ----
+video_details = VideoDetailsService(
+    lambda: http_clients.get_youtube_client(os.getenv("YOUTUBE_API_KEY")),
+    ttl_seconds=float(os.getenv("VIDEO_DETAILS_TTL", "3600")),
+    max_entries=int(os.getenv("VIDEO_DETAILS_MAX_ENTRIES", "5000")),
+    daily_quota=int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000")),
+    negative_ttl_seconds=float(os.getenv("VIDEO_DETAILS_NEGATIVE_TTL", "300")),
+)
+VIDEO_DETAILS_BATCH_MAX = 200
+
+
+class VideoURLs(BaseModel):
+    urls: list[str]
+
+
 def get_video_details(video_id: str) -> dict:
-    """YouTube API kullanarak video detaylarını alır."""
+    """YouTube API kullanarak video detaylarını alır (önbellekli)."""
     try:
-        youtube = build("youtube", "v3", developerKey=os.getenv("YOUTUBE_API_KEY"))
-        response = (
-            youtube.videos()
-            .list(part="snippet,contentDetails,statistics", id=video_id)
-            .execute()
-        )
-
-        if not response["items"]:
+        details = video_details.get(video_id)
+        if details is None:
             raise HTTPException(status_code=404, detail="Video bulunamadı")
-
-        video = response["items"][0]
-        return {
-            "title": video["snippet"]["title"],
-            "description": video["snippet"]["description"],
-            "thumbnail": video["snippet"]["thumbnails"]["high"]["url"],
-            "duration": video["contentDetails"]["duration"],
-            "language": video["snippet"].get("defaultAudioLanguage", "Bilinmiyor"),
-            "has_captions": video["contentDetails"]["caption"] == "true",
-            "view_count": video["statistics"].get("viewCount", "0"),
-            "like_count": video["statistics"].get("likeCount", "0"),
-            "channel_title": video["snippet"]["channelTitle"],
-            "published_at": video["snippet"]["publishedAt"],
-        }
+        return details
 
     except HTTPException:
         raise
@@ -256,7 +702,7 @@ def get_video_details(video_id: str) -> dict:
 async def get_video_details_endpoint(video: VideoURL):
     try:
         video_id = extract_video_id(video.url)
-        return get_video_details(video_id)
+        return await run_blocking(get_video_details, video_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -265,21 +711,87 @@ async def get_video_details_endpoint(video: VideoURL):
         )
 
 
-def format_timestamp(seconds: float) -> str:
-    """Saniyeyi mm:ss formatına çevirir"""
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
-    return f"{minutes:02d}:{secs:02d}"
+@app.post("/video-details/batch")
+async def get_video_details_batch(videos: VideoURLs):
+    """
+    Birden fazla URL için detayları döndürür. Önbellekte olmayanlar 50'lik
+    gruplar halinde tek API çağrısıyla alınır. Sonuçlar girdi sırasıyla döner.
+    """
+    if len(videos.urls) > VIDEO_DETAILS_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"En fazla {VIDEO_DETAILS_BATCH_MAX} URL gönderilebilir.",
+        )
 
+    items: list[dict] = []
+    for url in videos.urls:
+        try:
+            items.append({"url": url, "video_id": extract_video_id(url)})
+        except HTTPException as e:
+            items.append({"url": url, "video_id": None, "error": e.detail})
 
-def _fetch_transcript_with_api(api, video_id: str) -> str:
+    video_ids = [item["video_id"] for item in items if item["video_id"]]
+    try:
+        found = await run_blocking(video_details.get_many, video_ids)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Video detayları alınamadı: {str(e)}"
+        )
+
+    for item in items:
+        if item["video_id"] is None:
+            continue
+        details = found.get(item["video_id"])
+        if details is None:
+            item["error"] = "Video bulunamadı"
+        else:
+            item["details"] = details
+    return {"videos": items}
+
+
+# ---- Altyazı Normalizasyonu ----
+# Otomatik altyazılardaki tekrar eden (rolling) satırlar birleştirilir.
+CAPTION_NORMALIZE = os.getenv("CAPTION_NORMALIZE", "1") != "0"
+CAPTION_SEGMENT_MAX_SECONDS = float(os.getenv("CAPTION_SEGMENT_MAX_SECONDS", "15"))
+
+# Transcript dil tercihi (her iki yöntem için), virgülle ayrılmış sırayla
+TRANSCRIPT_LANGS = [
+    lang.strip()
+    for lang in os.getenv("TRANSCRIPT_LANGS", "tr,en").split(",")
+    if lang.strip()
+]
+
+
+def _log_normalization(transcript: Transcript) -> None:
+    stats = transcript.meta.get("normalization")
+    if stats:
+        logger.info(
+            "Altyazı normalizasyonu: %d → %d segment, ~%%%.0f token azalması",
+            stats["input_segments"],
+            stats["output_segments"],
+            stats["token_reduction"] * 100,
+        )
+
+
+def _build_transcript(segments, language: str) -> Transcript:
+    """Segmentlerden (gerekirse normalize ederek) Transcript oluşturur."""
+    transcript = build_transcript(
+        segments,
+        language,
+        normalize=CAPTION_NORMALIZE,
+        max_segment_ms=int(CAPTION_SEGMENT_MAX_SECONDS * 1000),
+    )
+    _log_normalization(transcript)
+    return transcript
+
+
+def _fetch_transcript_with_api(api, video_id: str) -> Transcript:
     """İlk yöntem: youtube_transcript_api ile transcript alır"""
     transcript_list = api.list(video_id)
 
-    preferred_languages = ["tr", "en"]
     selected_transcript = None
 
-    for lang in preferred_languages:
+    for lang in TRANSCRIPT_LANGS:
         for t in transcript_list:
             if t.language_code == lang:
                 selected_transcript = t
@@ -294,198 +806,169 @@ def _fetch_transcript_with_api(api, video_id: str) -> str:
         raise Exception("Transkript bulunamadı.")
 
     transcript_data = selected_transcript.fetch()
-    formatted_transcript = []
-    for item in transcript_data:
-        start_time = format_timestamp(item.start)
-        end_time = format_timestamp(item.start + item.duration)
-        formatted_transcript.append(f"[{start_time}-{end_time}] {item.text}")
-
-    return "\n".join(formatted_transcript)
-
-
-def _get_sub_url(sub_data: list) -> str | None:
-    """Altyazı format listesinden json3 URL'sini (veya ilk mevcut URL'yi) döndürür."""
-    for fmt in sub_data:
-        if fmt.get("ext") == "json3":
-            return fmt["url"]
-    return sub_data[0].get("url") if sub_data else None
-
+    return _build_transcript(
+        (
+            (round(item.start * 1000), round(item.duration * 1000), item.text)
+            for item in transcript_data
+        ),
+        selected_transcript.language_code,
+    )
 
-def _parse_json3_subtitle(url: str) -> list[str]:
-    """JSON3 altyazı URL'sinden formatted transcript satırları döndürür."""
-    resp = http_requests.get(url, timeout=30)
-    resp.raise_for_status()
-    events = resp.json().get("events", [])
 
-    lines = []
-    for event in events:
-        segs = event.get("segs", [])
-        if not segs:
-            continue
-        text = "".join(seg.get("utf8", "") for seg in segs).strip()
-        if not text or text == "\n":
-            continue
-        start_sec = event.get("tStartMs", 0) / 1000
-        end_sec = (event.get("tStartMs", 0) + event.get("dDurationMs", 0)) / 1000
-        lines.append(
-            f"[{format_timestamp(start_sec)}-{format_timestamp(end_sec)}] {text}"
-        )
-    return lines
+# ---- yt-dlp Süreç Havuzu ----
+# yt-dlp GIL'i uzun süre tuttuğu için ayrı süreçlerde çalışır (0: thread havuzu).
+YTDLP_PROCESSES = int(os.getenv("YTDLP_PROCESSES", "2"))
+ytdlp_pool = YtdlpProcessPool(
+    max_workers=max(YTDLP_PROCESSES, 1),
+    max_tasks_per_child=int(os.getenv("YTDLP_MAX_TASKS_PER_CHILD", "20")),
+    timeout=float(os.getenv("YTDLP_TIMEOUT", "60")),
+    log_config=LOG_CONFIG,
+)
 
 
-def _find_subtitle_data(
-    video_info: dict, lang: str | None = None
-) -> tuple[list | None, str]:
-    """video_info'dan belirtilen dilde (veya herhangi bir dilde) altyazı verisini bulur."""
-    subs = video_info.get("subtitles", {})
-    auto = video_info.get("automatic_captions", {})
+@app.on_event("startup")
+def _start_ytdlp_pool():
+    if YTDLP_PROCESSES > 0:
+        ytdlp_pool.start()
 
-    if lang:
-        data = subs.get(lang) or auto.get(lang)
-        return data, lang
 
-    available = subs or auto
-    if available:
-        first_lang = next(iter(available))
-        return available[first_lang], first_lang
-    return None, ""
+@app.on_event("shutdown")
+def _shutdown_ytdlp_pool():
+    ytdlp_pool.shutdown()
 
 
-def _fetch_transcript_with_ytdlp(video_id: str) -> str:
+async def _fetch_transcript_with_ytdlp(video_id: str) -> Transcript:
     """
     Fallback yöntemi: yt-dlp Python modülü ile altyazı/caption indirir.
-    youtube_transcript_api başarısız olduğunda devreye girer.
+    youtube_transcript_api başarısız olduğunda veya hedge süresinde
+    bitmediğinde devreye girer. Video bilgisi tek bir extract_info ile
+    alınır; altyazı izi TRANSCRIPT_LANGS tercihine göre seçilir.
     """
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
-
-    # Önce tercih edilen dillerle, sonra dil belirtmeden dene
-    langs_to_try = ["tr", "en", None]
-    errors: list[str] = []
-
-    # Proxy desteği (env'den alınır, yoksa doğrudan bağlanır)
-    proxy = os.getenv("YT_DLP_PROXY")
-
-    for lang in langs_to_try:
-        try:
-            ydl_opts = {
-                "skip_download": True,
-                "writeautomaticsub": True,
-                "subtitlesformat": "json3",
-                "quiet": True,
-                "no_warnings": True,
-            }
-            if lang:
-                ydl_opts["subtitleslangs"] = [lang]
-            if proxy:
-                ydl_opts["proxy"] = proxy
-
-            # Cookie desteği
-            cookie_path = _get_cookies_path()
-            if cookie_path:
-                ydl_opts["cookiefile"] = cookie_path
-                print("yt-dlp: cookies.txt kullanılıyor")
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                video_info = ydl.extract_info(video_url, download=False)
-
-            if not video_info:
-                msg = f"yt-dlp ({lang or 'any'}) video bilgisi alınamadı."
-                print(msg)
-                errors.append(msg)
-                continue
-
-            sub_data, found_lang = _find_subtitle_data(video_info, lang)
-            if not sub_data:
-                msg = f"yt-dlp: {lang or 'any'} dilinde altyazı bulunamadı."
-                print(msg)
-                errors.append(msg)
-                continue
-
-            sub_url = _get_sub_url(sub_data)
-            if not sub_url:
-                msg = f"yt-dlp ({lang or 'any'}) altyazı URL'si bulunamadı."
-                errors.append(msg)
-                continue
-
-            lines = _parse_json3_subtitle(sub_url)
-            if lines:
-                print(f"yt-dlp ile transcript alındı (dil: {found_lang})")
-                return "\n".join(lines)
-
-        except Exception as e:
-            msg = f"yt-dlp ({lang or 'any'}) hatası: {str(e)[:300]}"
-            print(msg)
-            errors.append(msg)
-
-    raise Exception(
-        "yt-dlp ile de transcript alınamadı. Detaylar: " + " | ".join(errors)
+    args = (
+        video_id,
+        TRANSCRIPT_LANGS,
+        os.getenv("YT_DLP_PROXY"),
+        _get_cookies_path(),
+        CAPTION_NORMALIZE,
+        int(CAPTION_SEGMENT_MAX_SECONDS * 1000),
     )
+    if YTDLP_PROCESSES > 0:
+        transcript = await ytdlp_pool.run(*args)
+    else:
+        transcript = await run_blocking(fetch_subtitles, *args)
+    # Alt süreçte ölçülen aşamalar ize sonradan eklenir
+    timings = transcript.meta.pop("timings", {})
+    if timings:
+        tracing.record_span(
+            "ytdlp.extract_info",
+            timings["extract_info"],
+            ended_before=timings["subtitle_download"],
+        )
+        tracing.record_span("ytdlp.subtitle_download", timings["subtitle_download"])
+    logger.info("yt-dlp ile transcript alındı (dil: %s)", transcript.meta["language"])
+    _log_normalization(transcript)
+    return transcript
+
+
+# ---- Transcript Yöntemleri (Hedge + Devre Kesici) ----
+# İlk yöntem TRANSCRIPT_HEDGE_DELAY saniyede bitmezse ikincisi de başlatılır.
+TRANSCRIPT_HEDGE_DELAY = float(os.getenv("TRANSCRIPT_HEDGE_DELAY", "2"))
+transcript_breakers = {
+    name: CircuitBreaker(
+        failure_threshold=int(os.getenv("TRANSCRIPT_BREAKER_FAILURES", "3")),
+        reset_timeout=float(os.getenv("TRANSCRIPT_BREAKER_RESET", "60")),
+    )
+    for name in ("youtube_transcript_api", "yt-dlp")
+}
 
 
-def get_transcript(video_id: str) -> tuple[str, str]:
+async def get_transcript(video_id: str) -> tuple[Transcript, str]:
     """
     Transcript alır. Hangi yöntemle alındığını da döndürür.
-    Returns: (transcript_text, method_name)
-    1) youtube_transcript_api ile dener
-    2) Başarısız olursa yt-dlp fallback kullanır
+    Returns: (transcript, method_name)
+    0) Daha önce indirildiyse transcript önbelleğinden okur
+    1) youtube_transcript_api ve yt-dlp'yi hedge'leyerek yarıştırır
     """
-    errors: list[str] = []
-
-    # Proxy desteği
-    proxy = os.getenv("YT_DLP_PROXY")
+    started = time.perf_counter()
+    with tracing.span("transcript.cache"):
+        cached = await run_blocking(transcript_store.get, video_id)
+    CACHE_LOOKUPS.inc(cache="transcript", result="miss" if cached is None else "hit")
+    if cached is not None:
+        TRANSCRIPT_FETCH_SECONDS.observe(
+            time.perf_counter() - started, method="cache", outcome="success"
+        )
+        return cached, "cache"
 
-    # 1) youtube_transcript_api ile dene
+    transcript, method = await _download_transcript(video_id)
+    transcript.meta["method"] = method
     try:
-        print("Yöntem 1: youtube_transcript_api ile deneniyor...")
-
-        # Cookie desteği — http_client üzerinden Session'a cookie yüklenir
-        cookie_path = _get_cookies_path()
-        api_kwargs = {}
+        await run_blocking(transcript_store.put, video_id, transcript)
+    except OSError as e:
+        logger.warning("Transcript önbelleğe yazılamadı: %s", e)
+    return transcript, method
 
-        if cookie_path:
-            import requests as _req
-            from http.cookiejar import MozillaCookieJar
 
-            cj = MozillaCookieJar(cookie_path)
-            try:
-                cj.load(ignore_discard=True, ignore_expires=True)
-                session = _req.Session()
-                session.cookies = cj
-                api_kwargs["http_client"] = session
-                print(f"youtube_transcript_api: cookies yüklendi ({len(cj)} cookie)")
-            except Exception as ce:
-                print(f"youtube_transcript_api: cookie yükleme hatası: {ce}")
-
-        if proxy:
-            from youtube_transcript_api.proxies import GenericProxyConfig
-
-            api_kwargs["proxy_config"] = GenericProxyConfig(
-                http_url=proxy,
-                https_url=proxy,
-            )
+async def _timed_fetch(method: str, fetch) -> Transcript:
+    """Yöntemin süresini sonucuyla (success/error/cancelled) birlikte kaydeder."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with tracing.span(f"transcript.{method}"):
+            result = await fetch
+        outcome = "success"
+        return result
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        TRANSCRIPT_FETCH_SECONDS.observe(
+            time.perf_counter() - started, method=method, outcome=outcome
+        )
 
-        api = YouTubeTranscriptApi(**api_kwargs)
-        result = _fetch_transcript_with_api(api, video_id)
-        print("Transcript başarıyla alındı! (youtube_transcript_api)")
-        return result, "youtube_transcript_api"
-    except Exception as e:
-        msg = f"youtube_transcript_api: {str(e)[:300]}"
-        print(msg)
-        errors.append(msg)
 
-    # 2) yt-dlp fallback
+async def _download_transcript(video_id: str) -> tuple[Transcript, str]:
+    """
+    Transcript'i YouTube'dan indirir. Önce youtube_transcript_api başlatılır;
+    hedge süresinde bitmezse veya hata verirse yt-dlp de başlar, ilk başarılı
+    sonuç kullanılır. Devresi açık olan yöntem atlanır.
+    """
     try:
-        print("Yöntem 2: yt-dlp ile deneniyor...")
-        result = _fetch_transcript_with_ytdlp(video_id)
-        return result, "yt-dlp"
-    except Exception as e:
-        msg = f"yt-dlp: {str(e)[:300]}"
-        print(msg)
-        errors.append(msg)
+        return await hedged_race(
+            [
+                (
+                    "youtube_transcript_api",
+                    lambda: _timed_fetch(
+                        "youtube_transcript_api",
+                        run_blocking(_download_with_api, video_id),
+                    ),
+                ),
+                (
+                    "yt-dlp",
+                    lambda: _timed_fetch(
+                        "yt-dlp", _fetch_transcript_with_ytdlp(video_id)
+                    ),
+                ),
+            ],
+            transcript_breakers,
+            TRANSCRIPT_HEDGE_DELAY,
+        )
+    except AllMethodsFailedError as e:
+        for error in e.errors:
+            logger.warning("Transcript yöntemi başarısız: %s", error)
+        detail = "Video transkripti alınamadı. " + str(e)
+        raise HTTPException(status_code=400, detail=detail)
+
+
+def _download_with_api(video_id: str) -> Transcript:
+    """Paylaşılan youtube_transcript_api istemcisiyle (cookie/proxy) indirir."""
+    logger.debug("youtube_transcript_api ile deneniyor...")
+    proxy = os.getenv("YT_DLP_PROXY")
 
-    # Her ikisi de başarısız
-    detail = "Video transkripti alınamadı. " + " | ".join(errors)
-    raise HTTPException(status_code=400, detail=detail)
+    # Cookie desteği — cookie jar yalnızca dosya değişince yeniden okunur
+    api = http_clients.get_transcript_api(_get_cookies_path(), proxy)
+    result = _fetch_transcript_with_api(api, video_id)
+    logger.info("Transcript başarıyla alındı! (youtube_transcript_api)")
+    return result
 
 
 @app.get("/debug-transcript/{video_id}")
@@ -493,11 +976,13 @@ async def debug_transcript(video_id: str):
     """Canlı ortamda transcript hatalarını teşhis etmek için debug endpoint."""
     import traceback as tb
 
+    from yt_dlp.version import __version__ as yt_dlp_version
+
     proxy = os.getenv("YT_DLP_PROXY")
     cookie_path = _get_cookies_path()
     results: dict = {
         "video_id": video_id,
-        "yt_dlp_version": yt_dlp.version.__version__,
+        "yt_dlp_version": yt_dlp_version,
         "proxy_configured": bool(proxy),
         "proxy_value": (proxy[:15] + "***") if proxy else None,
         "cookies_file_exists": cookie_path is not None,
@@ -506,8 +991,11 @@ async def debug_transcript(video_id: str):
     # Proxy ile IP testi
     try:
         proxies = {"http": proxy, "https": proxy} if proxy else None
-        ip_resp = http_requests.get(
-            "https://api.ipify.org?format=json", proxies=proxies, timeout=10
+        ip_resp = await run_blocking(
+            http_clients.get_session().get,
+            "https://api.ipify.org?format=json",
+            proxies=proxies,
+            timeout=10,
         )
         results["outbound_ip"] = ip_resp.json().get("ip", "bilinmiyor")
     except Exception as e:
@@ -516,11 +1004,11 @@ async def debug_transcript(video_id: str):
     # youtube_transcript_api
     try:
         api = YouTubeTranscriptApi()
-        transcript = _fetch_transcript_with_api(api, video_id)
+        transcript = await run_blocking(_fetch_transcript_with_api, api, video_id)
         results["method1_youtube_transcript_api"] = {
             "status": "success",
-            "lines": len(transcript.split("\n")),
-            "preview": transcript[:200],
+            "lines": len(transcript),
+            "preview": transcript.render()[:200],
         }
     except Exception as e:
         results["method1_youtube_transcript_api"] = {
@@ -531,11 +1019,11 @@ async def debug_transcript(video_id: str):
 
     # yt-dlp
     try:
-        transcript = _fetch_transcript_with_ytdlp(video_id)
+        transcript = await _fetch_transcript_with_ytdlp(video_id)
         results["method2_ytdlp"] = {
             "status": "success",
-            "lines": len(transcript.split("\n")),
-            "preview": transcript[:200],
+            "lines": len(transcript),
+            "preview": transcript.render()[:200],
         }
     except Exception as e:
         results["method2_ytdlp"] = {
@@ -547,82 +1035,867 @@ async def debug_transcript(video_id: str):
     return results
 
 
-summary_status = {}
+async def _cached_summary_response(cached: dict) -> dict:
+    """Önbellekten gelen özet için task oluşturur ve yanıtı hazırlar."""
+    task_id = str(uuid.uuid4())
+    await run_state(
+        state.set_task,
+        task_id,
+        {"status": "completed", "result": cached["detailed_summary"]},
+    )
+    return {
+        "bullet_points": cached["bullet_points"],
+        "detailed_summary": cached["detailed_summary"],
+        "task_id": task_id,
+        "message": "Özet önbellekten getirildi.",
+        "transcript_method": cached.get("transcript_method", "cache"),
+        "cached": True,
+    }
 
 
-@app.post("/summarize")
-async def summarize_video(
-    video: VideoURL, request: Request, background_tasks: BackgroundTasks
-):
-    try:
-        # Rate limit kontrolü
-        client_ip = request.client.host if request.client else "unknown"
-        _check_rate_limit(client_ip)
+# Aynı video için eş zamanlı /summarize istekleri tek bir işte birleştirilir
+summarize_flight = SingleFlight()
 
-        video_id = extract_video_id(video.url)
-        transcript, transcript_method = get_transcript(video_id)
-        model = genai.GenerativeModel("gemini-2.0-flash")
+# Arka plan task'larına referans tutulur; aksi halde GC tarafından toplanabilirler
+_background_jobs: set[asyncio.Task] = set()
+
+
+def _start_background_job(coro) -> None:
+    job = asyncio.create_task(coro)
+    _background_jobs.add(job)
+    job.add_done_callback(_background_jobs.discard)
 
-        bullet_points = generate_with_retry(
-            model, BULLET_POINTS_PROMPT.format(transcript=transcript)
+
+# Detaylı özetin kısmi hali state'e en fazla bu sıklıkta yazılır (saniye)
+STREAM_STATUS_UPDATE_INTERVAL = 1.0
+
+
+# Birleşik akışın transcript'i ikinci kez göndermeyerek kazandırdığı token'lar
+pipeline_stats = {"combined_jobs": 0, "fallbacks": 0, "tokens_saved": 0}
+
+
+async def _combined_parts(model, transcript_text: str, usage: dict):
+    """Birleşik prompt çıktısını ("bullets" | "detail", metin) olarak akıtır."""
+    splitter = CombinedOutputSplitter()
+    async for chunk in stream_with_retry(
+        model,
+        COMBINED_SUMMARY_PROMPT.format(transcript=transcript_text),
+        stage="combined",
+    ):
+        for part in splitter.feed(chunk):
+            yield part
+    for part in splitter.flush():
+        yield part
+
+    pipeline_stats["combined_jobs"] += 1
+    if splitter.has_detail:
+        usage["tokens_saved"] = estimate_tokens(transcript_text)
+        pipeline_stats["tokens_saved"] += usage["tokens_saved"]
+    else:
+        pipeline_stats["fallbacks"] += 1
+
+
+async def _summary_events(model, transcript_text: str, task_id: str, usage: dict):
+    """
+    Özeti ("bullets" | "bullets_done" | "detail", metin) olayları olarak üretir.
+    Birleşik akışta model ayırıcıyı yazmazsa detaylı özet ayrı bir çağrıyla
+    istenir. Detaylı özetin kısmi hali task'a periyodik olarak yazılır.
+    """
+    bullet_parts: list[str] = []
+    detail_parts: list[str] = []
+    bullets_done = False
+    last_update = time.monotonic()
+
+    async def add_detail(text: str) -> None:
+        nonlocal last_update
+        detail_parts.append(text)
+        if time.monotonic() - last_update >= STREAM_STATUS_UPDATE_INTERVAL:
+            last_update = time.monotonic()
+            await run_state(
+                state.set_task,
+                task_id,
+                {"status": "processing", "result": "".join(detail_parts)},
+            )
+
+    if SUMMARY_PIPELINE == "combined":
+        parts = _combined_parts(model, transcript_text, usage)
+    else:
+        parts = (
+            (BULLETS, text)
+            async for text in stream_with_retry(
+                model,
+                BULLET_POINTS_PROMPT.format(transcript=transcript_text),
+                stage="bullets",
+            )
         )
 
-        task_id = str(uuid.uuid4())
-        background_tasks.add_task(
-            process_detailed_summary, transcript, bullet_points.text, task_id
+    async for kind, text in parts:
+        if kind == BULLETS:
+            bullet_parts.append(text)
+            yield "bullets", text
+            continue
+        if not bullets_done:
+            bullets_done = True
+            yield "bullets_done", "".join(bullet_parts).strip()
+        await add_detail(text)
+        yield "detail", text
+
+    if bullets_done:
+        return
+
+    bullet_points = "".join(bullet_parts).strip()
+    yield "bullets_done", bullet_points
+    if SUMMARY_PIPELINE == "combined":
+        logger.warning(
+            "Birleşik çıktıda ayırıcı bulunamadı, detaylı özet ayrıca isteniyor"
         )
+    if _use_fanout(bullet_points):
+        detail_stream = _stream_detailed_fanout(
+            model, transcript_text, bullet_points, task_id
+        )
+    else:
+        detail_stream = stream_with_retry(
+            model,
+            DETAILED_SUMMARY_PROMPT.format(
+                bullet_points=bullet_points, transcript=transcript_text
+            ),
+            priority=PRIORITY_BACKGROUND,
+            stage="detailed",
+        )
+    async for text in detail_stream:
+        await add_detail(text)
+        yield "detail", text
+
+
+async def _complete_summary(
+    task_id: str,
+    bullet_points: str,
+    detailed_summary: str,
+    cache_info: dict,
+    tokens_saved: int,
+) -> None:
+    """Biten özeti task'a ve özet önbelleğine yazar."""
+    await run_state(
+        state.set_task,
+        task_id,
+        {
+            "status": "completed",
+            "result": detailed_summary,
+            "tokens_saved": tokens_saved,
+        },
+    )
+    await run_blocking(
+        summary_cache.put,
+        cache_info["video_id"],
+        cache_info["transcript_hash"],
+        GEMINI_MODEL_NAME,
+        PROMPT_VERSION,
+        {
+            "bullet_points": bullet_points,
+            "detailed_summary": detailed_summary,
+            "transcript_method": cache_info["transcript_method"],
+        },
+    )
+
+
+async def _run_summary_job(
+    model,
+    transcript_text: str,
+    task_id: str,
+    bullets_ready: asyncio.Future,
+    cache_info: dict,
+) -> None:
+    """Özet olaylarını tüketir; ana başlıklar hazır olunca future'ı tamamlar."""
+    with tracing.trace(
+        "summary_job", trace_id=tracing.current_trace_id(), task_id=task_id
+    ), log_context(task_id=task_id):
+        usage = {"tokens_saved": 0}
+        bullet_points = ""
+        detail_parts: list[str] = []
+        lease = None
+        try:
+            async for event, text in _summary_events(
+                model, transcript_text, task_id, usage
+            ):
+                if event == "bullets_done":
+                    bullet_points = text
+                    lease = await _lease_detail_job(
+                        task_id, transcript_text, text, cache_info
+                    )
+                    bullets_ready.set_result(text)
+                elif event == "detail":
+                    detail_parts.append(text)
+
+            await _complete_summary(
+                task_id,
+                bullet_points,
+                "".join(detail_parts),
+                cache_info,
+                usage["tokens_saved"],
+            )
+            if lease is not None:
+                await lease.complete()
+            logger.info(
+                "Detaylı özet hazırlandı (~%d token tasarruf)", usage["tokens_saved"]
+            )
+        except asyncio.CancelledError:
+            # Süreç kapanıyor: detaylı özet kuyruktan devam eder
+            if not bullets_ready.done():
+                bullets_ready.cancel()
+            if lease is not None:
+                await _release_detail_lease(lease)
+            raise
+        except Exception as e:
+            if not bullets_ready.done():
+                bullets_ready.set_exception(e)
+            if lease is not None and await _fail_detail_lease(lease, e):
+                return
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            await run_state(
+                state.set_task, task_id, {"status": "error", "result": detail}
+            )
+
+
+async def _summarize(video_id: str) -> dict:
+    """Transcript + ana başlıkları üretir, detaylı özeti arka planda başlatır."""
+    # Aynı video yakın zamanda özetlendiyse transcript'i bile indirme
+    cached = await run_blocking(
+        summary_cache.get_latest, video_id, GEMINI_MODEL_NAME, PROMPT_VERSION
+    )
+    if cached:
+        CACHE_LOOKUPS.inc(cache="summary", result="hit")
+        return await _cached_summary_response(cached)
+
+    transcript, transcript_method = await get_transcript(video_id)
+    transcript_hash = transcript.digest
+
+    cached = await run_blocking(
+        summary_cache.get,
+        SummaryCache.make_key(
+            video_id, transcript_hash, GEMINI_MODEL_NAME, PROMPT_VERSION
+        ),
+    )
+    CACHE_LOOKUPS.inc(cache="summary", result="hit" if cached else "miss")
+    if cached:
+        return await _cached_summary_response(cached)
+
+    model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    transcript_text = await prepare_transcript_text(transcript, model)
+    cache_info = {
+        "video_id": video_id,
+        "transcript_hash": transcript_hash,
+        "transcript_method": transcript_method,
+    }
 
+    if SUMMARY_PIPELINE == "combined":
+        # Tek çağrı arka planda akar; ana başlıklar hazır olunca yanıt döner,
+        # detaylı özet aynı çağrıdan gelmeye devam eder.
+        task_id = str(uuid.uuid4())
+        await run_state(
+            state.set_task, task_id, {"status": "processing", "result": None}
+        )
+        bullets_ready = asyncio.get_running_loop().create_future()
+        _start_background_job(
+            _run_summary_job(model, transcript_text, task_id, bullets_ready, cache_info)
+        )
+        bullet_points = await bullets_ready
         return {
-            "bullet_points": bullet_points.text,
+            "bullet_points": bullet_points,
             "task_id": task_id,
             "message": "Ana başlıklar hazırlandı. Detaylı özet hazırlanıyor...",
             "transcript_method": transcript_method,
+            "cached": False,
         }
+
+    bullet_points = await generate_with_retry(
+        model, BULLET_POINTS_PROMPT.format(transcript=transcript_text), stage="bullets"
+    )
+
+    # Detaylı özet, birleştirilmiş isteklerin hepsine ortak olduğundan
+    # tek bir isteğin BackgroundTasks'ına değil iş kuyruğuna bağlanır.
+    task_id = await _enqueue_detailed_summary(
+        transcript_text, bullet_points.text, cache_info
+    )
+
+    return {
+        "bullet_points": bullet_points.text,
+        "task_id": task_id,
+        "message": "Ana başlıklar hazırlandı. Detaylı özet hazırlanıyor...",
+        "transcript_method": transcript_method,
+        "cached": False,
+    }
+
+
+@app.post("/summarize")
+async def summarize_video(video: VideoURL, request: Request):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        # Rate limit kontrolü
+        client_ip = request.client.host if request.client else "unknown"
+        await _check_rate_limit(client_ip)
+
+        video_id = extract_video_id(video.url)
+        # Gemini kuyruğu doluysa transcript indirmeye bile başlamadan reddet
+        gemini_scheduler.check_admission()
+        with log_context(video_id=video_id):
+            result, shared = await summarize_flight.do(
+                video_id, lambda: _summarize(video_id)
+            )
+        outcome = "cached" if result.get("cached") else "ok"
+        return {**result, "coalesced": shared}
     except HTTPException:
         raise
+    except QueueFullError as e:
+        raise _queue_full_exception(e)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Beklenmeyen bir hata oluştu: {str(e)}"
         )
+    finally:
+        SUMMARIZE_SECONDS.observe(
+            time.perf_counter() - started, endpoint="summarize", outcome=outcome
+        )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events formatında tek bir olay üretir."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_summary(video_id: str):
+    """
+    Ana başlıkları ve ardından detaylı özeti Gemini'den geldikçe SSE olayları
+    olarak gönderir. Olaylar: meta, bullets, bullets_done, detail, done, error.
+    Detaylı özetin kısmi hali /summary-status üzerinden de izlenebilir;
+    istemci ana başlıklardan sonra ayrılırsa detaylı özet kuyrukta üretilir.
+    """
+    task_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    outcome = "error"
+    lease = None
+    try:
+        cached = await run_blocking(
+            summary_cache.get_latest, video_id, GEMINI_MODEL_NAME, PROMPT_VERSION
+        )
+        CACHE_LOOKUPS.inc(cache="summary", result="hit" if cached else "miss")
+        if cached:
+            outcome = "cached"
+            response = await _cached_summary_response(cached)
+            yield _sse(
+                "meta",
+                {
+                    "video_id": video_id,
+                    "task_id": response["task_id"],
+                    "transcript_method": response["transcript_method"],
+                    "cached": True,
+                },
+            )
+            yield _sse("bullets", {"text": cached["bullet_points"]})
+            yield _sse("bullets_done", {"text": cached["bullet_points"]})
+            yield _sse("detail", {"text": cached["detailed_summary"]})
+            yield _sse("done", {"task_id": response["task_id"]})
+            return
+
+        transcript, transcript_method = await get_transcript(video_id)
+        await run_state(
+            state.set_task, task_id, {"status": "processing", "result": None}
+        )
+        yield _sse(
+            "meta",
+            {
+                "video_id": video_id,
+                "task_id": task_id,
+                "transcript_method": transcript_method,
+                "cached": False,
+            },
+        )
+
+        model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+        rendered = await prepare_transcript_text(transcript, model)
+
+        cache_info = {
+            "video_id": video_id,
+            "transcript_hash": transcript.digest,
+            "transcript_method": transcript_method,
+        }
+        usage = {"tokens_saved": 0}
+        bullet_points = ""
+        detail_parts: list[str] = []
+        async for event, text in _summary_events(model, rendered, task_id, usage):
+            if event == "bullets_done":
+                bullet_points = text
+                lease = await _lease_detail_job(task_id, rendered, text, cache_info)
+            elif event == "detail":
+                detail_parts.append(text)
+            yield _sse(event, {"text": text})
+
+        await _complete_summary(
+            task_id,
+            bullet_points,
+            "".join(detail_parts),
+            cache_info,
+            usage["tokens_saved"],
+        )
+        if lease is not None:
+            await lease.complete()
+        outcome = "ok"
+        yield _sse("done", {"task_id": task_id, "tokens_saved": usage["tokens_saved"]})
+    except (asyncio.CancelledError, GeneratorExit):
+        # İstemci ayrıldı veya süreç kapanıyor. İptal edilmiş kapsamda
+        # beklenemeyeceğinden kira arka planda kuyruğa geri bırakılır.
+        if lease is not None:
+            _start_background_job(_release_detail_lease(lease))
+        raise
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        if lease is None or not await _fail_detail_lease(lease, e):
+            await run_state(
+                state.set_task, task_id, {"status": "error", "result": detail}
+            )
+        yield _sse("error", {"detail": detail})
+    finally:
+        SUMMARIZE_SECONDS.observe(
+            time.perf_counter() - started, endpoint="stream", outcome=outcome
+        )
+
+
+@app.get("/summarize/stream")
+async def summarize_video_stream(url: str, request: Request):
+    """Özeti Server-Sent Events ile parça parça gönderir."""
+    client_ip = request.client.host if request.client else "unknown"
+    await _check_rate_limit(client_ip)
+    video_id = extract_video_id(url)
+    try:
+        gemini_scheduler.check_admission()
+    except QueueFullError as e:
+        raise _queue_full_exception(e)
+
+    return StreamingResponse(
+        bind_async_iter(_stream_summary(video_id), video_id=video_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/summary-status/{task_id}")
 async def get_summary_status(task_id: str):
     """Özet işleminin durumunu kontrol et."""
-    if task_id not in summary_status:
+    status = await run_state(state.get_task, task_id)
+    if status is None and job_queue is not None:
+        # Yeniden başlatma sonrası (STATE_BACKEND=memory) task kaydı yoksa,
+        # iş kuyruktaysa durumu oradan verilir
+        job = await run_blocking(job_queue.status, task_id)
+        if job is not None and job[0] in (QUEUED, RUNNING):
+            status = {"status": "processing", "result": None}
+        elif job is not None and job[0] == FAILED:
+            status = {
+                "status": "error",
+                "result": f"Detaylı özet üretilemedi: {job[1]}",
+            }
+    if status is None:
         raise HTTPException(status_code=404, detail="Task bulunamadı")
-    return summary_status[task_id]
+    return status
+
+
+# Fan-out modunda her madde için transcript'ten seçilecek pencere sayısı/boyu
+SECTION_WINDOW_LINES = int(os.getenv("SECTION_WINDOW_LINES", "20"))
+SECTION_MAX_WINDOWS = int(os.getenv("SECTION_MAX_WINDOWS", "3"))
 
 
-async def process_detailed_summary(transcript: str, bullet_points: str, task_id: str):
+async def _generate_detailed_fanout(
+    model, transcript_text: str, bullet_points: str, task_id: str
+) -> str:
+    """
+    Her madde için ayrı bölüm üretir. Tamamlanan bölümler sırasıyla
+    birleştirilip task'a yazılır; /summary-status kısmi sonucu gösterebilir.
+    """
+
+    async def generate(prompt: str) -> str:
+        response = await generate_with_retry(
+            model, prompt, priority=PRIORITY_BACKGROUND, stage="detailed_section"
+        )
+        return response.text
+
+    failed = False
+    writes: set[asyncio.Task] = set()
+
+    async def on_progress(sections: list[str | None]) -> None:
+        # İş hata aldıktan sonra gelen ilerleme, hata durumunun üzerine yazmasın
+        if failed:
+            return
+        write = asyncio.create_task(
+            run_state(
+                state.set_task,
+                task_id,
+                {
+                    "status": "processing",
+                    "result": join_sections(sections) or None,
+                    "sections_done": sum(1 for s in sections if s),
+                    "sections_total": len(sections),
+                },
+            )
+        )
+        writes.add(write)
+        write.add_done_callback(writes.discard)
+        # Bölüm iptal edilse de başlamış yazım tamamlanır ve aşağıda beklenir
+        await asyncio.shield(write)
+
+    started = time.monotonic()
     try:
-        print(f"Detaylı özet işleniyor... Task ID: {task_id}")
-        summary_status[task_id] = {"status": "processing", "result": None}
+        result = await generate_sections(
+            bullet_points,
+            transcript_text,
+            generate,
+            on_progress=on_progress,
+            window_lines=SECTION_WINDOW_LINES,
+            max_windows=SECTION_MAX_WINDOWS,
+        )
+    except BaseException:
+        failed = True
+        # Hata durumu, sürmekte olan ilerleme yazımlarından sonra yazılsın
+        await asyncio.gather(*writes, return_exceptions=True)
+        raise
+    logger.info(
+        "Detaylı özet bölümleri paralel üretildi (%.1fs)", time.monotonic() - started
+    )
+    return result
 
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        detailed_summary = generate_with_retry(
-            model,
-            DETAILED_SUMMARY_PROMPT.format(
-                bullet_points=bullet_points, transcript=transcript
-            ),
+
+def _use_fanout(bullet_points: str) -> bool:
+    """Fan-out açık ve maddeler ayrıştırılabiliyorsa True."""
+    if DETAILED_MODE != "fanout":
+        return False
+    if parse_bullets(bullet_points):
+        return True
+    logger.warning(
+        "Ana başlıklar ayrıştırılamadı, detaylı özet tek çağrıyla üretilecek"
+    )
+    return False
+
+
+async def _stream_detailed_fanout(
+    model, transcript_text: str, bullet_points: str, task_id: str
+):
+    """
+    Fan-out bölümlerini akış olarak verir. Bölümler paralel üretilir ama
+    istemciye sırayla gönderilir: bir bölüm, öncekilerin hepsi hazır
+    olduğunda yayınlanır.
+    """
+    progress: asyncio.Queue = asyncio.Queue()
+
+    async def generate(prompt: str) -> str:
+        response = await generate_with_retry(
+            model, prompt, priority=PRIORITY_BACKGROUND, stage="detailed_section"
         )
+        return response.text
+
+    async def on_progress(sections: list[str | None]) -> None:
+        progress.put_nowait(list(sections))
+
+    job = asyncio.create_task(
+        generate_sections(
+            bullet_points,
+            transcript_text,
+            generate,
+            on_progress=on_progress,
+            window_lines=SECTION_WINDOW_LINES,
+            max_windows=SECTION_MAX_WINDOWS,
+        )
+    )
+    job.add_done_callback(lambda _: progress.put_nowait(None))
+    emitted = 0
+    try:
+        while (sections := await progress.get()) is not None:
+            while emitted < len(sections) and sections[emitted]:
+                yield ("\n\n" if emitted else "") + sections[emitted]
+                emitted += 1
+        await job  # Hata varsa burada yükselir
+    finally:
+        # İstemci bağlantıyı kapattıysa bekleyen bölümler de iptal edilsin
+        job.cancel()
+
+
+async def process_detailed_summary(
+    transcript_text: str,
+    bullet_points: str,
+    task_id: str,
+    cache_info: dict | None = None,
+    trace_id: str | None = None,
+    raise_errors: bool = False,
+):
+    """
+    Detaylı özeti üretip task'a ve önbelleğe yazar. Span'ler isteğin iz
+    kimliğiyle (kuyruktan gelen işte trace_id ile) kaydedilir.
 
-        summary_status[task_id] = {
-            "status": "completed",
-            "result": detailed_summary.text,
-        }
-        print(f"Detaylı özet hazırlandı. Task ID: {task_id}")
-    except Exception as e:
-        summary_status[task_id] = {"status": "error", "result": str(e)}
+    Hata task'a yazılır; raise_errors=True ise (kuyruktaki iş) task
+    "processing" kalır ve hata yükseltilir: JobWorker işi yeniden dener,
+    deneme hakkı bitince hatayı _mark_job_dead yazar.
+    """
+    with tracing.trace(
+        "detailed_summary",
+        trace_id=trace_id or tracing.current_trace_id(),
+        task_id=task_id,
+    ), log_context(task_id=task_id):
+        try:
+            logger.info("Detaylı özet işleniyor...")
+            await run_state(
+                state.set_task, task_id, {"status": "processing", "result": None}
+            )
+
+            model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+            if _use_fanout(bullet_points):
+                detailed_summary = await _generate_detailed_fanout(
+                    model, transcript_text, bullet_points, task_id
+                )
+            else:
+                detailed_summary = (
+                    await generate_with_retry(
+                        model,
+                        DETAILED_SUMMARY_PROMPT.format(
+                            bullet_points=bullet_points, transcript=transcript_text
+                        ),
+                        priority=PRIORITY_BACKGROUND,
+                        stage="detailed",
+                    )
+                ).text
+
+            await run_state(
+                state.set_task,
+                task_id,
+                {
+                    "status": "completed",
+                    "result": detailed_summary,
+                },
+            )
+            logger.info("Detaylı özet hazırlandı")
+
+            if cache_info:
+                await run_blocking(
+                    summary_cache.put,
+                    cache_info["video_id"],
+                    cache_info["transcript_hash"],
+                    GEMINI_MODEL_NAME,
+                    PROMPT_VERSION,
+                    {
+                        "bullet_points": bullet_points,
+                        "detailed_summary": detailed_summary,
+                        "transcript_method": cache_info["transcript_method"],
+                    },
+                )
+        except Exception as e:
+            if raise_errors:
+                raise
+            await run_state(
+                state.set_task, task_id, {"status": "error", "result": str(e)}
+            )
+
+
+# ---- Dayanıklı İş Kuyruğu ----
+# Ayrı çağrılı akışta detaylı özetler SQLite kuyruğuna yazılır; deploy veya
+# çökme sonrası yarım kalan işler başka bir worker tarafından yeniden alınır.
+# Birleşik akışta (ve /summarize/stream'de) detaylı özet API sürecinde akmaya
+# devam eder; ana başlıklar hazır olunca iş bu sürece kiralanmış olarak
+# kuyruğa yazılır, süreç çökerse veya kapanırsa kuyruktan yeniden üretilir.
+# JOB_QUEUE_EMBEDDED_WORKER=0 ile API süreçleri iş çalıştırmaz, işler
+# `python worker.py` süreçlerinde işlenir (STATE_BACKEND sqlite/redis olmalı).
+# JOB_QUEUE=0 işleri eskisi gibi doğrudan event loop'ta çalıştırır.
+DETAIL_JOB = "detailed_summary"
+JOB_QUEUE_EMBEDDED_WORKER = os.getenv("JOB_QUEUE_EMBEDDED_WORKER", "1") != "0"
+job_queue = (
+    JobQueue(
+        Path(os.getenv("JOB_QUEUE_PATH", str(SUMMARY_CACHE_DIR / "jobs.sqlite3"))),
+        visibility_timeout=float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300")),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+        retention_seconds=TASK_TTL,
+    )
+    if os.getenv("JOB_QUEUE", "1") != "0"
+    else None
+)
+JOB_DRAIN_TIMEOUT = float(os.getenv("JOB_DRAIN_TIMEOUT", "30"))
+job_worker: JobWorker | None = None
+_job_worker_task: asyncio.Task | None = None
+# API sürecinde süren detaylı özet akışlarının kuyruktaki kiralarının sahibi
+_API_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:api-{uuid.uuid4().hex[:6]}"
+
+
+def _detail_payload(transcript_text: str, bullet_points: str, cache_info: dict) -> dict:
+    return {
+        "transcript_text": transcript_text,
+        "bullet_points": bullet_points,
+        "cache_info": cache_info,
+        "trace_id": tracing.current_trace_id(),
+    }
+
+
+async def _lease_detail_job(
+    task_id: str, transcript_text: str, bullet_points: str, cache_info: dict
+) -> JobLease | None:
+    """
+    Süreç içinde akmaya devam eden detaylı özeti, kuyruğa bu sürece
+    kiralanmış bir iş olarak yazar (job_id = task_id). Kuyruk kapalıysa None.
+    """
+    if job_queue is None:
+        return None
+    lease = JobLease(job_queue, _API_WORKER_ID, run_blocking)
+    await lease.acquire(
+        DETAIL_JOB,
+        _detail_payload(transcript_text, bullet_points, cache_info),
+        task_id,
+    )
+    return lease
+
+
+async def _release_detail_lease(lease: JobLease) -> None:
+    """Yarıda kalan akışın işini kuyruğa bırakır; bir worker baştan üretir."""
+    await lease.release()
+    if job_worker is not None:
+        job_worker.notify()
+
+
+async def _fail_detail_lease(lease: JobLease, error: Exception) -> bool:
+    """
+    Hata alan akışın işini kuyruğa devreder.
+    Returns: iş kuyrukta yeniden denenecekse True (task "processing" kalır).
+    """
+    if await lease.fail(str(error)[:500]):
+        return False
+    logger.warning("Detaylı özet kuyrukta yeniden denenecek: %s", error)
+    if job_worker is not None:
+        job_worker.notify()
+    return True
+
+
+async def _enqueue_detailed_summary(
+    transcript_text: str, bullet_points: str, cache_info: dict
+) -> str:
+    """
+    Detaylı özet işini kuyruğa ekler ve task_id döndürür. Aynı video,
+    transcript, model ve prompt için bekleyen bir iş varsa onun task_id'si
+    döner; iş iki kez çalıştırılmaz.
+    """
+    if job_queue is None:
+        task_id = str(uuid.uuid4())
+        await run_state(
+            state.set_task, task_id, {"status": "processing", "result": None}
+        )
+        _start_background_job(
+            process_detailed_summary(
+                transcript_text, bullet_points, task_id, cache_info=cache_info
+            )
+        )
+        return task_id
+
+    key = ":".join(
+        (
+            DETAIL_JOB,
+            cache_info["video_id"],
+            cache_info["transcript_hash"],
+            GEMINI_MODEL_NAME,
+            PROMPT_VERSION,
+        )
+    )
+    task_id, created = await run_blocking(
+        job_queue.enqueue,
+        DETAIL_JOB,
+        _detail_payload(transcript_text, bullet_points, cache_info),
+        key,
+    )
+    if created:
+        await run_state(
+            state.set_task, task_id, {"status": "processing", "result": None}
+        )
+        if job_worker is not None:
+            job_worker.notify()
+    return task_id
+
+
+async def _run_detail_job(job: Job) -> None:
+    cache_info = job.payload.get("cache_info") or {}
+    with log_context(video_id=cache_info.get("video_id"), attempt=job.attempts):
+        await process_detailed_summary(
+            job.payload["transcript_text"],
+            job.payload["bullet_points"],
+            job.job_id,
+            cache_info=cache_info or None,
+            trace_id=job.payload.get("trace_id"),
+            raise_errors=True,
+        )
+
+
+async def _mark_job_dead(job: Job, error: str) -> None:
+    await run_state(
+        state.set_task,
+        job.job_id,
+        {"status": "error", "result": f"Detaylı özet üretilemedi: {error}"},
+    )
+
+
+def create_job_worker() -> JobWorker:
+    return JobWorker(
+        job_queue,
+        {DETAIL_JOB: _run_detail_job},
+        concurrency=int(os.getenv("JOB_WORKER_CONCURRENCY", "4")),
+        poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1")),
+        drain_timeout=JOB_DRAIN_TIMEOUT,
+        on_dead=_mark_job_dead,
+        run_blocking=run_blocking,
+    )
+
+
+@app.on_event("startup")
+async def _start_job_worker():
+    global job_worker, _job_worker_task
+    if job_queue is not None and JOB_QUEUE_EMBEDDED_WORKER:
+        job_worker = create_job_worker()
+        _job_worker_task = asyncio.create_task(job_worker.run())
+
+
+async def _drain_background_jobs() -> None:
+    """
+    Süreç içi işlerin bitmesini JOB_DRAIN_TIMEOUT kadar bekler; bitmeyenler
+    iptal edilir. Kiralı detaylı özet işleri iptalde kuyruğa geri bırakılır
+    ve sonraki süreçte (veya ayrı worker'da) baştan üretilir.
+    """
+    if not _background_jobs:
+        return
+    logger.info("Arka plan işleri bekleniyor: %d iş", len(_background_jobs))
+    _, pending = await asyncio.wait(set(_background_jobs), timeout=JOB_DRAIN_TIMEOUT)
+    for job in pending:
+        job.cancel()
+    if pending:
+        await asyncio.wait(pending)
+
+
+@app.on_event("shutdown")
+async def _drain_job_worker():
+    if _job_worker_task is None:
+        await _drain_background_jobs()
+        return
+    # Önce yeni iş alımı durur; bırakılan kiralar bu süreçte yeniden alınmasın
+    job_worker.stop()
+    await asyncio.gather(_drain_background_jobs(), _job_worker_task)
+
+
+# Kuyruk boşaltılırken SQLite çağrıları bu havuzu kullandığından en son kapanır
+@app.on_event("shutdown")
+def _shutdown_executor():
+    _io_executor.shutdown(wait=False, cancel_futures=True)
+    _state_executor.shutdown(wait=False, cancel_futures=True)
+
+
+@app.on_event("shutdown")
+def _flush_logs():
+    logging_setup.stop_logging()
 
 
 @app.get("/download-summary/{task_id}")
 async def download_summary(task_id: str):
     """Özeti text dosyası olarak indirir."""
-    if task_id not in summary_status:
+    summary_data = await run_state(state.get_task, task_id)
+    if summary_data is None:
         raise HTTPException(status_code=404, detail="Özet bulunamadı")
 
-    summary_data = summary_status[task_id]
     if summary_data["status"] != "completed":
         raise HTTPException(status_code=400, detail="Özet henüz hazır değil")
 
@@ -0,0 +1,166 @@
+"""
+Otomatik altyazılar için normalizasyon (rolling caption tekilleştirme).
+
+YouTube'un otomatik altyazılarında her satır bir öncekinin sonunu tekrar
+eder ve zaman aralıkları üst üste biner. Bu modül:
+1) Bir önceki metnin sonuyla örtüşen kelimeleri yeni satırdan çıkarır,
+2) Çakışan zaman aralıklarını bir sonraki satırın başlangıcında keser,
+3) Kısa satırları cümle sonu veya süre/uzunluk sınırına kadar birleştirir.
+Girdi ve çıktı (start_ms, duration_ms, text) segmentleridir; üreteç olarak
+çalıştığı için akış halinde gelen veriyle de kullanılabilir.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from transcript_store import Transcript
+
+Segment = tuple[int, int, str]
+
+# "[mm:ss-mm:ss] " öneki prompt'ta her satır için tekrar eder
+_LINE_PREFIX_CHARS = 14
+_SENTENCE_END = re.compile(r"[.!?…]['\")\]]*$")
+_WORD_STRIP = re.compile(r"^\W+|\W+$")
+# Örtüşme ararken bakılan en fazla kelime sayısı
+_MAX_OVERLAP_WORDS = 40
+
+
+@dataclass
+class NormalizationStats:
+    input_segments: int = 0
+    output_segments: int = 0
+    input_chars: int = 0
+    output_chars: int = 0
+
+    @property
+    def token_reduction(self) -> float:
+        """Prompt boyutundaki tahmini azalma oranı (0.0 - 1.0)."""
+        if not self.input_chars:
+            return 0.0
+        return 1 - self.output_chars / self.input_chars
+
+    def as_dict(self) -> dict:
+        return {
+            "input_segments": self.input_segments,
+            "output_segments": self.output_segments,
+            "input_chars": self.input_chars,
+            "output_chars": self.output_chars,
+            "token_reduction": round(self.token_reduction, 4),
+        }
+
+
+# Türkçe İ/ı: "İ".casefold() birleşik nokta (U+0307) bırakır, "ı" ise "I" ile
+# eşleşmez; karşılaştırmada ikisi de düz "i" sayılır
+_DOTTED_I = str.maketrans({"\u0307": None, "ı": "i"})
+
+
+def _norm(word: str) -> str:
+    return _WORD_STRIP.sub("", word).casefold().translate(_DOTTED_I)
+
+
+def _overlap(previous: list[str], current: list[str]) -> int:
+    """previous'ın sonu ile current'ın başı arasındaki en uzun kelime örtüşmesi."""
+    limit = min(len(previous), len(current), _MAX_OVERLAP_WORDS)
+    prev_norm = [_norm(w) for w in previous[-limit:]] if limit else []
+    cur_norm = [_norm(w) for w in current[:limit]]
+    for k in range(limit, 0, -1):
+        if prev_norm[-k:] == cur_norm[:k]:
+            return k
+    return 0
+
+
+def _dedupe(segments: Iterable[Segment], stats: NormalizationStats) -> Iterator[list]:
+    """Tekrarlanan kelimeleri çıkarır ve çakışan süreleri keser."""
+    pending: list | None = None  # [start_ms, end_ms, words]
+    history: list[str] = []
+
+    for start, duration, text in segments:
+        stats.input_segments += 1
+        stats.input_chars += len(text) + _LINE_PREFIX_CHARS
+        words = text.split()
+        if not words:
+            continue
+        end = start + duration
+
+        k = _overlap(history, words)
+        # Tek kelimelik örtüşme ancak zaman aralıkları da çakışıyorsa tekrar sayılır
+        if k == 1 and (pending is None or start >= pending[1]):
+            k = 0
+        new_words = words[k:]
+        if not new_words:
+            # Tamamen tekrar: yalnızca önceki parçanın süresini uzat
+            if pending is not None:
+                pending[1] = max(pending[1], end)
+            continue
+
+        if pending is not None:
+            pending[1] = min(pending[1], max(start, pending[0]))
+            yield pending
+        pending = [start, end, new_words]
+        history = (history + new_words)[-_MAX_OVERLAP_WORDS:]
+
+    if pending is not None:
+        yield pending
+
+
+def normalize_segments(
+    segments: Iterable[Segment],
+    max_segment_ms: int = 15000,
+    max_chars: int = 300,
+    stats: NormalizationStats | None = None,
+) -> Iterator[Segment]:
+    """Segmentleri tekilleştirip cümle düzeyinde birleştirerek üretir."""
+    stats = stats if stats is not None else NormalizationStats()
+    buffer: list[str] = []
+    buf_chars = 0
+    buf_start = buf_end = 0
+
+    def flush() -> Segment:
+        text = " ".join(buffer)
+        stats.output_segments += 1
+        stats.output_chars += len(text) + _LINE_PREFIX_CHARS
+        return buf_start, max(buf_end - buf_start, 0), text
+
+    for start, end, words in _dedupe(segments, stats):
+        chars = sum(len(w) + 1 for w in words)
+        if buffer and (
+            end - buf_start > max_segment_ms or buf_chars + chars > max_chars
+        ):
+            yield flush()
+            buffer = []
+        if buffer:
+            buf_end = max(buf_end, end)
+        else:
+            buf_start, buf_end, buf_chars = start, end, 0
+        buffer.extend(words)
+        buf_chars += chars
+        if _SENTENCE_END.search(buffer[-1]):
+            yield flush()
+            buffer = []
+
+    if buffer:
+        yield flush()
+
+
+def build_transcript(
+    segments: Iterable[Segment],
+    language: str,
+    normalize: bool = True,
+    max_segment_ms: int = 15000,
+) -> Transcript:
+    """
+    Segmentlerden (gerekirse normalize ederek) Transcript oluşturur.
+    Segmentler akış halinde tüketilir; ara liste oluşturulmaz.
+    """
+    if not normalize:
+        return Transcript.from_segments(segments, meta={"language": language})
+
+    stats = NormalizationStats()
+    transcript = Transcript.from_segments(
+        normalize_segments(segments, max_segment_ms=max_segment_ms, stats=stats)
+    )
+    transcript.meta = {"language": language, "normalization": stats.as_dict()}
+    return transcript
@@ -74,3 +74,127 @@ Bullet points: {bullet_points}
 Transcript: {transcript}
 
 """
+
+CHUNK_NOTES_PROMPT = """
+You are an expert YouTube video analyst. The following is PART {part} of {total} of a long video transcript.
+Each line has the format [mm:ss-mm:ss] text.
+
+Extract the informative content of this part as notes for a later summarization step.
+
+Instructions:
+- Write 4 to 8 short notes covering the main topics, arguments, findings, methods and numbers in this part.
+- After each note, copy 1 to 3 supporting transcript lines EXACTLY as they appear, including their [mm:ss-mm:ss] timestamp at the start of the line.
+- ⚠️ CRITICAL: Never change, merge or invent timestamps. Only copy lines that exist in this part.
+- Skip greetings, sponsorships and logistics.
+- Keep the original language of the transcript in the copied lines.
+
+Output format (plain text):
+NOTE: [one sentence]
+[mm:ss-mm:ss] copied transcript line
+[mm:ss-mm:ss] copied transcript line
+
+Transcript part:
+{transcript}
+
+"""
+
+DETAILED_SECTION_PROMPT = """
+ROLE
+You are an expert YouTube video analyst.
+
+INPUTS
+- bullet_point: ONE key bullet point (number {number}) summarizing part of the video
+- all_bullet_points: the full list of bullet points, for context only
+- transcript_excerpts: the transcript passages most relevant to this bullet point, with timestamps in format [mm:ss-mm:ss] text
+
+GOAL
+Generate ONE dedicated section for the given bullet point that:
+- Expands on the point with contextual detail from the transcript excerpts
+- Uses relevant direct quotes from the video (TRANSLATED to Turkish)
+- References EXACT timestamps for each quote from the excerpts - DO NOT make up timestamps!
+
+OUTPUT FORMAT (Markdown)
+
+**Madde #{number}: [Shortened version of the bullet point in Turkish, max 20 words]**
+
+Provide a detailed explanation of this point in line with the video's narrative flow.
+
+Support your explanation with direct quotes and timestamp references.
+⚠️ CRITICAL: Use ONLY the timestamps that appear in the transcript excerpts! Do not invent timestamps.
+Format quotes as: "[Turkish translated quote]" (mm:ss-mm:ss)
+
+**Bu madde videoda neden önemli?:**
+Why is this point important in the context of the video?
+How does it connect to other bullet points or ideas?
+
+RULES
+
+⚠️ CRITICAL: ALL OUTPUT MUST BE 100% IN TURKISH!
+⚠️ CRITICAL: ONLY use timestamps that exist in the transcript excerpts! Never invent or guess timestamps.
+- Output ONLY the section for bullet point #{number}, nothing else
+- Use **bold** for important terms or concepts
+- Stay accurate, objective, and faithful to the transcript
+- Explain technical terms on first use
+
+Bullet point #{number}: {bullet_point}
+All bullet points: {bullet_points}
+Transcript excerpts: {transcript}
+
+"""
+
+# Birleşik prompt çıktısında ana başlıkları detaylı özetten ayıran satır
+SUMMARY_DELIMITER = "===DETAY==="
+
+COMBINED_SUMMARY_PROMPT = """
+ROLE
+You are an expert YouTube video analyst.
+
+INPUT
+- transcript: Full transcript with timestamps in format [mm:ss-mm:ss] text
+
+Your answer has TWO parts, written in this exact order.
+
+PART 1 — BULLET POINTS
+Extract the core informational content, focusing on subject-matter insights and technical depth, not event logistics.
+ONLY return 5 to 7 bullet points that capture:
+• Main technical topics or themes
+• Key arguments or positions
+• Important findings or explanations
+• Highlighted methods, tools, or frameworks
+• Significant statistics, comparisons, or results
+- Each bullet starts with "• "
+- Each bullet point must be 15–25 words, a complete and standalone thought
+- Use parallel sentence structure and keep content order aligned with the video
+- Do NOT include any introductory or concluding phrases
+
+After the last bullet point, write a line containing ONLY:
+===DETAY===
+
+PART 2 — DETAILED SUMMARY
+For each bullet point from PART 1, in the same order, generate a dedicated section:
+
+**Madde #[number]: [Shortened version of the bullet point in Turkish, max 20 words]**
+
+Provide a detailed explanation of this point in line with the video's narrative flow.
+
+Support your explanation with direct quotes and timestamp references.
+⚠️ CRITICAL: Use ONLY the timestamps that appear in the transcript! Do not invent timestamps.
+Format quotes as: "[Turkish translated quote]" (mm:ss-mm:ss)
+
+**Bu madde videoda neden önemli?:**
+Why is this point important in the context of the video?
+How does it connect to other bullet points or ideas?
+
+RULES
+
+⚠️ CRITICAL: ALL OUTPUT MUST BE 100% IN TURKISH! Even if the transcript is in English, translate everything to Turkish.
+⚠️ CRITICAL: ONLY use timestamps that exist in the transcript! Never invent or guess timestamps.
+- Format: Markdown
+- Use **bold** for important terms or concepts
+- Do NOT include any introductory or concluding sections
+- Stay accurate, objective, and faithful to the transcript
+- Explain technical terms on first use
+
+Transcript: {transcript}
+
+"""
@@ -0,0 +1,50 @@
+"""
+Aynı anahtar için eş zamanlı gelen işleri tek bir çalıştırmada birleştirir.
+
+İlk çağrı işi başlatır; iş bitmeden aynı anahtarla gelen çağrılar aynı
+future'ı bekler ve aynı sonucu alır. İş, çağıranlardan bağımsız bir task
+olarak çalışır; ilk istemcinin bağlantısı kopsa bile diğerleri sonucu alır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(
+        self, key: str, func: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """
+        func'ı anahtar başına tek seferde çalıştırır.
+        Returns: (sonuç, paylaşıldı_mı) — ikinci değer, çağrının başka bir
+        isteğin başlattığı işe eklendiğini belirtir.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        self.leaders += 1
+        task = asyncio.ensure_future(func())
+        self._inflight[key] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task), False
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
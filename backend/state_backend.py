@@ -0,0 +1,376 @@
+"""
+Task durumları, sonuçlar ve rate-limit sayaçları için değiştirilebilir depo.
+
+- memory: Tek süreç için varsayılan (TaskStore + sözlük).
+- sqlite: Aynı makinedeki birden fazla uvicorn worker'ı ortak dosyayı kullanır.
+- redis:  Redis protokolünü (RESP) konuşan herhangi bir sunucu; birden fazla
+          makine aynı durumu paylaşır. Ek bağımlılık gerektirmez.
+
+STATE_BACKEND ve STATE_BACKEND_URL ortam değişkenleriyle seçilir.
+Metotlar senkron ve bloklayıcıdır (soket turu, SQLite kilidi); event
+loop'tan thread havuzu üzerinden çağrılmalıdır.
+"""
+
+from __future__ import annotations
+
+import json
+import select
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlparse
+
+from task_store import TaskStore
+
+_FINISHED_STATUSES = ("completed", "error")
+
+
+class StateBackend:
+    """Tüm backend'lerin uyguladığı arayüz."""
+
+    name = "base"
+
+    def get_task(self, task_id: str) -> dict | None:
+        raise NotImplementedError
+
+    def set_task(self, task_id: str, value: dict) -> None:
+        raise NotImplementedError
+
+    def hit_rate_limit(self, key: str, window: float, limit: int) -> bool:
+        """İsteği pencereye kaydeder; limit aşıldıysa kaydetmeden False döner."""
+        raise NotImplementedError
+
+    def task_count(self) -> int | None:
+        """Tutulan task sayısı; backend ucuza sayamıyorsa None."""
+        return None
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class MemoryStateBackend(StateBackend):
+    name = "memory"
+
+    def __init__(self, task_store: TaskStore):
+        self.tasks = task_store
+        self._rate_limit_store: dict[str, list[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def get_task(self, task_id: str) -> dict | None:
+        return self.tasks.get(task_id)
+
+    def set_task(self, task_id: str, value: dict) -> None:
+        self.tasks.set(task_id, value)
+
+    def hit_rate_limit(self, key: str, window: float, limit: int) -> bool:
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune >= window:
+                # Penceresi boşalan istemcilerin anahtarları silinir; aksi
+                # halde her IP için bir liste süreç boyunca kalır
+                self._last_prune = now
+                for stale in [
+                    k
+                    for k, v in self._rate_limit_store.items()
+                    if not v or now - v[-1] >= window
+                ]:
+                    del self._rate_limit_store[stale]
+            hits = [t for t in self._rate_limit_store[key] if now - t < window]
+            if len(hits) >= limit:
+                self._rate_limit_store[key] = hits
+                return False
+            hits.append(now)
+            self._rate_limit_store[key] = hits
+            return True
+
+    def task_count(self) -> int | None:
+        return len(self.tasks)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "rate_limit_keys": len(self._rate_limit_store),
+            **self.tasks.stats(),
+        }
+
+
+class SQLiteStateBackend(StateBackend):
+    """WAL modunda SQLite; süreçler arası kilitlemeyi SQLite üstlenir."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: Path, ttl_seconds: float = 6 * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._last_cleanup = 0.0
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " status TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS rate_hits (key TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS idx_rate_hits ON rate_hits (key, ts)")
+
+    def _db(self) -> sqlite3.Connection:
+        # Bağlantılar thread başına açılır; isolation_level=None ile
+        # işlemler BEGIN IMMEDIATE ile elle yönetilir.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            self._local.db = db
+        return db
+
+    def get_task(self, task_id: str) -> dict | None:
+        row = (
+            self._db()
+            .execute(
+                "SELECT value, status, updated_at FROM tasks WHERE task_id = ?",
+                (task_id,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        value, status, updated_at = row
+        # Redis'teki EX gibi: bitmiş veya takılı kalmış, TTL boyunca
+        # güncellenmemiş task'lar yok sayılır
+        if time.time() - updated_at >= self.ttl_seconds:
+            return None
+        return json.loads(value)
+
+    def set_task(self, task_id: str, value: dict) -> None:
+        now = time.time()
+        db = self._db()
+        db.execute(
+            "INSERT OR REPLACE INTO tasks (task_id, value, status, updated_at)"
+            " VALUES (?, ?, ?, ?)",
+            (task_id, json.dumps(value, ensure_ascii=False), value.get("status"), now),
+        )
+        if now - self._last_cleanup >= 60:
+            self._last_cleanup = now
+            db.execute(
+                "DELETE FROM tasks WHERE updated_at <= ?", (now - self.ttl_seconds,)
+            )
+
+    def hit_rate_limit(self, key: str, window: float, limit: int) -> bool:
+        now = time.time()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "DELETE FROM rate_hits WHERE key = ? AND ts <= ?", (key, now - window)
+            )
+            (count,) = db.execute(
+                "SELECT COUNT(*) FROM rate_hits WHERE key = ?", (key,)
+            ).fetchone()
+            allowed = count < limit
+            if allowed:
+                db.execute("INSERT INTO rate_hits (key, ts) VALUES (?, ?)", (key, now))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return allowed
+
+    def task_count(self) -> int | None:
+        (count,) = self._db().execute("SELECT COUNT(*) FROM tasks").fetchone()
+        return count
+
+    def stats(self) -> dict:
+        db = self._db()
+        by_status = dict(
+            db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        )
+        return {
+            "backend": self.name,
+            "path": str(self.db_path),
+            "by_status": by_status,
+            "entries": sum(by_status.values()),
+        }
+
+
+class RespClient:
+    """Redis serileştirme protokolü (RESP2) için küçük, thread-safe bir istemci."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._send_and_read(("AUTH", self.password))
+        if self.db:
+            self._send_and_read(("SELECT", self.db))
+
+    def _close(self) -> None:
+        try:
+            if self._sock is not None:
+                self._sock.close()
+        finally:
+            self._sock = None
+            self._file = None
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis bağlantısı kapandı")
+        prefix, rest = line[:1], line[1:-2]
+        if prefix == b"+":
+            return rest.decode("utf-8")
+        if prefix == b"-":
+            raise RuntimeError(f"Redis hatası: {rest.decode('utf-8')}")
+        if prefix == b":":
+            return int(rest)
+        if prefix == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RuntimeError(f"Beklenmeyen Redis yanıtı: {line!r}")
+
+    def _send_and_read(self, args):
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def _ensure_connected(self) -> None:
+        """Bağlantı yoksa veya boştayken sunucu kapattıysa yeniden bağlanır."""
+        if self._sock is not None:
+            # Boşta bekleyen bağlantıda okunacak bir şey olmamalı; okunabilir
+            # görünüyorsa sunucu kapatmıştır (EOF)
+            readable, _, _ = select.select([self._sock], [], [], 0)
+            if readable:
+                self._close()
+        if self._sock is None:
+            self._connect()
+
+    def execute(self, *args):
+        """
+        Tek komutu gönderir; bağlantı koparsa bir kez yeniden bağlanıp tekrar
+        dener. Yalnızca tekrarı zararsız komutlar (GET, SET, ZREM) için.
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    self._ensure_connected()
+                    return self._send_and_read(args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def pipeline(self, *commands):
+        """
+        Birden fazla komutu tek seferde gönderip yanıtları sırayla okur.
+        Komutlar gönderildikten sonra bağlantı koparsa tekrar gönderilmez:
+        MULTI bloğunun sunucuda uygulanıp uygulanmadığı bilinemez.
+        """
+        with self._lock:
+            self._ensure_connected()
+            try:
+                self._sock.sendall(b"".join(self._encode(c) for c in commands))
+                return [self._read_reply() for _ in commands]
+            except Exception:
+                # Yarım okunan yanıtlar sonraki komutlarla karışmasın
+                self._close()
+                raise
+
+
+class RedisStateBackend(StateBackend):
+    name = "redis"
+
+    def __init__(self, url: str, ttl_seconds: float = 6 * 3600, prefix: str = "ytsum:"):
+        self.client = RespClient(url)
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+
+    def get_task(self, task_id: str) -> dict | None:
+        value = self.client.execute("GET", f"{self.prefix}task:{task_id}")
+        return json.loads(value) if value is not None else None
+
+    def set_task(self, task_id: str, value: dict) -> None:
+        self.client.execute(
+            "SET",
+            f"{self.prefix}task:{task_id}",
+            json.dumps(value, ensure_ascii=False),
+            "EX",
+            self.ttl_seconds,
+        )
+
+    def hit_rate_limit(self, key: str, window: float, limit: int) -> bool:
+        # Kayan pencere: sorted set içinde zaman damgaları tutulur.
+        # İstek önce eklenir, limit aşıldıysa geri alınır.
+        now = time.time()
+        redis_key = f"{self.prefix}rate:{key}"
+        member = f"{now}:{uuid.uuid4().hex[:8]}"
+        replies = self.client.pipeline(
+            ("MULTI",),
+            ("ZREMRANGEBYSCORE", redis_key, "-inf", now - window),
+            ("ZADD", redis_key, now, member),
+            ("ZCARD", redis_key),
+            ("EXPIRE", redis_key, int(window) + 1),
+            ("EXEC",),
+        )
+        count = replies[-1][2]
+        if count > limit:
+            self.client.execute("ZREM", redis_key, member)
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "host": f"{self.client.host}:{self.client.port}",
+        }
+
+
+def create_state_backend(
+    kind: str, url: str | None, task_store: TaskStore, ttl_seconds: float
+) -> StateBackend:
+    """STATE_BACKEND değerine göre uygun backend'i oluşturur."""
+    kind = (kind or "memory").lower()
+    if kind == "memory":
+        return MemoryStateBackend(task_store)
+    if kind == "sqlite":
+        if not url:
+            raise ValueError("sqlite state backend için STATE_BACKEND_URL gerekli")
+        return SQLiteStateBackend(Path(url), ttl_seconds=ttl_seconds)
+    if kind == "redis":
+        return RedisStateBackend(url or "redis://localhost:6379/0", ttl_seconds)
+    raise ValueError(f"Bilinmeyen STATE_BACKEND: {kind}")
@@ -0,0 +1,229 @@
+"""
+Özet sonuç önbelleği.
+
+İki katmanlıdır: önde bellek içi bir LRU, arkada SQLite üzerinde kalıcı bir
+katman. Anahtar (video_id, transcript hash, model adı, prompt sürümü)
+bileşiminden türetilir; aynı video aynı prompt'larla tekrar özetlendiğinde
+transcript indirme ve Gemini çağrıları atlanır.
+
+Video → içerik anahtarı eşlemesi (takma ad) ayrı bir tabloda tutulur ve
+kayıt sınırlarına sayılmaz. Okumalar erişim zamanını hemen yazmaz; bir
+sonraki kayıtta toplu olarak güncellenir, disk LRU sırası buna göre kalır.
+Tüm metotlar senkrondur; event loop'tan thread havuzu üzerinden çağrılmalıdır.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def content_hash(*parts: str) -> str:
+    """Verilen metinlerin sıralı SHA-256 özetini döndürür."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SummaryCache:
+    """Bellek içi LRU + SQLite katmanlı, TTL ve boyut sınırlı özet önbelleği."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 5000,
+        ttl_seconds: float = 7 * 24 * 3600,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        # Takma ad → içerik anahtarı; içerik LRU'sundan ayrı sınırlanır
+        self._aliases: OrderedDict[str, str] = OrderedDict()
+        # Henüz diske yazılmamış erişim zamanları (anahtar → zaman)
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_accessed"
+            " ON summaries (accessed_at)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS aliases ("
+            " alias TEXT PRIMARY KEY,"
+            " key TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(
+        video_id: str, transcript_hash: str, model_name: str, prompt_version: str
+    ) -> str:
+        return content_hash(video_id, transcript_hash, model_name, prompt_version)
+
+    @staticmethod
+    def _video_key(video_id: str, model_name: str, prompt_version: str) -> str:
+        # Transcript indirilmeden önce bakılabilmesi için video → içerik anahtarı
+        return "video:" + content_hash(video_id, model_name, prompt_version)
+
+    def get(self, key: str, record: bool = True) -> dict | None:
+        """
+        Anahtara ait girdiyi döndürür; süresi dolmuşsa veya yoksa None.
+        record=False ise hit/miss sayaçlarına yansımaz.
+        """
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                created_at, value = item
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._touched[key] = now
+                    if record:
+                        self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT value, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] >= self.ttl_seconds:
+                if row is not None:
+                    self._db.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                    self._db.commit()
+                if record:
+                    self._counters["misses"] += 1
+                return None
+
+            self._touched[key] = now
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+            if record:
+                self._counters["disk_hits"] += 1
+            return value
+
+    def get_latest(
+        self, video_id: str, model_name: str, prompt_version: str
+    ) -> dict | None:
+        """Video için en son kaydedilen özeti transcript'e ihtiyaç duymadan bulur."""
+        alias = self._video_key(video_id, model_name, prompt_version)
+        with self._lock:
+            key = self._aliases.get(alias)
+            if key is None:
+                row = self._db.execute(
+                    "SELECT key FROM aliases WHERE alias = ?", (alias,)
+                ).fetchone()
+                if row is None:
+                    return None
+                key = row[0]
+                self._remember_alias(alias, key)
+            else:
+                self._aliases.move_to_end(alias)
+        return self.get(key)
+
+    def put(
+        self,
+        video_id: str,
+        transcript_hash: str,
+        model_name: str,
+        prompt_version: str,
+        value: dict,
+    ) -> None:
+        """Özeti hem içerik anahtarıyla hem de video takma adıyla kaydeder."""
+        key = self.make_key(video_id, transcript_hash, model_name, prompt_version)
+        alias_key = self._video_key(video_id, model_name, prompt_version)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries"
+                " (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO aliases (alias, key) VALUES (?, ?)",
+                (alias_key, key),
+            )
+            self._remember(key, now, value)
+            self._remember_alias(alias_key, key)
+            self._touched.pop(key, None)
+            self._flush_touched()
+            self._counters["writes"] += 1
+            self._evict_disk(now)
+            self._db.commit()
+
+    def _remember(self, key: str, created_at: float, value: dict) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _remember_alias(self, alias: str, key: str) -> None:
+        self._aliases[alias] = key
+        self._aliases.move_to_end(alias)
+        while len(self._aliases) > self.max_memory_entries:
+            self._aliases.popitem(last=False)
+
+    def _flush_touched(self) -> None:
+        """Biriken erişim zamanlarını tek seferde diske yazar."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE summaries SET accessed_at = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict_disk(self, now: float) -> None:
+        """Süresi dolanları ve en az kullanılan fazlalıkları diskten siler."""
+        expired = self._db.execute(
+            "DELETE FROM summaries WHERE created_at <= ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self._db.execute(
+            "DELETE FROM summaries WHERE key IN ("
+            " SELECT key FROM summaries ORDER BY accessed_at DESC"
+            " LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        ).rowcount
+        if expired > 0 or overflow > 0:
+            self._db.execute(
+                "DELETE FROM aliases WHERE key NOT IN (SELECT key FROM summaries)"
+            )
+        self._counters["evictions"] += max(expired, 0) + max(overflow, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            disk_entries = self._db.execute(
+                "SELECT COUNT(*) FROM summaries"
+            ).fetchone()[0]
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
@@ -0,0 +1,237 @@
+"""
+Detaylı özet task'larının durum ve sonuçlarını tutan sınırlı depo.
+
+Bellekte en fazla max_entries task ve yaklaşık max_bytes veri tutulur.
+Tamamlanan/hatalı task'lar TTL dolunca silinir; processing_ttl_seconds
+boyunca güncellenmeyen (takılı kalmış) işlenen task'lar da düşürülür.
+Sınırlar aşıldığında en eski bitmiş task'lar (spill_dir verildiyse) diske
+taşınır; get() çağrısında diskteki sonuç şeffaf biçimde geri okunur.
+
+Bitmiş ve işlenen task'lar güncellenme sırasıyla ayrı indekslerde tutulur;
+temizlik yalnızca baştaki eski kayıtlara bakar. Diske yazma ve disk
+temizliği çağıranı bekletmeden tek bir yazıcı thread'de yapılır.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_FINISHED_STATUSES = ("completed", "error")
+_SAFE_TASK_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _estimate_size(value: dict) -> int:
+    """Task değerinin bellekteki yaklaşık boyutu (byte)."""
+    size = sys.getsizeof(value)
+    for k, v in value.items():
+        size += sys.getsizeof(k) + sys.getsizeof(v)
+    return size
+
+
+class TaskStore:
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 6 * 3600,
+        spill_dir: Path | None = None,
+        processing_ttl_seconds: float | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.processing_ttl_seconds = processing_ttl_seconds or ttl_seconds
+        self.spill_dir = spill_dir
+        self._writer: ThreadPoolExecutor | None = None
+        if spill_dir is not None:
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            self._writer = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="task-spill"
+            )
+
+        # task_id -> (güncellenme zamanı, değer, tahmini boyut)
+        self._entries: dict[str, tuple[float, dict, int]] = {}
+        # Güncellenme sırasına göre bitmiş ve işlenen task_id'ler
+        self._finished: OrderedDict[str, None] = OrderedDict()
+        self._pending: OrderedDict[str, None] = OrderedDict()
+        # Diske yazılmayı bekleyen sonuçlar; yazılana kadar buradan okunur
+        self._spilling: dict[str, dict] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._last_disk_sweep = 0.0
+        self._spilled_files = 0
+        self._counters = {"expired": 0, "spilled": 0, "reloaded": 0, "dropped": 0}
+
+    def _spill_path(self, task_id: str) -> Path | None:
+        if self.spill_dir is None or not _SAFE_TASK_ID.match(task_id):
+            return None
+        return self.spill_dir / f"{task_id}.json"
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+    def __getitem__(self, task_id: str) -> dict:
+        value = self.get(task_id)
+        if value is None:
+            raise KeyError(task_id)
+        return value
+
+    def __setitem__(self, task_id: str, value: dict) -> None:
+        self.set(task_id, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, task_id: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(task_id)
+            if item is not None:
+                updated_at, value, _ = item
+                if not self._is_expired(updated_at, value, now):
+                    return value
+                self._remove(task_id)
+                self._counters["expired"] += 1
+                return None
+            value = self._spilling.get(task_id)
+            if value is not None:
+                return value
+
+        path = self._spill_path(task_id)
+        if path is None:
+            return None
+        try:
+            if now - path.stat().st_mtime >= self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            value = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._counters["reloaded"] += 1
+        return value
+
+    def set(self, task_id: str, value: dict) -> None:
+        now = time.time()
+        size = _estimate_size(value)
+        with self._lock:
+            if task_id in self._entries:
+                self._remove(task_id)
+            self._entries[task_id] = (now, value, size)
+            if value.get("status") in _FINISHED_STATUSES:
+                self._finished[task_id] = None
+            else:
+                self._pending[task_id] = None
+            self._bytes += size
+            spill = self._evict(now)
+            sweep = self._writer is not None and now - self._last_disk_sweep >= 60
+            if sweep:
+                self._last_disk_sweep = now
+        if spill:
+            self._writer.submit(self._spill, spill)
+        if sweep:
+            self._writer.submit(self._sweep_disk, now)
+
+    def _is_expired(self, updated_at: float, value: dict, now: float) -> bool:
+        if value.get("status") in _FINISHED_STATUSES:
+            return now - updated_at >= self.ttl_seconds
+        return now - updated_at >= self.processing_ttl_seconds
+
+    def _remove(self, task_id: str) -> dict:
+        _, value, size = self._entries.pop(task_id)
+        self._finished.pop(task_id, None)
+        self._pending.pop(task_id, None)
+        self._bytes -= size
+        return value
+
+    def _expire_oldest(self, index: OrderedDict, ttl: float, now: float) -> None:
+        while index:
+            task_id = next(iter(index))
+            if now - self._entries[task_id][0] < ttl:
+                break
+            self._remove(task_id)
+            self._counters["expired"] += 1
+
+    def _evict(self, now: float) -> list[tuple[str, dict]]:
+        """Eski task'ları düşürür; diske taşınacakları (task_id, değer) döndürür."""
+        # 1) Süresi dolmuş bitmiş ve takılı kalmış işlenen task'lar. İndeksler
+        #    güncellenme sırasında olduğundan yalnızca baştakilere bakılır.
+        self._expire_oldest(self._finished, self.ttl_seconds, now)
+        self._expire_oldest(self._pending, self.processing_ttl_seconds, now)
+
+        # 2) Sınırlar aşıldıysa en eski bitmiş task'lar diske taşınır veya atılır.
+        #    İşlenmekte olan task'lar küçüktür ve kaybolmamaları gerekir.
+        spill = []
+        while self._finished and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            task_id = next(iter(self._finished))
+            value = self._remove(task_id)
+            if self._spill_path(task_id) is not None:
+                self._spilling[task_id] = value
+                spill.append((task_id, value))
+            else:
+                self._counters["dropped"] += 1
+        return spill
+
+    def _spill(self, items: list[tuple[str, dict]]) -> None:
+        """Yazıcı thread'de çalışır; sonuçları diske yazar."""
+        for task_id, value in items:
+            path = self._spill_path(task_id)
+            try:
+                existed = path.exists()
+                path.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+                written = True
+            except OSError as e:
+                logger.warning("Task diske yazılamadı (%s): %s", task_id, e)
+                written = False
+            with self._lock:
+                # Bu arada task yeniden yazıldıysa bellekteki sürüm geçerlidir
+                if self._spilling.get(task_id) is value:
+                    del self._spilling[task_id]
+                if written:
+                    self._counters["spilled"] += 1
+                    self._spilled_files += 0 if existed else 1
+                else:
+                    self._counters["dropped"] += 1
+
+    def _sweep_disk(self, now: float) -> None:
+        """Diskteki süresi dolmuş sonuçları temizler (yazıcı thread'de)."""
+        remaining = 0
+        for path in self.spill_dir.glob("*.json"):
+            try:
+                if now - path.stat().st_mtime >= self.ttl_seconds:
+                    path.unlink(missing_ok=True)
+                else:
+                    remaining += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._spilled_files = remaining
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses: dict[str, int] = {}
+            for _, value, _ in self._entries.values():
+                status = value.get("status", "unknown")
+                statuses[status] = statuses.get(status, 0) + 1
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "by_status": statuses,
+                "spilled_on_disk": self._spilled_files,
+                "spill_pending": len(self._spilling),
+                **self._counters,
+            }
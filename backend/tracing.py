@@ -0,0 +1,348 @@
+"""
+İstek başına hafif, süreç içi izleme (tracing).
+
+- trace() bir iz başlatır; span() aşamaları iç içe ölçer. Geçerli iz ve
+  span contextvars ile taşınır, asyncio.create_task ile başlatılan işler
+  izi kendiliğinden devralır. Aktif iz yoksa span() hiçbir şey yapmaz.
+- Async generator'lar contextvar değiştirmemelidir (adımlar farklı
+  context'lerde çalışabilir); bunlar için record_span() biten aşamayı
+  sonradan ekler.
+- Biten izin span'leri SpanRecorder ile JSON satırları olarak yazılır;
+  Trace.server_timing() aynı süreleri Server-Timing başlığına çevirir.
+- SlowRequestProfiler, izlenen istek sürerken tüm thread'lerin yığınlarını
+  örnekler; istek eşiği aşarsa en sık görülen yığınlar kök span'e eklenir.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TextIO
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_UNSAFE = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "span_id",
+        "parent_id",
+        "start",
+        "_started",
+        "duration",
+        "attrs",
+    )
+
+    def __init__(self, name: str, parent_id: str | None, attrs: dict):
+        self.name = name
+        self.span_id = _new_id()
+        self.parent_id = parent_id
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration: float | None = None
+        self.attrs = attrs
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._started
+
+    def elapsed(self) -> float:
+        if self.duration is not None:
+            return self.duration
+        return time.perf_counter() - self._started
+
+
+class Trace:
+    def __init__(self, name: str, trace_id: str | None = None, **attrs):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.root = Span(name, None, attrs)
+        self.spans: list[Span] = []
+
+    def server_timing(self) -> str:
+        """Aynı adlı span'lerin toplam süreleriyle Server-Timing başlık değeri."""
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            name = _TOKEN_UNSAFE.sub("_", span.name)
+            totals[name] = totals.get(name, 0.0) + span.elapsed()
+        totals["total"] = self.root.elapsed()
+        return ", ".join(f"{name};dur={ms * 1000:.1f}" for name, ms in totals.items())
+
+    def records(self) -> list[dict]:
+        return [
+            {
+                "type": "span",
+                "trace_id": self.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "start": round(span.start, 6),
+                "duration_ms": round(span.elapsed() * 1000, 3),
+                **({"attrs": span.attrs} if span.attrs else {}),
+            }
+            for span in (self.root, *self.spans)
+        ]
+
+
+_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+_span: ContextVar[Span | None] = ContextVar("span", default=None)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+def current_trace_id() -> str | None:
+    trace_ = _trace.get()
+    return trace_.trace_id if trace_ is not None else None
+
+
+@contextmanager
+def trace(name: str, trace_id: str | None = None, **attrs):
+    """
+    Yeni bir iz başlatır. trace_id verilirse (ör. arka plan işinde isteğin
+    izi) span kayıtları aynı iz kimliğiyle yazılır.
+    """
+    trace_ = Trace(name, trace_id, **attrs)
+    parent = _span.get()
+    if trace_id is not None and parent is not None:
+        trace_.root.parent_id = parent.span_id
+    trace_token = _trace.set(trace_)
+    span_token = _span.set(trace_.root)
+    try:
+        yield trace_
+    except BaseException as e:
+        trace_.root.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _span.reset(span_token)
+        _trace.reset(trace_token)
+        trace_.root.finish()
+        recorder.emit(trace_.records())
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Aktif iz içinde bir aşamayı ölçer."""
+    trace_ = _trace.get()
+    if trace_ is None:
+        yield None
+        return
+    parent = _span.get()
+    span_ = Span(name, parent.span_id if parent else trace_.root.span_id, attrs)
+    token = _span.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _span.reset(token)
+        span_.finish()
+        trace_.spans.append(span_)
+
+
+def record_span(name: str, duration: float, ended_before: float = 0.0, **attrs) -> None:
+    """
+    ended_before saniye önce biten, duration saniye süren bir aşamayı aktif
+    ize ekler (ör. alt süreçte ölçülen süreler).
+    """
+    trace_ = _trace.get()
+    if trace_ is None:
+        return
+    parent = _span.get() or trace_.root
+    span_ = Span(name, parent.span_id, attrs)
+    span_.start -= duration + ended_before
+    span_.duration = duration
+    trace_.spans.append(span_)
+
+
+class SpanRecorder:
+    """Span kayıtlarını ayrı bir thread'de JSON satırları olarak yazar."""
+
+    def __init__(self, max_pending: int = 10_000):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._stream: TextIO | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def configure(self, path: str | None) -> None:
+        """path boşsa kayıtlar stdout'a yazılır."""
+        with self._lock:
+            self._stream = open(path, "a", encoding="utf-8") if path else sys.stdout
+
+    def emit(self, records: list[dict]) -> None:
+        if self._stream is None:
+            return
+        try:
+            self._queue.put_nowait(records)
+        except queue.Full:
+            self.dropped += len(records)
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="span-recorder", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            records = self._queue.get()
+            lines = "".join(
+                json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records
+            )
+            try:
+                self._stream.write(lines)
+                self._stream.flush()
+            except Exception as e:
+                self.dropped += len(records)
+                logger.warning("Span kaydı yazılamadı: %s", e)
+
+
+recorder = SpanRecorder()
+
+# Boşta bekleyen thread'ler (event loop seçicisi, havuz kuyruğu) örneklenmez
+_IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+
+class SlowRequestProfiler:
+    """
+    İzlenen istekler sürerken interval aralıklarla tüm thread'lerin
+    yığınlarını örnekler. Örnekleme thread'i yalnızca aktif istek varken
+    çalışır. Eşiği aşan isteğin en sık yığınları "katlanmış" (folded)
+    biçimde, örnek sayısıyla döner.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        interval: float = 0.01,
+        max_stacks: int = 20,
+        max_depth: int = 40,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self._active: list[Counter] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.captured = 0
+
+    def begin(self) -> Counter:
+        samples: Counter = Counter()
+        with self._lock:
+            self._active.append(samples)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="slow-request-profiler", daemon=True
+                )
+                self._thread.start()
+        return samples
+
+    def end(self, samples: Counter, duration: float) -> list[str] | None:
+        with self._lock:
+            self._active.remove(samples)
+        if duration < self.threshold or not samples:
+            return None
+        self.captured += 1
+        return [
+            f"{stack} {count}" for stack, count in samples.most_common(self.max_stacks)
+        ]
+
+    def _fold(self, frame) -> str | None:
+        if os.path.basename(frame.f_code.co_filename) in _IDLE_MODULES:
+            return None
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+            )
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                active = list(self._active)
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                folded = self._fold(frame)
+                if folded is None:
+                    continue
+                key = f"{names.get(ident, ident)};{folded}"
+                for samples in active:
+                    samples[key] += 1
+            time.sleep(self.interval)
+
+
+class TracingMiddleware:
+    """
+    paths ile başlayan HTTP istekleri için iz başlatan ASGI middleware'i.
+    Yanıt başlarken o ana kadarki span'ler Server-Timing başlığına yazılır;
+    akış yanıtlarında sonraki aşamalar yalnızca span kayıtlarında görünür.
+    """
+
+    def __init__(
+        self,
+        app,
+        paths: tuple[str, ...] = ("/",),
+        profiler: SlowRequestProfiler | None = None,
+    ):
+        self.app = app
+        self.paths = paths
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        with trace(
+            f"{scope['method']} {scope['path']}",
+            method=scope["method"],
+            path=scope["path"],
+        ) as trace_:
+            samples = self.profiler.begin() if self.profiler else None
+
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    trace_.root.attrs["status"] = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append(
+                        (b"server-timing", trace_.server_timing().encode("latin-1"))
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                if samples is not None:
+                    stacks = self.profiler.end(samples, trace_.root.elapsed())
+                    if stacks:
+                        trace_.root.attrs["profile"] = stacks
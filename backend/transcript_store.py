@@ -0,0 +1,334 @@
+"""
+Transcript'lerin kompakt, sütunlu saklanması.
+
+Her transcript; başlangıç (ms), süre (ms), metin offset'i ve metin uzunluğu
+dizileri ile tek bir UTF-8 metin blob'undan oluşur. Aynı metne sahip
+satırlar blob'da tek kez tutulur (interning). Diske yazılan dosya okunurken
+memory-map edilir; prompt'a giden "[mm:ss-mm:ss] metin" satırları ancak
+render() çağrıldığında üretilir.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# Dosya düzeni (little-endian):
+#   magic(4) | version(u16) | reserved(u16) | count(u32) | blob_len(u32) | meta_len(u32)
+#   start_ms[count] | duration_ms[count] | text_offset[count] | text_length[count]
+#   meta (JSON) | blob (UTF-8)
+_MAGIC = b"YTTR"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIII")
+_COLUMNS = ("start_ms", "duration_ms", "text_offset", "text_length")
+
+Segment = tuple[int, int, str]
+
+
+def format_timestamp(seconds: float) -> str:
+    """Saniyeyi mm:ss formatına çevirir"""
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def _as_uint32(view: memoryview) -> memoryview | array:
+    """Little-endian u32 verisini host sırasına göre okunabilir hale getirir."""
+    if sys.byteorder == "little":
+        return view.cast("I")
+    arr = array("I", view.tobytes())
+    arr.byteswap()
+    return arr
+
+
+class Transcript:
+    """Sütunlu transcript gösterimi. Diziler array veya mmap üzerindeki görünümdür."""
+
+    __slots__ = (
+        "start_ms",
+        "duration_ms",
+        "text_offset",
+        "text_length",
+        "blob",
+        "meta",
+        "_mmap",
+    )
+
+    def __init__(
+        self, start_ms, duration_ms, text_offset, text_length, blob, meta=None
+    ):
+        self.start_ms = start_ms
+        self.duration_ms = duration_ms
+        self.text_offset = text_offset
+        self.text_length = text_length
+        self.blob = blob
+        self.meta = meta or {}
+        self._mmap = None
+
+    @classmethod
+    def from_segments(
+        cls, segments: Iterable[Segment], meta: dict | None = None
+    ) -> "Transcript":
+        """(start_ms, duration_ms, text) üçlülerinden transcript oluşturur."""
+        columns = [array("I") for _ in _COLUMNS]
+        start_ms, duration_ms, text_offset, text_length = columns
+        blob = bytearray()
+        interned: dict[str, tuple[int, int]] = {}
+
+        for start, duration, text in segments:
+            # Satır içi yeni satırlar prompt'taki satır yapısını bozmasın
+            text = " ".join(text.split())
+            if not text:
+                continue
+            span = interned.get(text)
+            if span is None:
+                encoded = text.encode("utf-8")
+                span = (len(blob), len(encoded))
+                blob += encoded
+                interned[text] = span
+            start_ms.append(max(int(start), 0))
+            duration_ms.append(max(int(duration), 0))
+            text_offset.append(span[0])
+            text_length.append(span[1])
+
+        return cls(start_ms, duration_ms, text_offset, text_length, bytes(blob), meta)
+
+    def __len__(self) -> int:
+        return len(self.start_ms)
+
+    def text_at(self, index: int) -> str:
+        offset = self.text_offset[index]
+        return bytes(self.blob[offset : offset + self.text_length[index]]).decode(
+            "utf-8"
+        )
+
+    def segments(self) -> Iterator[Segment]:
+        for i in range(len(self)):
+            yield self.start_ms[i], self.duration_ms[i], self.text_at(i)
+
+    def lines(self) -> Iterator[str]:
+        """Prompt'ta kullanılan "[mm:ss-mm:ss] metin" satırlarını üretir."""
+        for start, duration, text in self.segments():
+            yield (
+                f"[{format_timestamp(start / 1000)}-"
+                f"{format_timestamp((start + duration) / 1000)}] {text}"
+            )
+
+    def render(self) -> str:
+        return "\n".join(self.lines())
+
+    @property
+    def digest(self) -> str:
+        """Transcript içeriğinin SHA-256 özeti (önbellek anahtarları için)."""
+        h = hashlib.sha256()
+        for column in (
+            self.start_ms,
+            self.duration_ms,
+            self.text_offset,
+            self.text_length,
+        ):
+            h.update(bytes(column))
+        h.update(bytes(self.blob))
+        return h.hexdigest()
+
+    @property
+    def nbytes(self) -> int:
+        """Sütunlar ve blob için kullanılan toplam byte."""
+        return len(self) * 4 * len(_COLUMNS) + len(self.blob)
+
+    def to_bytes(self) -> bytes:
+        meta = json.dumps(self.meta, ensure_ascii=False).encode("utf-8")
+        parts = [
+            _HEADER.pack(_MAGIC, _VERSION, 0, len(self), len(self.blob), len(meta))
+        ]
+        for column in (
+            self.start_ms,
+            self.duration_ms,
+            self.text_offset,
+            self.text_length,
+        ):
+            arr = array("I", column)
+            if sys.byteorder != "little":
+                arr.byteswap()
+            parts.append(arr.tobytes())
+        parts.append(meta)
+        parts.append(bytes(self.blob))
+        return b"".join(parts)
+
+    @classmethod
+    def from_mapped(cls, mapped: mmap.mmap) -> "Transcript":
+        """mmap edilmiş dosyadan kopyalamadan transcript görünümü oluşturur."""
+        view = memoryview(mapped)
+        magic, version, _, count, blob_len, meta_len = _HEADER.unpack_from(view, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Geçersiz transcript dosyası")
+
+        pos = _HEADER.size
+        columns = []
+        for _ in _COLUMNS:
+            columns.append(_as_uint32(view[pos : pos + count * 4]))
+            pos += count * 4
+        meta = json.loads(bytes(view[pos : pos + meta_len]).decode("utf-8"))
+        pos += meta_len
+        blob = view[pos : pos + blob_len]
+
+        transcript = cls(*columns, blob, meta)
+        transcript._mmap = mapped
+        return transcript
+
+
+class TranscriptStore:
+    """
+    Transcript'leri video_id başına bir dosya olarak diskte tutar.
+
+    Dosyalar bellekteki bir LRU indeksiyle izlenir; toplam boyut ve kayıt
+    sayısı bu indeksten tutulur, stats() dizini taramaz. Sınır aşılınca en
+    az kullanılan dosyalar silinir. Dizin sweep_interval saniyede bir
+    yeniden taranır: süresi dolanlar silinir, başka süreçlerin yazdığı
+    dosyalar indekse eklenir.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_entries: int = 10000,
+        sweep_interval: float = 600,
+    ):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # video_id → (boyut, yazılma zamanı); sıra en az kullanılandan başlar
+        self._index: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.sweep()
+
+    def _path(self, video_id: str) -> Path:
+        return self.directory / f"{video_id}.ytt"
+
+    def _forget(self, video_id: str) -> None:
+        item = self._index.pop(video_id, None)
+        if item is not None:
+            self._bytes -= item[0]
+
+    def _remove(self, video_id: str) -> None:
+        self._forget(video_id)
+        self._path(video_id).unlink(missing_ok=True)
+
+    def _enforce_bounds(self) -> None:
+        while self._index and (
+            len(self._index) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            video_id = next(iter(self._index))
+            self._remove(video_id)
+            self.evictions += 1
+
+    def sweep(self) -> None:
+        """Dizini tarayıp indeksi yeniler, süresi dolanları ve fazlalıkları siler."""
+        now = time.time()
+        with self._lock:
+            self._last_sweep = now
+            found: dict[str, tuple[int, float]] = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if entry.name.endswith(".tmp"):
+                        # Yarıda kalmış yazımlar
+                        if now - st.st_mtime >= self.sweep_interval:
+                            Path(entry.path).unlink(missing_ok=True)
+                    elif entry.name.endswith(".ytt"):
+                        found[entry.name[:-4]] = (st.st_size, st.st_mtime)
+
+            for video_id in list(self._index):
+                if video_id not in found:
+                    self._forget(video_id)
+            # Yeni bulunanlar yazılma sırasıyla en eski kullanılanlar arasına girer
+            for video_id, item in sorted(
+                found.items(), key=lambda kv: kv[1][1], reverse=True
+            ):
+                if video_id not in self._index:
+                    self._index[video_id] = item
+                    self._index.move_to_end(video_id, last=False)
+                    self._bytes += item[0]
+            for video_id, (_, written_at) in list(self._index.items()):
+                if now - written_at >= self.ttl_seconds:
+                    self._remove(video_id)
+                    self.evictions += 1
+            self._enforce_bounds()
+
+    def _maybe_sweep(self) -> None:
+        if time.time() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def get(self, video_id: str) -> Transcript | None:
+        self._maybe_sweep()
+        path = self._path(video_id)
+        try:
+            if time.time() - path.stat().st_mtime >= self.ttl_seconds:
+                with self._lock:
+                    self._remove(video_id)
+                self.misses += 1
+                return None
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            transcript = Transcript.from_mapped(mapped)
+        except (OSError, ValueError):
+            with self._lock:
+                self._forget(video_id)
+            self.misses += 1
+            return None
+        with self._lock:
+            if video_id in self._index:
+                self._index.move_to_end(video_id)
+        self.hits += 1
+        return transcript
+
+    def put(self, video_id: str, transcript: Transcript) -> None:
+        """Dosyayı önce geçici isimle yazar, sonra atomik olarak yerine taşır."""
+        self._maybe_sweep()
+        data = transcript.to_bytes()
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, self._path(video_id))
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._forget(video_id)
+            self._index[video_id] = (len(data), time.time())
+            self._bytes += len(data)
+            self._enforce_bounds()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._index),
+            "disk_bytes": self._bytes,
+        }
@@ -0,0 +1,221 @@
+"""
+YouTube Data API video detayları için önbellek, toplu sorgu ve kota sayacı.
+
+- Detaylar TTL süresince bellekte tutulur (LRU). Süresi dolan tekil kayıtlar
+  ETag ile (If-None-Match) yeniden doğrulanır; 304 dönerse eski veri
+  tazelenmiş sayılır.
+- Bulunamayan (silinmiş, gizli, geçersiz) kimlikler negative_ttl_seconds
+  boyunca "yok" olarak tutulur; tekrar eden istekler kota harcamaz.
+- get_many() eksik/eskimiş kimlikleri videos().list ile 50'lik gruplar
+  halinde ister; her çağrı ne kadar kimlik içerirse içersin 1 kota birimidir.
+- Harcanan kota birimleri, YouTube'un sıfırlama saatine (Pasifik saatiyle
+  gece yarısı) göre günlük olarak sayılır.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:  # tzdata yoksa UTC'ye göre sayılır
+    _QUOTA_TZ = timezone.utc
+
+MAX_IDS_PER_CALL = 50
+# videos().list çağrısının kota maliyeti
+LIST_COST = 1
+_PARTS = "snippet,contentDetails,statistics"
+
+
+def parse_video(video: dict) -> dict:
+    """videos().list öğesini API yanıt biçimine dönüştürür."""
+    return {
+        "title": video["snippet"]["title"],
+        "description": video["snippet"]["description"],
+        "thumbnail": video["snippet"]["thumbnails"]["high"]["url"],
+        "duration": video["contentDetails"]["duration"],
+        "language": video["snippet"].get("defaultAudioLanguage", "Bilinmiyor"),
+        "has_captions": video["contentDetails"]["caption"] == "true",
+        "view_count": video["statistics"].get("viewCount", "0"),
+        "like_count": video["statistics"].get("likeCount", "0"),
+        "channel_title": video["snippet"]["channelTitle"],
+        "published_at": video["snippet"]["publishedAt"],
+    }
+
+
+class QuotaCounter:
+    """Günlük YouTube Data API kota kullanımı."""
+
+    def __init__(self, daily_budget: int = 10_000):
+        self.daily_budget = daily_budget
+        self._day = self._today()
+        self._used = 0
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(_QUOTA_TZ).date().isoformat()
+
+    def add(self, units: int) -> None:
+        with self._lock:
+            today = self._today()
+            if today != self._day:
+                self._day, self._used, self._calls = today, 0, 0
+            self._used += units
+            self._calls += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            used = self._used if self._today() == self._day else 0
+            return {
+                "day": self._today(),
+                "units_used": used,
+                "daily_budget": self.daily_budget,
+                "remaining": self.daily_budget - used,
+                "calls": self._calls if used else 0,
+            }
+
+
+class VideoDetailsService:
+    def __init__(
+        self,
+        client_factory: Callable[[], object],
+        ttl_seconds: float = 3600,
+        max_entries: int = 5000,
+        daily_quota: int = 10_000,
+        negative_ttl_seconds: float = 300,
+    ):
+        self.client_factory = client_factory
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.quota = QuotaCounter(daily_quota)
+
+        # video_id -> (alınma zamanı, yanıt etag'i, detaylar); video yoksa None
+        self._entries: OrderedDict[str, tuple[float, str | None, dict | None]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "refetched": 0,
+        }
+
+    def _lookup(self, video_id: str) -> tuple[float, str | None, dict | None] | None:
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is not None:
+                self._entries.move_to_end(video_id)
+            return entry
+
+    def _store(self, video_id: str, etag: str | None, details: dict | None) -> None:
+        with self._lock:
+            self._entries[video_id] = (time.time(), etag, details)
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _is_fresh(self, entry) -> bool:
+        ttl = self.ttl_seconds if entry[2] is not None else self.negative_ttl_seconds
+        return time.time() - entry[0] < ttl
+
+    def _hit(self, entry) -> dict | None:
+        self._count("hits" if entry[2] is not None else "negative_hits")
+        return entry[2]
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, video_id: str) -> dict | None:
+        """Tek video için detaylar; video yoksa None."""
+        entry = self._lookup(video_id)
+        if entry is not None and self._is_fresh(entry):
+            return self._hit(entry)
+
+        if entry is not None and entry[1]:
+            request = self.client_factory().videos().list(part=_PARTS, id=video_id)
+            request.headers["If-None-Match"] = entry[1]
+            self.quota.add(LIST_COST)
+            try:
+                response = request.execute()
+            except Exception as e:
+                if getattr(getattr(e, "resp", None), "status", None) != 304:
+                    raise
+                self._count("revalidated")
+                self._store(video_id, entry[1], entry[2])
+                return entry[2]
+            self._count("refetched")
+            return self._store_response(video_id, response)
+
+        self._count("misses")
+        response = self._list([video_id])
+        return self._store_response(video_id, response)
+
+    def _store_response(self, video_id: str, response: dict) -> dict | None:
+        items = response.get("items") or []
+        if not items:
+            self._store(video_id, None, None)
+            return None
+        details = parse_video(items[0])
+        self._store(video_id, response.get("etag"), details)
+        return details
+
+    def _list(self, video_ids: list[str]) -> dict:
+        self.quota.add(LIST_COST)
+        return (
+            self.client_factory()
+            .videos()
+            .list(part=_PARTS, id=",".join(video_ids))
+            .execute()
+        )
+
+    def get_many(self, video_ids: list[str]) -> dict[str, dict | None]:
+        """
+        Birden fazla video için detaylar. Önbellekte taze olmayanlar
+        50'lik gruplar halinde tek çağrıda istenir.
+        """
+        results: dict[str, dict | None] = {}
+        missing: list[str] = []
+        for video_id in dict.fromkeys(video_ids):
+            entry = self._lookup(video_id)
+            if entry is not None and self._is_fresh(entry):
+                results[video_id] = self._hit(entry)
+            else:
+                self._count("misses")
+                missing.append(video_id)
+
+        for start in range(0, len(missing), MAX_IDS_PER_CALL):
+            batch = missing[start : start + MAX_IDS_PER_CALL]
+            response = self._list(batch)
+            for item in response.get("items") or []:
+                details = parse_video(item)
+                # Toplu yanıtın etag'i tek video için kullanılamaz
+                self._store(item["id"], None, details)
+                results[item["id"]] = details
+            for video_id in batch:
+                if video_id not in results:
+                    self._store(video_id, None, None)
+                    results[video_id] = None
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        return {
+            "entries": entries,
+            "ttl_seconds": self.ttl_seconds,
+            **counters,
+            "quota": self.quota.stats(),
+        }
@@ -0,0 +1,41 @@
+"""
+Detaylı özet işlerini API süreçlerinden ayrı çalıştıran worker.
+
+    cd backend && python worker.py
+
+API süreçleri JOB_QUEUE_EMBEDDED_WORKER=0 ile başlatıldığında kuyruktaki
+işler yalnızca bu süreçlerde işlenir; worker sayısı HTTP katmanından
+bağımsız olarak artırılabilir. Sonuçlar state backend'e yazıldığından
+STATE_BACKEND sqlite veya redis olmalıdır. SIGTERM/SIGINT alındığında
+yeni iş alınmaz, çalışan işler JOB_DRAIN_TIMEOUT kadar beklenir.
+"""
+
+import asyncio
+import logging
+import signal
+
+import main
+
+logger = logging.getLogger(__name__)
+
+
+async def _run() -> None:
+    if main.job_queue is None:
+        raise SystemExit("JOB_QUEUE=0 iken worker çalıştırılamaz")
+    if main.state.name == "memory":
+        logger.warning("STATE_BACKEND=memory; sonuçlar API süreçlerinden görülemez")
+
+    worker = main.create_job_worker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        main.ytdlp_pool.shutdown()
+        main._io_executor.shutdown(wait=False, cancel_futures=True)
+        main.logging_setup.stop_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(_run())
@@ -0,0 +1,551 @@
+"""
+yt-dlp ile altyazı indirme ve bunu ayrı süreçlerde çalıştıran havuz.
+
+yt-dlp'nin sayfa/player ayrıştırması saf Python'dur ve GIL'i uzun süre tutar;
+API sürecinde çalıştığında aynı worker'daki tüm istekleri yavaşlatır. Bu
+yüzden fetch_subtitles() sıcak tutulan bir ProcessPoolExecutor'da çalışır.
+
+Modül import edildiğinde yan etkisi yoktur (spawn edilen alt süreçler yalnızca
+bu modülü yükler); tüm ayarlar argüman olarak verilir.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import functools
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Iterator
+
+import yt_dlp
+
+from http_clients import get_session
+from logging_setup import setup_logging
+from normalize import build_transcript
+from transcript_store import Transcript
+
+Segment = tuple[int, int, str]
+
+# Yanıt gövdesi bu boyutta parçalar halinde okunur
+JSON3_CHUNK_BYTES = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def get_sub_url(sub_data: list) -> str | None:
+    """Altyazı format listesinden json3 URL'sini (veya ilk mevcut URL'yi) döndürür."""
+    for fmt in sub_data:
+        if fmt.get("ext") == "json3":
+            return fmt["url"]
+    return sub_data[0].get("url") if sub_data else None
+
+
+def _event_segment(event: dict) -> Segment | None:
+    segs = event.get("segs", [])
+    if not segs:
+        return None
+    text = "".join(seg.get("utf8", "") for seg in segs).strip()
+    if not text or text == "\n":
+        return None
+    return (event.get("tStartMs", 0), event.get("dDurationMs", 0), text)
+
+
+class _Json3Reader:
+    """Bayt parçalarını metne çevirip tüketilen kısmı atan küçük tampon."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+
+    def read_more(self) -> bool:
+        """Tampona bir parça daha ekler; veri bittiyse False döner."""
+        for chunk in self._chunks:
+            if chunk:
+                self.buffer = self.buffer[self.pos :] + self._decoder.decode(chunk)
+                self.pos = 0
+                return True
+        tail = self._decoder.decode(b"", final=True)
+        if tail:
+            self.buffer = self.buffer[self.pos :] + tail
+            self.pos = 0
+            return True
+        return False
+
+    def skip(self, chars: str) -> str | None:
+        """chars içindeki karakterleri atlar; sıradaki karakteri (veya EOF'ta None) döndürür."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in chars:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return None
+
+
+def iter_json3_segments(chunks: Iterable[bytes]) -> Iterator[Segment]:
+    """
+    JSON3 yanıtını akış halinde ayrıştırır ve (start_ms, duration_ms, text)
+    segmentlerini sırayla üretir. Yalnızca "events" dizisi olay olay okunur;
+    bellekte aynı anda en fazla bir parça ve tamamlanmamış tek bir olay durur.
+    """
+    reader = _Json3Reader(chunks)
+    decoder = json.JSONDecoder()
+
+    # "events" anahtarına ve ardından gelen '['e kadar ilerle. json3 yanıtında
+    # olaylardan önce yalnızca küçük üst alanlar (wireMagic, pens, ...) bulunur.
+    while True:
+        key = reader.buffer.find('"events"', reader.pos)
+        if key >= 0:
+            reader.pos = key + len('"events"')
+            break
+        # Anahtar iki parçaya bölünmüş olabilir
+        reader.pos = max(reader.pos, len(reader.buffer) - len('"events"'))
+        if not reader.read_more():
+            return
+    if reader.skip(" \t\r\n:") != "[":
+        raise ValueError("json3: 'events' bir dizi değil")
+    reader.pos += 1
+
+    while True:
+        char = reader.skip(" \t\r\n,")
+        if char is None:
+            raise ValueError("json3: yanıt beklenmedik şekilde bitti")
+        if char == "]":
+            return
+        while True:
+            try:
+                event, end = decoder.raw_decode(reader.buffer, reader.pos)
+                break
+            except json.JSONDecodeError:
+                # Olay henüz tamamlanmadı
+                if not reader.read_more():
+                    raise
+        reader.pos = end
+        if isinstance(event, dict):
+            segment = _event_segment(event)
+            if segment is not None:
+                yield segment
+
+
+def stream_json3_subtitle(url: str) -> Iterator[Segment]:
+    """JSON3 altyazı URL'sini indirirken segmentleri akış halinde üretir."""
+    with get_session().get(url, timeout=30, stream=True) as resp:
+        resp.raise_for_status()
+        yield from iter_json3_segments(resp.iter_content(JSON3_CHUNK_BYTES))
+
+
+def parse_json3_subtitle(url: str) -> list[Segment]:
+    """JSON3 altyazı URL'sinden (start_ms, duration_ms, text) segmentleri döndürür."""
+    return list(stream_json3_subtitle(url))
+
+
+def _lang_matches(track_lang: str, lang: str) -> bool:
+    """Tercih edilen "en", "en-US" ve "en-orig" gibi varyantlarla da eşleşir."""
+    return track_lang == lang or track_lang.split("-")[0] == lang
+
+
+def select_subtitle_track(
+    video_info: dict, langs: list[str]
+) -> tuple[list | None, str]:
+    """
+    Tek bir extract_info sonucundan en uygun altyazı izini seçer.
+    Sıra: tercih edilen dillerde elle eklenmiş altyazı, aynı dillerde
+    videonun orijinal dilindeki otomatik altyazı, herhangi bir elle eklenmiş
+    altyazı, son olarak orijinal dildeki otomatik altyazı. YouTube'un makine
+    çevirisi otomatik altyazıları yalnızca başka seçenek yoksa kullanılır.
+    """
+    subs = {
+        lang: data
+        for lang, data in (video_info.get("subtitles") or {}).items()
+        if data and lang != "live_chat"
+    }
+    auto = {
+        lang: data
+        for lang, data in (video_info.get("automatic_captions") or {}).items()
+        if data
+    }
+    original = video_info.get("language")
+    if original or any(lang.endswith("-orig") for lang in auto):
+        original_auto = {
+            lang: data
+            for lang, data in auto.items()
+            if lang.endswith("-orig") or lang == original
+        }
+    else:
+        # Orijinal dil bilinmiyorsa çevirileri ayırt etmek mümkün değil
+        original_auto = auto
+
+    for lang in langs:
+        for tracks in (subs, original_auto):
+            # Tam eşleşme, varyantlardan önce gelir
+            for track_lang in sorted(tracks, key=lambda t: t != lang):
+                if _lang_matches(track_lang, lang):
+                    return tracks[track_lang], track_lang
+
+    for tracks in (subs, original_auto, auto):
+        for track_lang, data in tracks.items():
+            return data, track_lang
+    return None, ""
+
+
+# YoutubeDL örneği thread başına bir kez kurulur ve işler arasında tekrar
+# kullanılır (örnek thread-safe değildir; YTDLP_PROCESSES=0 iken
+# fetch_subtitles çok thread'li havuzda çalışır). Havuz süreçlerinde bu,
+# süreç başına bir örnek demektir. Cookie/proxy ayarı değişirse yalnızca o
+# thread'in örneği yeniden oluşturulur.
+_ydl_local = threading.local()
+
+
+def _get_youtube_dl(proxy: str | None, cookie_path: str | None) -> yt_dlp.YoutubeDL:
+    config = (proxy, cookie_path)
+    ydl = getattr(_ydl_local, "ydl", None)
+    if ydl is not None and _ydl_local.config == config:
+        return ydl
+    if ydl is not None:
+        ydl.close()
+
+    ydl_opts = {
+        "skip_download": True,
+        "quiet": True,
+        "no_warnings": True,
+    }
+    if proxy:
+        ydl_opts["proxy"] = proxy
+    if cookie_path:
+        ydl_opts["cookiefile"] = cookie_path
+        logger.info("yt-dlp: cookies.txt kullanılıyor")
+
+    ydl = yt_dlp.YoutubeDL(ydl_opts)
+    _ydl_local.ydl = ydl
+    _ydl_local.config = config
+    return ydl
+
+
+def fetch_subtitles(
+    video_id: str,
+    langs: list[str],
+    proxy: str | None = None,
+    cookie_path: str | None = None,
+    normalize: bool = True,
+    max_segment_ms: int = 15000,
+) -> Transcript:
+    """
+    Video bilgisini tek bir extract_info ile alır, altyazı izini langs
+    tercihine göre seçip indirir. Segmentler indirilirken ayrıştırılır,
+    normalize edilir ve doğrudan sütunlu Transcript'e yazılır; ara segment
+    listesi oluşturulmaz. Transcript.meta["language"] seçilen dildir;
+    meta["timings"] aşama sürelerini (saniye) içerir.
+    """
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+
+    started = time.perf_counter()
+    try:
+        video_info = _get_youtube_dl(proxy, cookie_path).extract_info(
+            video_url, download=False
+        )
+    except Exception as e:
+        raise Exception(f"yt-dlp ile de transcript alınamadı: {str(e)[:300]}")
+    if not video_info:
+        raise Exception("yt-dlp video bilgisi alınamadı.")
+    extract_seconds = time.perf_counter() - started
+
+    sub_data, found_lang = select_subtitle_track(video_info, langs)
+    if not sub_data:
+        raise Exception("yt-dlp: videoda altyazı bulunamadı.")
+
+    sub_url = get_sub_url(sub_data)
+    if not sub_url:
+        raise Exception(f"yt-dlp ({found_lang}) altyazı URL'si bulunamadı.")
+
+    started = time.perf_counter()
+    transcript = build_transcript(
+        stream_json3_subtitle(sub_url),
+        found_lang,
+        normalize=normalize,
+        max_segment_ms=max_segment_ms,
+    )
+    if not len(transcript):
+        raise Exception(f"yt-dlp ({found_lang}) altyazısı boş.")
+    transcript.meta["timings"] = {
+        "extract_info": extract_seconds,
+        "subtitle_download": time.perf_counter() - started,
+    }
+    return transcript
+
+
+def warm_up() -> int:
+    """Alt sürecin başlayıp yt-dlp'yi yüklemesini sağlar."""
+    return os.getpid()
+
+
+# Alt süreçte: başlayan işlerin (iş no, pid, başlama zamanı) bildirildiği kuyruk
+_started_jobs = None
+
+# Başlama bildirimi beklenirken işin sonucunun yoklanma aralığı (saniye)
+_START_POLL_SECONDS = 0.2
+
+
+def _init_child(log_config: dict | None, started_jobs=None) -> None:
+    """Spawn edilen süreçte loglamayı API süreciyle aynı biçimde kurar."""
+    global _started_jobs
+    _started_jobs = started_jobs
+    if log_config:
+        setup_logging(**log_config)
+
+
+def _run_job(target: Callable[..., Transcript], job_id: int, *args) -> Transcript:
+    """Alt süreçte çalışır; timeout'un başlaması ve gerekirse durdurulabilmek
+    için pid'ini ve başlama zamanını bildirir."""
+    if _started_jobs is not None:
+        _started_jobs.put((job_id, os.getpid(), time.time()))
+    return target(*args)
+
+
+class _JobTimeout(Exception):
+    """Havuzun kendi timeout'u; target'ın yükselttiği TimeoutError'dan ayrılır."""
+
+
+class YtdlpProcessPool:
+    """
+    fetch_subtitles (veya target) için sıcak süreç havuzu. target alt sürece
+    pickle ile gönderilir; modül düzeyinde bir fonksiyon veya onun
+    functools.partial'ı olmalıdır.
+
+    - timeout, iş bir alt süreçte başladığında işlemeye başlar; havuz
+      kuyruğunda beklenen süre sayılmaz.
+    - Her iş, çağıran ayrılsa da bitene veya timeout dolana kadar izlenir.
+      Çağıran iptal edilirse (istemci ayrıldı, yarışı diğer yöntem kazandı)
+      henüz başlamamış iş kuyruktan çıkarılır; çalışan iş bitmeye bırakılır
+      ve sonucu atılır.
+    - timeout aşılırsa o işi çalıştıran süreç sonlandırılır (takılan yt-dlp
+      süreci başka türlü durdurulamaz). ProcessPoolExecutor tek bir sürecin
+      ölümünü kaldıramaz: havuz bozulur ve içindeki diğer işler de
+      BrokenProcessPool ile düşer. Bu işler (sahibi hâlâ bekliyorsa) yeni
+      kurulan havuza bir kez yeniden gönderilir ve timeout'ları baştan
+      başlar; yani bir timeout kardeş işlere hata değil gecikme olarak yansır.
+    - Havuz, süreç başına ortalama max_tasks_per_child gerçek işten sonra
+      (ısıtma işleri sayılmaz) yenisiyle değiştirilir; eski havuz elindeki
+      işleri bitirip kapanır (bellek büyümesine karşı).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_tasks_per_child: int = 20,
+        timeout: float = 60.0,
+        log_config: dict | None = None,
+        target: Callable[..., Transcript] = fetch_subtitles,
+    ):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.log_config = log_config
+        self.target = target
+        self._context = multiprocessing.get_context("spawn")
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_jobs = 0
+        self._started_jobs = None
+        self._job_ids = itertools.count()
+        # İzlenen işler: iş no -> izleyici task ve işin güncel future'ı.
+        # Yeniden gönderilen iş yeni bir deneme numarası alır; alt süreçlerin
+        # bildirdiği (pid, başlama zamanı) deneme numarasıyla tutulur.
+        self._watchers: dict[int, asyncio.Task] = {}
+        self._futures: dict[int, Future] = {}
+        self._attempt_starts: dict[int, tuple[int, float] | None] = {}
+        self._abandoned: set[int] = set()
+        # Bir işin süreci sonlandırıldığı için bozulan havuzlar
+        self._killed_pools: weakref.WeakSet = weakref.WeakSet()
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "resubmitted": 0,
+            "cancelled": 0,
+            "abandoned_completed": 0,
+            "recycled": 0,
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            if self._started_jobs is None:
+                self._started_jobs = self._context.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._context,
+                initializer=_init_child,
+                initargs=(self.log_config, self._started_jobs),
+            )
+            self._pool_jobs = 0
+            for _ in range(self.max_workers):
+                self._pool.submit(warm_up)
+        return self._pool
+
+    def start(self) -> None:
+        """Havuzu ilk istekten önce ısıtır."""
+        self._get_pool()
+
+    def _retire(self, pool: ProcessPoolExecutor) -> None:
+        """Yeni işler için taze havuz kurar; eskisi elindeki işleri bitirip kapanır."""
+        if self._pool is pool:
+            self._pool = None
+            self._counters["recycled"] += 1
+            self._get_pool()
+        pool.shutdown(wait=False)
+
+    def _submit(self, args: tuple) -> tuple[ProcessPoolExecutor, int, Future]:
+        """İşi güncel havuza yeni bir deneme numarasıyla gönderir."""
+        pool = self._get_pool()
+        attempt = next(self._job_ids)
+        self._attempt_starts[attempt] = None
+        future = pool.submit(_run_job, self.target, attempt, *args)
+        self._pool_jobs += 1
+        if self._pool_jobs >= self.max_tasks_per_child * self.max_workers:
+            self._retire(pool)
+        return pool, attempt, future
+
+    def _collect_starts(self) -> None:
+        """Alt süreçlerin bildirdiği (deneme no, pid, başlama zamanı) kayıtlarını okur."""
+        while True:
+            try:
+                attempt, pid, started_at = self._started_jobs.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            if attempt in self._attempt_starts:
+                self._attempt_starts[attempt] = (pid, started_at)
+
+    def _stop_job(self, pool: ProcessPoolExecutor, pid: int) -> None:
+        """
+        Süresi dolan işin sürecini sonlandırır. Havuz bununla bozulur; yeni
+        işler için taze havuz kurulur, bozulan havuzdaki kardeş işler
+        _watch içinde yeniden gönderilir.
+        """
+        self._killed_pools.add(pool)
+        self._retire(pool)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass  # Bu arada kendiliğinden bitti
+
+    async def _watch(
+        self,
+        job_id: int,
+        args: tuple,
+        pool: ProcessPoolExecutor,
+        attempt: int,
+        future: Future,
+    ) -> Transcript:
+        """İşi bitene veya timeout dolana kadar izler; çağırandan bağımsızdır."""
+        resubmitted = False
+        try:
+            while True:
+                waiter = asyncio.wrap_future(future)
+                try:
+                    result = await self._wait_started(waiter, attempt)
+                except BrokenProcessPool:
+                    self._attempt_starts.pop(attempt, None)
+                    if (
+                        pool in self._killed_pools
+                        and not resubmitted
+                        and job_id not in self._abandoned
+                    ):
+                        # Başka bir işin süreci sonlandırıldığı için düştü
+                        resubmitted = True
+                        self._counters["resubmitted"] += 1
+                        pool, attempt, future = self._submit(args)
+                        self._futures[job_id] = future
+                        continue
+                    self._counters["failed"] += 1
+                    self._retire(pool)
+                    raise
+                except _JobTimeout:
+                    self._counters["timeouts"] += 1
+                    self._stop_job(pool, self._attempt_starts[attempt][0])
+                    raise TimeoutError(
+                        f"yt-dlp {self.timeout:g}s içinde bitmedi"
+                    ) from None
+                except Exception:
+                    self._counters["failed"] += 1
+                    raise
+                break
+        finally:
+            self._watchers.pop(job_id, None)
+            self._futures.pop(job_id, None)
+            self._attempt_starts.pop(attempt, None)
+        if job_id in self._abandoned:
+            self._counters["abandoned_completed"] += 1
+        else:
+            self._counters["completed"] += 1
+        return result
+
+    async def _wait_started(self, waiter: asyncio.Future, attempt: int) -> Transcript:
+        """
+        İşin sonucunu bekler. Başlama bildirimi gelene kadar sonuç kısa
+        aralıklarla yoklanır; geldikten sonra en fazla timeout dolana kadar
+        beklenir, dolarsa _JobTimeout yükselir.
+        """
+        while not waiter.done():
+            self._collect_starts()
+            started = self._attempt_starts.get(attempt)
+            if started is None:
+                wait = _START_POLL_SECONDS
+            else:
+                wait = started[1] + self.timeout - time.time()
+                if wait <= 0:
+                    waiter.cancel()
+                    raise _JobTimeout
+            await asyncio.wait({waiter}, timeout=wait)
+        return waiter.result()
+
+    def _job_done(self, job_id: int, task: asyncio.Task) -> None:
+        self._abandoned.discard(job_id)
+        if not task.cancelled():
+            task.exception()  # Sahipsiz işin hatası "retrieved" sayılsın
+
+    async def run(self, *args) -> Transcript:
+        """target(*args)'ı bir alt süreçte çalıştırır."""
+        job_id = next(self._job_ids)
+        pool, attempt, future = self._submit(args)
+        self._futures[job_id] = future
+        self._counters["submitted"] += 1
+        watcher = asyncio.ensure_future(
+            self._watch(job_id, args, pool, attempt, future)
+        )
+        watcher.add_done_callback(functools.partial(self._job_done, job_id))
+        self._watchers[job_id] = watcher
+        try:
+            return await asyncio.shield(watcher)
+        except asyncio.CancelledError:
+            self._counters["cancelled"] += 1
+            if not watcher.done() and not self._futures[job_id].cancel():
+                # Çalışan iş bitmeye bırakılır, sonucu atılır
+                self._abandoned.add(job_id)
+            raise
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "running": self._pool is not None,
+            "in_flight": len(self._watchers),
+            "abandoned": len(self._abandoned),
+            **self._counters,
+        }
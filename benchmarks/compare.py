@@ -0,0 +1,78 @@
+"""
+İki benchmark sonucunu karşılaştırır:
+
+    python benchmarks/compare.py eski.json yeni.json [--threshold 10]
+
+Her iki dosyada da bulunan gecikme yüzdelikleri, throughput ve bellek
+değerleri yan yana yazılır; değişimi eşiği aşan satırlar "!" ile
+işaretlenir (gecikme/bellekte artış, throughput'ta azalış kötüleşmedir).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+# Büyüdükçe kötüleşen ve küçüldükçe kötüleşen değerler
+_LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_mb", "peak_rss_mb")
+_HIGHER_IS_BETTER = ("throughput_rps", "ops_per_second")
+
+
+def flatten(node, prefix: str = "") -> dict[str, float]:
+    values: dict[str, float] = {}
+    if not isinstance(node, dict):
+        return values
+    for key, value in node.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            values.update(flatten(value, path))
+        elif key in _LOWER_IS_BETTER + _HIGHER_IS_BETTER and isinstance(
+            value, (int, float)
+        ):
+            values[path] = value
+    return values
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[tuple]:
+    rows = []
+    for section in ("components", "scenarios", "memory"):
+        old_values = flatten(old.get(section), section)
+        new_values = flatten(new.get(section), section)
+        for path in sorted(old_values.keys() & new_values.keys()):
+            before, after = old_values[path], new_values[path]
+            change = (after - before) / before * 100 if before else 0.0
+            worse = change if path.endswith(_LOWER_IS_BETTER) else -change
+            rows.append((path, before, after, change, worse > threshold))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="İki benchmark sonucunu karşılaştırır")
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Kötüleşme eşiği (yüzde)"
+    )
+    parser.add_argument(
+        "--only-regressions", action="store_true", help="Yalnızca kötüleşenler"
+    )
+    args = parser.parse_args(argv)
+
+    old = json.loads(args.old.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    print(f"eski: {old['meta'].get('commit')}  yeni: {new['meta'].get('commit')}")
+
+    regressions = 0
+    for path, before, after, change, regressed in compare(old, new, args.threshold):
+        regressions += regressed
+        if args.only_regressions and not regressed:
+            continue
+        mark = "!" if regressed else " "
+        print(f"{mark} {path:<70} {before:>12.3f} → {after:>12.3f}  {change:+7.1f}%")
+    print(f"{regressions} değer eşiği (%{args.threshold:g}) aşacak kadar kötüleşti")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
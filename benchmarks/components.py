@@ -0,0 +1,499 @@
+"""
+Bileşen benchmark'ları (uygulama ve ağ olmadan, tek thread).
+
+Her ölçüm işlem başına süre dağılımını (p50/p95/p99) ve gerekiyorsa
+tracemalloc ile ölçülen tepe Python belleğini döndürür. Karşılaştırmalı
+ölçümlerde eski/yalın yol ("baseline") aynı girdiyle yanında ölçülür:
+json3'ün tamamını json.loads ile okumak, normalizasyonsuz transcript,
+her istekte yeni HTTP oturumu, log'u çağıran thread'de yazmak gibi.
+
+Eksik bağımlılığı olan ölçüm atlanır ve sonuçta "skipped" ile belirtilir.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from logging.handlers import QueueListener
+from pathlib import Path
+from typing import Callable
+
+from fakes import FakeYouTube
+from fixtures import Fixture
+from harness import percentiles
+
+
+@dataclass
+class ComponentContext:
+    fixtures: dict[str, Fixture]
+    youtube: FakeYouTube
+    workdir: Path
+    repeat: int = 5
+    # Döngüsel mikro ölçümlerde işlem sayısı
+    operations: int = 20_000
+
+
+COMPONENTS: dict[str, Callable[[ComponentContext], dict]] = {}
+
+
+def component(name: str):
+    def register(func):
+        COMPONENTS[name] = func
+        return func
+
+    return register
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict:
+    """func'u repeat kez çalıştırır; süre dağılımı ve son sonucu döndürür."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - started)
+    return {"timing": percentiles(durations), "result": result}
+
+
+def peak_memory(func: Callable[[], object]) -> float:
+    """func çalışırken ayrılan tepe Python belleği (MB)."""
+    tracemalloc.start()
+    try:
+        func()
+        return round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+    finally:
+        tracemalloc.stop()
+
+
+def per_operation(func: Callable[[int], object], operations: int) -> dict:
+    """Tek tek ölçülen çağrılar; mikro saniye mertebesindeki işlemler için."""
+    durations = []
+    for i in range(operations):
+        started = time.perf_counter()
+        func(i)
+        durations.append(time.perf_counter() - started)
+    total = sum(durations)
+    return {
+        **percentiles(durations),
+        "ops_per_second": round(operations / total) if total else None,
+    }
+
+
+@component("json3_parse")
+def bench_json3_parse(ctx: ComponentContext) -> dict:
+    """Akış halinde ayrıştırma ve tüm belgeyi json.loads ile okuma."""
+    from ytdlp_fetcher import JSON3_CHUNK_BYTES, _event_segment, iter_json3_segments
+
+    payload = ctx.fixtures["synthetic"].json3
+    chunks = [
+        payload[i : i + JSON3_CHUNK_BYTES]
+        for i in range(0, len(payload), JSON3_CHUNK_BYTES)
+    ]
+
+    def streaming():
+        return sum(1 for _ in iter_json3_segments(iter(chunks)))
+
+    def whole_document():
+        events = json.loads(b"".join(chunks)).get("events", [])
+        return sum(1 for event in events if _event_segment(event))
+
+    stream = measure(streaming, ctx.repeat)
+    whole = measure(whole_document, ctx.repeat)
+    assert stream["result"] == whole["result"]
+    return {
+        "payload_bytes": len(payload),
+        "segments": stream["result"],
+        "streaming": {**stream["timing"], "peak_mb": peak_memory(streaming)},
+        "baseline_json_loads": {
+            **whole["timing"],
+            "peak_mb": peak_memory(whole_document),
+        },
+    }
+
+
+@component("normalize")
+def bench_normalize(ctx: ComponentContext) -> dict:
+    """Kayan altyazı birleştirme: süre ve prompt'a giden metindeki azalma."""
+    from chunking import estimate_tokens
+    from normalize import build_transcript
+
+    result = {}
+    for name in ("srt", "synthetic"):
+        segments = ctx.fixtures[name].segments
+        normalized = measure(lambda: build_transcript(segments, "tr"), ctx.repeat)
+        raw = measure(
+            lambda: build_transcript(segments, "tr", normalize=False), ctx.repeat
+        )
+        raw_tokens = estimate_tokens(raw["result"].render())
+        tokens = estimate_tokens(normalized["result"].render())
+        result[name] = {
+            "segments_in": len(segments),
+            "segments_out": len(normalized["result"]),
+            "tokens_raw": raw_tokens,
+            "tokens_normalized": tokens,
+            "token_reduction": round(1 - tokens / raw_tokens, 4),
+            "normalize": normalized["timing"],
+            "baseline_no_normalize": raw["timing"],
+        }
+    return result
+
+
+@component("transcript_store")
+def bench_transcript_store(ctx: ComponentContext) -> dict:
+    """Sütunlu dosya (yaz, mmap ile oku, render) ve JSON segment listesi."""
+    from normalize import build_transcript
+    from transcript_store import TranscriptStore
+
+    segments = ctx.fixtures["synthetic"].segments
+    transcript = build_transcript(segments, "tr")
+    store = TranscriptStore(ctx.workdir / "transcripts")
+    json_path = ctx.workdir / "transcript.json"
+
+    put = measure(lambda: store.put("bench", transcript), ctx.repeat)
+    get = measure(lambda: store.get("bench").render(), ctx.repeat)
+    json_put = measure(
+        lambda: json_path.write_text(
+            json.dumps(list(transcript.segments()), ensure_ascii=False),
+            encoding="utf-8",
+        ),
+        ctx.repeat,
+    )
+    json_get = measure(
+        lambda: json.loads(json_path.read_text(encoding="utf-8")), ctx.repeat
+    )
+    return {
+        "segments": len(transcript),
+        "columnar_bytes": sum(
+            p.stat().st_size for p in (ctx.workdir / "transcripts").iterdir()
+        ),
+        "json_bytes": json_path.stat().st_size,
+        "put": put["timing"],
+        "get_render": get["timing"],
+        "baseline_json_put": json_put["timing"],
+        "baseline_json_get": json_get["timing"],
+    }
+
+
+@component("extractive")
+def bench_extractive(ctx: ComponentContext) -> dict:
+    """Uzun transcript'te yerel TextRank seçimi ve prompt boyutuna etkisi."""
+    from chunking import estimate_tokens
+    from extractive import extract_transcript
+    from normalize import build_transcript
+
+    transcript = build_transcript(ctx.fixtures["synthetic"].segments, "tr")
+    result = {"tokens_in": estimate_tokens(transcript.render())}
+    for ratio in (0.5, 0.3):
+        run = measure(lambda: extract_transcript(transcript, ratio), ctx.repeat)
+        result[f"ratio_{ratio}"] = {
+            **run["timing"],
+            "tokens_out": estimate_tokens(run["result"].render()),
+        }
+    return result
+
+
+@component("chunking")
+def bench_chunking(ctx: ComponentContext) -> dict:
+    from chunking import split_transcript
+    from normalize import build_transcript
+
+    transcript = build_transcript(ctx.fixtures["synthetic"].segments, "tr")
+    run = measure(lambda: split_transcript(transcript, 12000), ctx.repeat)
+    return {"chunks": len(run["result"]), **run["timing"]}
+
+
+@component("job_queue")
+def bench_job_queue(ctx: ComponentContext) -> dict:
+    """SQLite iş kuyruğu: ekleme, alma ve tamamlama başına süre."""
+    from job_queue import JobQueue
+
+    jobs = JobQueue(ctx.workdir / "jobs.sqlite3")
+    count = max(ctx.operations // 40, 100)
+    payload = {"transcript_text": "x" * 20_000, "bullet_points": "• madde"}
+    enqueue = per_operation(
+        lambda i: jobs.enqueue("bench", payload, key=f"bench:{i}"), count
+    )
+    claimed = []
+    claim = per_operation(lambda i: claimed.append(jobs.claim("bench-worker")), count)
+    complete = per_operation(
+        lambda i: jobs.complete(claimed[i].job_id, "bench-worker"), count
+    )
+    return {
+        "jobs": count,
+        "payload_bytes": len(json.dumps(payload)),
+        "enqueue": enqueue,
+        "claim": claim,
+        "complete": complete,
+    }
+
+
+@component("metrics")
+def bench_metrics(ctx: ComponentContext) -> dict:
+    """Metrik güncellemenin istek yolundaki maliyeti ve /metrics üretimi."""
+    from metrics import Registry
+
+    registry = Registry()
+    histogram = registry.histogram("bench_seconds", "bench", ("stage",))
+    counter = registry.counter("bench_total", "bench", ("result",))
+    stages = [f"stage{i}" for i in range(20)]
+    observe = per_operation(
+        lambda i: histogram.observe(i % 97 / 10, stage=stages[i % 20]),
+        ctx.operations,
+    )
+    inc = per_operation(lambda i: counter.inc(result="hit"), ctx.operations)
+    render = measure(registry.render, ctx.repeat)
+    return {
+        "histogram_observe": observe,
+        "counter_inc": inc,
+        "render": {**render["timing"], "bytes": len(render["result"])},
+    }
+
+
+@component("tracing")
+def bench_tracing(ctx: ComponentContext) -> dict:
+    """Aktif iz içinde ve dışında span() maliyeti, iz başına kayıt maliyeti."""
+    import tracing
+
+    def span_once(i: int) -> None:
+        with tracing.span("bench"):
+            pass
+
+    outside = per_operation(span_once, ctx.operations)
+    with tracing.trace("bench") as trace_:
+        inside = per_operation(span_once, min(ctx.operations, 2000))
+        trace_.spans.clear()
+
+    def trace_once(i: int) -> None:
+        with tracing.trace("bench"):
+            for _ in range(5):
+                with tracing.span("stage"):
+                    pass
+
+    return {
+        "span_without_trace": outside,
+        "span_in_trace": inside,
+        "trace_with_5_spans": per_operation(trace_once, min(ctx.operations, 2000)),
+        "recorder_dropped": tracing.recorder.dropped,
+    }
+
+
+class _SlowStream:
+    """Her yazmada gecikmeli bir hedef (yavaş disk, dolu pipe, log toplayıcı)."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+        self.caller = threading.current_thread()
+        self.caller_writes = 0
+
+    def write(self, text: str) -> None:
+        time.sleep(self.delay)
+        self.lines += 1
+        self.caller_writes += threading.current_thread() is self.caller
+
+    def flush(self) -> None:
+        pass
+
+
+@component("logging")
+def bench_logging(ctx: ComponentContext) -> dict:
+    """
+    Yavaş bir hedefe yazarken çağıran thread'in log çağrısı başına beklediği
+    süre: kuyruklu hat (biçimlendirme ve yazma listener thread'inde) ile
+    doğrudan StreamHandler.
+    """
+    from logging_setup import ContextFilter, JsonFormatter, _PreparedQueueHandler
+
+    count = min(ctx.operations, 2000)
+    delay = 0.0005
+
+    def run(handler: logging.Handler) -> dict:
+        logger = logging.getLogger(f"bench.logging.{id(handler)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        try:
+            return per_operation(
+                lambda i: logger.info("istek tamamlandı %d", i, extra={"n": i}),
+                count,
+            )
+        finally:
+            logger.removeHandler(handler)
+
+    sink = _SlowStream(delay)
+    output = logging.StreamHandler(sink)
+    output.setFormatter(JsonFormatter())
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queued = _PreparedQueueHandler(log_queue)
+    queued.addFilter(ContextFilter())
+    listener = QueueListener(log_queue, output)
+    listener.start()
+    started = time.perf_counter()
+    queued_result = run(queued)
+    listener.stop()
+    drained = time.perf_counter() - started
+
+    direct_sink = _SlowStream(delay)
+    direct = logging.StreamHandler(direct_sink)
+    direct.setFormatter(JsonFormatter())
+    direct.addFilter(ContextFilter())
+    direct_result = run(direct)
+    return {
+        "records": count,
+        "sink_write_delay_ms": delay * 1000,
+        "queued": {
+            **queued_result,
+            "written": sink.lines,
+            "written_on_caller_thread": sink.caller_writes,
+            "drain_seconds": round(drained, 3),
+        },
+        "baseline_direct": {
+            **direct_result,
+            "written": direct_sink.lines,
+            "written_on_caller_thread": direct_sink.caller_writes,
+        },
+    }
+
+
+@component("http_session")
+def bench_http_session(ctx: ComponentContext) -> dict:
+    """Paylaşılan bağlantı havuzu ile her istekte yeni oturum (localhost json3)."""
+    import requests
+
+    import http_clients
+
+    video_id = ctx.youtube.new_video_id("srt")
+    url = f"{ctx.youtube.server.url}/json3/{video_id}"
+    count = max(ctx.operations // 200, 50)
+    shared = http_clients.get_session()
+
+    def with_shared(i: int) -> None:
+        shared.get(url, timeout=10).content
+
+    def with_new(i: int) -> None:
+        with requests.Session() as session:
+            session.get(url, timeout=10).content
+
+    return {
+        "requests": count,
+        "payload_bytes": len(ctx.fixtures["srt"].json3),
+        "shared_session": per_operation(with_shared, count),
+        "baseline_new_session": per_operation(with_new, count),
+    }
+
+
+@component("ytdlp_extract")
+def bench_ytdlp_extract(ctx: ComponentContext) -> dict:
+    """
+    Tek extract_info ve paylaşılan YoutubeDL (fetch_subtitles) ile eski dil
+    döngüsü: "tr", "en" ve dil belirtmeden, her biri için yeni YoutubeDL ve
+    tam extract_info. extract_info gerçek YoutubeDL'in alt sınıfında yer
+    tutucudur; izleme sayfasını yt-dlp'nin kendi HTTP yığınıyla localhost'tan
+    indirir. Video yalnızca tr, yalnızca en veya yalnızca de altyazılıdır;
+    eski döngü bunlar için sırasıyla 1, 2 ve 3 extract_info yapar.
+    """
+    from types import SimpleNamespace
+
+    import yt_dlp
+
+    import ytdlp_fetcher
+    from normalize import build_transcript
+
+    server = ctx.youtube.server.url
+    tracks: dict[str, str] = {}
+    calls = {"extract_info": 0, "instances": 0}
+
+    class StandInYoutubeDL(yt_dlp.YoutubeDL):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            calls["instances"] += 1
+
+        def extract_info(self, url, download=True, **kwargs):
+            calls["extract_info"] += 1
+            video_id = url.rsplit("=", 1)[-1]
+            with self.urlopen(f"{server}/watch/{video_id}") as response:
+                page = response.read()
+            if b"ytInitialPlayerResponse" not in page:
+                raise Exception("izleme sayfası beklenen biçimde değil")
+            lang = tracks[video_id]
+            return {
+                "id": video_id,
+                "subtitles": {
+                    lang: [{"ext": "json3", "url": f"{server}/json3/{video_id}"}]
+                },
+                "automatic_captions": {},
+            }
+
+    def per_language(video_id: str):
+        """user-016 öncesi main._fetch_transcript_with_ytdlp."""
+        for lang in ("tr", "en", None):
+            ydl_opts = {"skip_download": True, "quiet": True, "no_warnings": True}
+            if lang:
+                ydl_opts["subtitleslangs"] = [lang]
+            with StandInYoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(
+                    f"https://www.youtube.com/watch?v={video_id}", download=False
+                )
+            subs = info.get("subtitles") or info.get("automatic_captions") or {}
+            found = lang if lang else next(iter(subs), None)
+            sub_data = subs.get(found) if found else None
+            if sub_data:
+                return build_transcript(
+                    ytdlp_fetcher.stream_json3_subtitle(
+                        ytdlp_fetcher.get_sub_url(sub_data)
+                    ),
+                    found,
+                )
+        raise Exception("altyazı bulunamadı")
+
+    def counted(func: Callable[[], object]) -> dict:
+        before = dict(calls)
+        result = measure(func, ctx.repeat)
+        return {
+            **result["timing"],
+            **{
+                f"{key}_per_fetch": (calls[key] - before[key]) / ctx.repeat
+                for key in calls
+            },
+        }
+
+    original = ytdlp_fetcher.yt_dlp
+    ytdlp_fetcher.yt_dlp = SimpleNamespace(YoutubeDL=StandInYoutubeDL)
+    ytdlp_fetcher._ydl = ytdlp_fetcher._ydl_config = None
+    try:
+        result = {}
+        for lang in ("tr", "en", "de"):
+            video_id = ctx.youtube.new_video_id("srt")
+            tracks[video_id] = lang
+            result[f"only_{lang}"] = {
+                "single_extract": counted(
+                    lambda: ytdlp_fetcher.fetch_subtitles(video_id, ["tr", "en"])
+                ),
+                "baseline_per_language": counted(lambda: per_language(video_id)),
+            }
+        return result
+    finally:
+        if ytdlp_fetcher._ydl is not None:
+            ytdlp_fetcher._ydl.close()
+        ytdlp_fetcher.yt_dlp = original
+        ytdlp_fetcher._ydl = ytdlp_fetcher._ydl_config = None
+
+
+def run_components(
+    ctx: ComponentContext, names: list[str] | None = None
+) -> dict[str, dict]:
+    results = {}
+    for name, func in COMPONENTS.items():
+        if names and name not in names:
+            continue
+        print(f"[bileşen] {name}", flush=True)
+        try:
+            results[name] = func(ctx)
+        except ImportError as e:
+            results[name] = {"skipped": f"bağımlılık eksik: {e}"}
+    return results
@@ -0,0 +1,504 @@
+"""
+Gemini ve YouTube yerine geçen sahte bileşenler.
+
+- FakeGemini.GenerativeModel, genai.GenerativeModel ile aynı arayüzü
+  (generate_content(prompt, stream=...)) sunar. Gecikme ilk token süresi +
+  çıktı token'ı başına süre olarak modellenir; rate_limit_rate oranında
+  çağrı, gerçek istemci gibi ResourceExhausted (429) ile başarısız olur.
+  Çıktı prompt şablonuna göre üretilir (birleşik akışta ayırıcı satırı,
+  parça notlarında transcript'ten kopyalanan zaman damgalı satırlar).
+- FakeYouTube, youtube_transcript_api istemcisini, yt-dlp altyazı indirmeyi
+  ve YouTube Data API'yi taklit eder. yt-dlp yolu json3 baytlarını
+  FixtureServer üzerinden localhost'tan indirir; böylece gerçek akış
+  ayrıştırıcısı ve paylaşılan HTTP oturumu ölçüme dahil olur.
+- cpu_bound_fetch, GIL'i tutan saf Python çalışmasıyla yt-dlp'nin sayfa/JS
+  ayrıştırmasını taklit eder; modül düzeyinde olduğundan süreç havuzuna
+  (YtdlpProcessPool target) da verilebilir.
+- install() sahteleri yüklenmiş main modülüne bağlar.
+
+Gecikmeler thread'de time.sleep ile beklenir; gerçek istemciler gibi
+bloklayan çağrılardır.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import prompts
+from fixtures import Fixture
+
+_TIMESTAMP_LINE = re.compile(r"(?m)^\[\d{1,3}:\d{2}-\d{1,3}:\d{2}\].*$")
+_WORD = re.compile(r"\w{4,}", re.UNICODE)
+
+
+class ResourceExhausted(Exception):
+    """google.api_core'daki 429 hatasıyla aynı adı taşır."""
+
+    code = 429
+
+
+class _Latency:
+    """Medyan etrafında log-normal dağılan, thread-safe gecikme üreteci."""
+
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, median: float, jitter: float) -> float:
+        if median <= 0:
+            return 0.0
+        with self._lock:
+            return median * math.exp(self._rng.gauss(0, jitter))
+
+    def chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+
+def _template_prefix(template: str) -> str:
+    return template.split("{", 1)[0]
+
+
+# Prompt'un hangi şablondan üretildiği sabit önekinden anlaşılır
+_TEMPLATES = sorted(
+    (
+        (_template_prefix(prompts.COMBINED_SUMMARY_PROMPT), "combined"),
+        (_template_prefix(prompts.BULLET_POINTS_PROMPT), "bullets"),
+        (_template_prefix(prompts.DETAILED_SUMMARY_PROMPT), "detailed"),
+        (_template_prefix(prompts.DETAILED_SECTION_PROMPT), "section"),
+        (_template_prefix(prompts.CHUNK_NOTES_PROMPT), "chunk"),
+    ),
+    key=lambda item: -len(item[0]),
+)
+
+
+def prompt_kind(prompt: str) -> str:
+    for prefix, kind in _TEMPLATES:
+        if prompt.startswith(prefix):
+            return kind
+    return "other"
+
+
+class FakeGemini:
+    """
+    Sahte Gemini istemcisi. Ayarlar çalışma sırasında değiştirilebilir
+    (senaryolar 429 oranını veya gecikmeyi geçici olarak ayarlar).
+    """
+
+    def __init__(
+        self,
+        first_token_latency: float = 0.8,
+        token_latency: float = 0.002,
+        output_tokens: int = 600,
+        jitter: float = 0.25,
+        rate_limit_rate: float = 0.0,
+        stream_chunks: int = 12,
+        seed: int = 0,
+    ):
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.output_tokens = output_tokens
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.stream_chunks = stream_chunks
+        self._latency = _Latency(seed)
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "stream_calls": 0,
+            "rate_limited": 0,
+            "prompt_chars": 0,
+            "output_chars": 0,
+            "by_kind": {},
+        }
+
+    def GenerativeModel(self, model_name: str) -> "FakeGenerativeModel":
+        return FakeGenerativeModel(self, model_name)
+
+    def _record(self, prompt: str, kind: str, stream: bool) -> None:
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["stream_calls"] += stream
+            self._stats["prompt_chars"] += len(prompt)
+            by_kind = self._stats["by_kind"]
+            by_kind[kind] = by_kind.get(kind, 0) + 1
+
+    def _check_rate_limit(self) -> None:
+        if self._latency.chance(self.rate_limit_rate):
+            with self._lock:
+                self._stats["rate_limited"] += 1
+            # Gerçek istemci gibi kısa bir gecikmeden sonra reddedilir
+            time.sleep(self._latency.sample(0.05, self.jitter))
+            raise ResourceExhausted(
+                "429 Resource has been exhausted (e.g. check quota). "
+                "Please retry in 0.2s."
+            )
+
+    def respond(self, prompt: str) -> str:
+        """Prompt şablonuna uygun, output_tokens uzunluğunda sahte çıktı."""
+        kind = prompt_kind(prompt)
+        quotes = _TIMESTAMP_LINE.findall(prompt)[:40]
+        words = _WORD.findall(prompt[-4000:]) or ["içerik"]
+        budget_chars = self.output_tokens * 4
+
+        def sentence(i: int, n: int = 18) -> str:
+            return " ".join(words[(i * 7 + j) % len(words)] for j in range(n))
+
+        bullets = "\n".join(f"• {sentence(i)}" for i in range(6))
+        if kind == "chunk":
+            notes = []
+            for i, line in enumerate(quotes[:8]):
+                notes.append(f"NOTE: {sentence(i, 12)}\n{line}")
+            return "\n".join(notes) or f"NOTE: {sentence(0, 12)}"
+        if kind == "bullets":
+            return bullets
+
+        sections = []
+        i = 0
+        while sum(map(len, sections)) < budget_chars:
+            quote = quotes[i % len(quotes)] if quotes else ""
+            sections.append(
+                f"**Madde #{i + 1}: {sentence(i, 8)}**\n\n{sentence(i, 40)}\n"
+                f'"{quote}"\n\n**Bu madde videoda neden önemli?:**\n{sentence(i + 3, 25)}\n'
+            )
+            i += 1
+            if kind == "section":
+                break
+        detail = "\n".join(sections)
+        if kind == "combined":
+            return f"{bullets}\n{prompts.SUMMARY_DELIMITER}\n{detail}"
+        return detail
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "by_kind": dict(self._stats["by_kind"])}
+
+
+class FakeGenerativeModel:
+    def __init__(self, client: FakeGemini, model_name: str):
+        self.client = client
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        client = self.client
+        kind = prompt_kind(prompt)
+        client._record(prompt, kind, stream)
+        client._check_rate_limit()
+        text = client.respond(prompt)
+        with client._lock:
+            client._stats["output_chars"] += len(text)
+        first = client._latency.sample(client.first_token_latency, client.jitter)
+        generation = len(text) / 4 * client.token_latency
+        if not stream:
+            time.sleep(first + generation)
+            return SimpleNamespace(text=text)
+        return self._stream(text, first, generation)
+
+    def _stream(self, text: str, first: float, generation: float):
+        chunks = max(self.client.stream_chunks, 1)
+        size = max(len(text) // chunks, 1)
+        time.sleep(first)
+        for start in range(0, len(text), size):
+            time.sleep(generation / chunks)
+            yield SimpleNamespace(text=text[start : start + size])
+
+
+# /watch/<video_id> yanıtı: gerçek izleme sayfası boyutunda (~1 MB) HTML
+_WATCH_PAGE = (
+    b"<html><head><script>var ytInitialPlayerResponse = {};</script></head><body>"
+    + b"<div>" * 200_000
+    + b"</body></html>"
+)
+
+
+class FixtureServer:
+    """
+    Fixture json3 yanıtlarını /json3/<video_id>, izleme sayfası yerine geçen
+    HTML'i /watch/<video_id> yolundan sunan HTTP sunucusu.
+    """
+
+    def __init__(self, youtube: "FakeYouTube"):
+        self.youtube = youtube
+        handler = self._handler()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        youtube = self.youtube
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                video_id = self.path.rsplit("/", 1)[-1]
+                fixture = youtube.fixture_for(video_id)
+                if fixture is None:
+                    self.send_error(404)
+                    return
+                if self.path.startswith("/watch/"):
+                    body, content_type = _WATCH_PAGE, "text/html"
+                else:
+                    body, content_type = fixture.json3, "application/json"
+                self.send_response(200)
+                self.send_header("Content-Type", f"{content_type}; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fixture-server", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _FakeTranscript:
+    def __init__(self, youtube: "FakeYouTube", fixture: Fixture):
+        self.youtube = youtube
+        self.fixture = fixture
+        self.language_code = fixture.language
+
+    def fetch(self):
+        return self.youtube._snippets(self.fixture)
+
+
+class _FakeTranscriptApi:
+    def __init__(self, youtube: "FakeYouTube"):
+        self.youtube = youtube
+
+    def list(self, video_id: str):
+        youtube = self.youtube
+        time.sleep(youtube._latency.sample(youtube.api_latency, youtube.jitter))
+        if youtube._latency.chance(youtube.api_failure_rate):
+            raise Exception("fake: YouTube isteği engelledi (RequestBlocked)")
+        fixture = youtube.fixture_for(video_id)
+        if fixture is None:
+            raise Exception("Transkript bulunamadı.")
+        return [_FakeTranscript(youtube, fixture)]
+
+
+class _FakeVideosRequest:
+    def __init__(self, youtube: "FakeYouTube", ids: list[str]):
+        self.youtube = youtube
+        self.ids = ids
+        self.headers: dict[str, str] = {}
+
+    def execute(self) -> dict:
+        youtube = self.youtube
+        time.sleep(youtube._latency.sample(youtube.data_api_latency, youtube.jitter))
+        with youtube._lock:
+            youtube._stats["data_api_calls"] += 1
+        items = [
+            youtube._video_resource(video_id)
+            for video_id in self.ids
+            if youtube.fixture_for(video_id) is not None
+        ]
+        return {"etag": f"etag-{len(items)}", "items": items}
+
+
+class FakeYouTube:
+    """
+    Fixture'lara bağlı sahte video kataloğu. new_video_id() her çağrıda
+    önbelleklere takılmayan yeni bir 11 karakterlik kimlik üretir.
+    """
+
+    def __init__(
+        self,
+        fixtures: dict[str, Fixture],
+        api_latency: float = 0.4,
+        ytdlp_latency: float = 1.5,
+        data_api_latency: float = 0.15,
+        api_failure_rate: float = 0.0,
+        jitter: float = 0.25,
+        seed: int = 1,
+    ):
+        self.fixtures = fixtures
+        self.api_latency = api_latency
+        self.ytdlp_latency = ytdlp_latency
+        self.data_api_latency = data_api_latency
+        self.api_failure_rate = api_failure_rate
+        self.jitter = jitter
+        self._latency = _Latency(seed)
+        self._videos: dict[str, Fixture] = {}
+        self._counter = itertools.count()
+        self._snippet_cache: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._stats = {"api_lists": 0, "ytdlp_fetches": 0, "data_api_calls": 0}
+        self.server = FixtureServer(self)
+
+    def new_video_id(self, fixture: str) -> str:
+        video_id = f"bm{next(self._counter):09d}"
+        self._videos[video_id] = self.fixtures[fixture]
+        return video_id
+
+    def fixture_for(self, video_id: str) -> Fixture | None:
+        return self._videos.get(video_id)
+
+    def _snippets(self, fixture: Fixture) -> list:
+        snippets = self._snippet_cache.get(fixture.name)
+        if snippets is None:
+            snippets = [
+                SimpleNamespace(start=start / 1000, duration=duration / 1000, text=text)
+                for start, duration, text in fixture.segments
+            ]
+            self._snippet_cache[fixture.name] = snippets
+        return snippets
+
+    def transcript_api(self, cookie_path=None, proxy=None) -> _FakeTranscriptApi:
+        with self._lock:
+            self._stats["api_lists"] += 1
+        return _FakeTranscriptApi(self)
+
+    def fetch_subtitles(
+        self,
+        video_id: str,
+        langs: list[str],
+        proxy: str | None = None,
+        cookie_path: str | None = None,
+        normalize: bool = True,
+        max_segment_ms: int = 15000,
+    ):
+        """ytdlp_fetcher.fetch_subtitles yerine: extract_info gecikmesi + json3 indirme."""
+        from normalize import build_transcript
+        from ytdlp_fetcher import stream_json3_subtitle
+
+        with self._lock:
+            self._stats["ytdlp_fetches"] += 1
+        started = time.perf_counter()
+        time.sleep(self._latency.sample(self.ytdlp_latency, self.jitter))
+        fixture = self.fixture_for(video_id)
+        if fixture is None:
+            raise Exception("yt-dlp: videoda altyazı bulunamadı.")
+        extract_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        transcript = build_transcript(
+            stream_json3_subtitle(f"{self.server.url}/json3/{video_id}"),
+            fixture.language,
+            normalize=normalize,
+            max_segment_ms=max_segment_ms,
+        )
+        transcript.meta["timings"] = {
+            "extract_info": extract_seconds,
+            "subtitle_download": time.perf_counter() - started,
+        }
+        return transcript
+
+    def data_client(self):
+        """googleapiclient'in youtube.videos().list(...) zincirini taklit eder."""
+        youtube = self
+
+        class Videos:
+            def list(self, part: str, id: str):
+                return _FakeVideosRequest(youtube, id.split(","))
+
+        return SimpleNamespace(videos=Videos)
+
+    def _video_resource(self, video_id: str) -> dict:
+        fixture = self._videos[video_id]
+        seconds = fixture.segments[-1][0] // 1000 if fixture.segments else 0
+        return {
+            "id": video_id,
+            "snippet": {
+                "title": f"Benchmark {fixture.name} {video_id}",
+                "description": "",
+                "thumbnails": {"high": {"url": f"https://i.ytimg.com/{video_id}.jpg"}},
+                "defaultAudioLanguage": fixture.language,
+                "channelTitle": "benchmark",
+                "publishedAt": "2024-01-01T00:00:00Z",
+            },
+            "contentDetails": {
+                "duration": f"PT{seconds // 3600}H{seconds // 60 % 60}M{seconds % 60}S",
+                "caption": "true",
+            },
+            "statistics": {"viewCount": "0", "likeCount": "0"},
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+def burn_cpu(seconds: float) -> int:
+    """GIL'i bırakmadan seconds boyunca saf Python işi yapar."""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        for i in range(1000):
+            total += i * i
+    return total
+
+
+def cpu_bound_fetch(
+    server_url: str,
+    language: str,
+    cpu_seconds: float,
+    video_id: str,
+    langs: list[str],
+    proxy: str | None = None,
+    cookie_path: str | None = None,
+    normalize: bool = True,
+    max_segment_ms: int = 15000,
+):
+    """
+    fetch_subtitles yerine: extract_info'yu cpu_seconds süren, GIL'i tutan
+    bir döngüyle taklit eder, json3'ü FixtureServer'dan indirir. Alt süreçte
+    de çalıştığından FakeYouTube'a değil, yalnızca argümanlarına dayanır.
+    """
+    from normalize import build_transcript
+    from ytdlp_fetcher import stream_json3_subtitle
+
+    started = time.perf_counter()
+    burn_cpu(cpu_seconds)
+    extract_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    transcript = build_transcript(
+        stream_json3_subtitle(f"{server_url}/json3/{video_id}"),
+        language,
+        normalize=normalize,
+        max_segment_ms=max_segment_ms,
+    )
+    transcript.meta["timings"] = {
+        "extract_info": extract_seconds,
+        "subtitle_download": time.perf_counter() - started,
+    }
+    return transcript
+
+
+def install(main, gemini: FakeGemini, youtube: FakeYouTube) -> None:
+    """
+    Sahteleri main modülüne bağlar (youtube.server önceden başlatılmış
+    olmalı). yt-dlp yolu YTDLP_PROCESSES=0 ile main.fetch_subtitles
+    üzerinden çağrıldığından o isim değiştirilir. IP başına istek sınırı yük
+    testinde tek istemci IP'si kullanıldığı için kaldırılır.
+    """
+    main.genai = SimpleNamespace(GenerativeModel=gemini.GenerativeModel)
+    main.http_clients.get_transcript_api = youtube.transcript_api
+    main.fetch_subtitles = youtube.fetch_subtitles
+    main.video_details.client_factory = youtube.data_client
+    main.RATE_LIMIT_MAX = 10**9
@@ -0,0 +1,178 @@
+"""
+Benchmark fixture'ları: kayıtlı altyazılar ve sentetik uzun transcript'ler.
+
+- Depodaki subtitle_test.tr-orig.srt ve --fixture ile verilen .srt/.json3
+  dosyaları segmentlere çevrilir.
+- synthetic_segments() saatlerce süren, YouTube otomatik altyazılarındaki
+  gibi kayan (rolling) iki satırlı olaylar üretir; kelimeler SRT'den
+  alındığı için metin dağılımı gerçeğe yakındır. Aynı seed aynı çıktıyı verir.
+- to_json3() segmentleri YouTube'un json3 biçimine (kelime başına seg ve
+  satır sonu olaylarıyla) çevirir; sahte yt-dlp bu baytları localhost'tan
+  sunar.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+Segment = tuple[int, int, str]
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUNDLED_SRT = REPO_ROOT / "subtitle_test.tr-orig.srt"
+
+_SRT_TIME = re.compile(
+    r"(\d+):(\d{2}):(\d{2})[,.](\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{3})"
+)
+_FALLBACK_WORDS = (
+    "bugün video hakkında konuşacağız model veri sonuç yöntem örnek "
+    "önemli fiyat piyasa araba elektrikli sistem performans test"
+).split()
+
+
+def _ms(h: str, m: str, s: str, ms: str) -> int:
+    return ((int(h) * 60 + int(m)) * 60 + int(s)) * 1000 + int(ms)
+
+
+def parse_srt(text: str) -> list[Segment]:
+    """SRT metnini (start_ms, duration_ms, text) segmentlerine çevirir."""
+    segments: list[Segment] = []
+    for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n")):
+        lines = block.strip().splitlines()
+        for i, line in enumerate(lines):
+            match = _SRT_TIME.search(line)
+            if match:
+                start = _ms(*match.groups()[:4])
+                end = _ms(*match.groups()[4:])
+                body = " ".join(lines[i + 1 :]).strip()
+                if body:
+                    segments.append((start, max(end - start, 0), body))
+                break
+    return segments
+
+
+def parse_json3(payload: bytes) -> list[Segment]:
+    """json3 yanıtını segmentlere çevirir (yalnızca fixture yüklerken)."""
+    segments: list[Segment] = []
+    for event in json.loads(payload).get("events", []):
+        text = "".join(seg.get("utf8", "") for seg in event.get("segs", [])).strip()
+        if text:
+            segments.append(
+                (event.get("tStartMs", 0), event.get("dDurationMs", 0), text)
+            )
+    return segments
+
+
+def load_segments(path: Path) -> list[Segment]:
+    if path.suffix.lower() == ".srt":
+        return parse_srt(path.read_text(encoding="utf-8"))
+    return parse_json3(path.read_bytes())
+
+
+def synthetic_segments(
+    hours: float,
+    seed: int = 0,
+    words: list[str] | None = None,
+    step_ms: int = 2500,
+    words_per_line: int = 7,
+) -> list[Segment]:
+    """
+    hours saatlik kayan altyazı: her olay önceki satırı tekrar edip yeni bir
+    satır ekler (normalizasyonun temizlediği tekrar burada bilerek vardır).
+    """
+    rng = random.Random(seed)
+    words = words or _FALLBACK_WORDS
+    segments: list[Segment] = []
+    previous = ""
+    for start in range(0, int(hours * 3600 * 1000), step_ms):
+        line = " ".join(rng.choice(words) for _ in range(words_per_line))
+        if rng.random() < 0.3:
+            line += "."
+        text = f"{previous}\n{line}" if previous else line
+        segments.append((start, step_ms * 2, text))
+        previous = line
+    return segments
+
+
+def to_json3(segments: list[Segment]) -> bytes:
+    """Segmentleri kelime başına seg içeren json3 yanıtına çevirir."""
+    events: list[dict] = [
+        {"tStartMs": 0, "dDurationMs": segments[-1][0] if segments else 0, "id": 1}
+    ]
+    for start, duration, text in segments:
+        words = text.split(" ")
+        events.append(
+            {
+                "tStartMs": start,
+                "dDurationMs": duration,
+                "wWinId": 1,
+                "segs": [{"utf8": words[0]}]
+                + [
+                    {"utf8": " " + word, "tOffsetMs": 120 * i, "acAsrConf": 0}
+                    for i, word in enumerate(words[1:], 1)
+                ],
+            }
+        )
+        # YouTube otomatik altyazılarında satırlar arasına boş olaylar girer
+        events.append(
+            {
+                "tStartMs": start + duration // 2,
+                "dDurationMs": 10,
+                "wWinId": 1,
+                "aAppend": 1,
+                "segs": [{"utf8": "\n"}],
+            }
+        )
+    payload = {
+        "wireMagic": "pb3",
+        "pens": [{}],
+        "wsWinStyles": [{}],
+        "wpWinPositions": [{}],
+        "events": events,
+    }
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+@dataclass
+class Fixture:
+    name: str
+    segments: list[Segment]
+    language: str = "tr"
+    _json3: bytes | None = field(default=None, repr=False)
+
+    @property
+    def json3(self) -> bytes:
+        if self._json3 is None:
+            self._json3 = to_json3(self.segments)
+        return self._json3
+
+    def describe(self) -> dict:
+        return {
+            "segments": len(self.segments),
+            "duration_seconds": (
+                round(self.segments[-1][0] / 1000) if self.segments else 0
+            ),
+            "text_chars": sum(len(s[2]) for s in self.segments),
+            "json3_bytes": len(self.json3),
+        }
+
+
+def load_fixtures(paths: list[Path], hours: float, seed: int = 0) -> dict[str, Fixture]:
+    """
+    Depodaki SRT, verilen dosyalar ve hours saatlik sentetik transcript.
+    "srt" ve "synthetic" adları her zaman bulunur.
+    """
+    srt = load_segments(BUNDLED_SRT)
+    fixtures = {"srt": Fixture("srt", srt)}
+    for path in paths:
+        data = path.read_bytes()
+        fixture = Fixture(path.stem, load_segments(path))
+        if path.suffix.lower() != ".srt":
+            fixture._json3 = data
+        fixtures[path.stem] = fixture
+    words = [w for _, _, text in srt for w in text.split()]
+    fixtures["synthetic"] = Fixture("synthetic", synthetic_segments(hours, seed, words))
+    return fixtures
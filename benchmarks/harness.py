@@ -0,0 +1,311 @@
+"""
+Yük üretimi ve ölçüm yardımcıları.
+
+- AsgiClient uygulamayı süreç içinde, doğrudan ASGI arayüzüyle çağırır
+  (lifespan dahil); ağ ve sunucu maliyeti ölçüme girmez.
+- HttpClient uygulamayı uvicorn ile localhost'ta başlatır ve istekleri
+  requests ile thread havuzundan gönderir.
+- İki istemci de yanıt gövdesini parça parça, varış zamanlarıyla döndürür;
+  akış (SSE) yanıtlarında ilk bayt ve ilk olay süreleri buradan hesaplanır.
+- run_load() istekleri verilen eşzamanlılıkla gönderir; summarize()
+  p50/p95/p99, throughput ve hata dağılımını çıkarır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+from urllib.parse import urlencode
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict[str, str]
+    started: float
+    chunks: list[tuple[float, bytes]] = field(default_factory=list)
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(chunk for _, chunk in self.chunks)
+
+    def json(self):
+        return json.loads(self.body)
+
+    @property
+    def ttfb(self) -> float | None:
+        return self.chunks[0][0] - self.started if self.chunks else None
+
+    def time_to(self, marker: bytes) -> float | None:
+        """marker'ı içeren ilk parçanın varış süresi (ör. b"event: bullets")."""
+        for arrived, chunk in self.chunks:
+            if marker in chunk:
+                return arrived - self.started
+        return None
+
+
+class AsgiClient:
+    """Uygulamayı ağ katmanı olmadan çağıran en küçük ASGI istemcisi."""
+
+    transport = "asgi"
+
+    def __init__(self, app):
+        self.app = app
+        self._lifespan: asyncio.Task | None = None
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+
+    async def _lifespan_event(self, kind: str) -> None:
+        await self._to_app.put({"type": f"lifespan.{kind}"})
+        message = await self._from_app.get()
+        if message["type"] != f"lifespan.{kind}.complete":
+            raise RuntimeError(f"lifespan {kind} başarısız: {message}")
+
+    async def start(self) -> None:
+        self._lifespan = asyncio.create_task(
+            self.app(
+                {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}},
+                self._to_app.get,
+                self._from_app.put,
+            )
+        )
+        await self._lifespan_event("startup")
+
+    async def stop(self) -> None:
+        await self._lifespan_event("shutdown")
+        await self._lifespan
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json_body=None,
+    ) -> Response:
+        body = json.dumps(json_body).encode() if json_body is not None else b""
+        headers = [(b"host", b"bench")]
+        if json_body is not None:
+            headers.append((b"content-type", b"application/json"))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": urlencode(params or {}).encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+            "state": {},
+        }
+        response = Response(0, {}, time.perf_counter())
+        finished = asyncio.Event()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Starlette akış yanıtlarında bağlantı kopmasını dinler;
+            # yanıt bitene kadar beklemeli
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response.status = message["status"]
+                response.headers = {
+                    k.decode("latin-1"): v.decode("latin-1")
+                    for k, v in message.get("headers", [])
+                }
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                if chunk:
+                    response.chunks.append((time.perf_counter(), chunk))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            finished.set()
+        return response
+
+
+class HttpClient:
+    """Uygulamayı uvicorn ile localhost'ta çalıştırıp HTTP üzerinden çağırır."""
+
+    transport = "http"
+
+    def __init__(self, app, concurrency: int):
+        import requests
+        import uvicorn
+
+        self._requests = requests
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread: threading.Thread | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency * 2, thread_name_prefix="bench-client"
+        )
+        self._local = threading.local()
+
+    async def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._server.run, name="uvicorn", daemon=True
+        )
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("uvicorn başlatılamadı")
+            await asyncio.sleep(0.05)
+
+    async def stop(self) -> None:
+        self._server.should_exit = True
+        await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+        self._executor.shutdown(wait=False)
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        return session
+
+    def _request(self, method, path, params, json_body) -> Response:
+        started = time.perf_counter()
+        with self._session().request(
+            method,
+            self.base_url + path,
+            params=params,
+            json=json_body,
+            stream=True,
+            timeout=600,
+        ) as resp:
+            response = Response(
+                resp.status_code,
+                {k.lower(): v for k, v in resp.headers.items()},
+                started,
+            )
+            for chunk in resp.iter_content(chunk_size=None):
+                if chunk:
+                    response.chunks.append((time.perf_counter(), chunk))
+        return response
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json_body=None,
+    ) -> Response:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._request, method, path, params, json_body
+        )
+
+
+@dataclass
+class Sample:
+    ok: bool
+    status: int
+    latency: float
+    # Ek süreler (ttfb, first_bullet, detail_ready, ...) saniye cinsinden
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+async def run_load(
+    send: Callable[[int], Awaitable[Sample]],
+    requests: int,
+    concurrency: int,
+) -> tuple[list[Sample], float]:
+    """send(i) çağrılarını concurrency eşzamanlılıkla yapar; (örnekler, süre)."""
+    samples: list[Sample] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                samples.append(await send(i))
+            except Exception as e:
+                samples.append(Sample(False, 0, time.perf_counter() - started))
+                print(f"  istek hatası: {type(e).__name__}: {e}", file=sys.stderr)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    return samples, time.perf_counter() - started
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """Milisaniye cinsinden p50/p95/p99, ortalama ve uç değerler."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        # En yakın sıra yöntemi; küçük örneklerde interpolasyon yanıltıcı olur
+        index = min(max(int(round(q * len(ordered) + 0.5)) - 1, 0), len(ordered) - 1)
+        return ordered[index]
+
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+def summarize(samples: list[Sample], wall: float) -> dict:
+    statuses: dict[str, int] = {}
+    for sample in samples:
+        statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+    ok = [s for s in samples if s.ok]
+    result = {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "statuses": statuses,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(samples) / wall, 3) if wall > 0 else None,
+        "latency": percentiles([s.latency for s in ok]),
+    }
+    names = sorted({name for s in ok for name in s.timings})
+    for name in names:
+        result[name] = percentiles([s.timings[name] for s in ok if name in s.timings])
+    return result
+
+
+def memory_snapshot() -> dict:
+    """Sürecin anlık ve tepe RSS değerleri (MB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    peak_mb = peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+    current_mb = None
+    try:
+        with open("/proc/self/statm") as f:
+            current_mb = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        pass
+    return {
+        "rss_mb": round(current_mb, 1) if current_mb is not None else None,
+        "peak_rss_mb": round(peak_mb, 1),
+    }
@@ -0,0 +1,298 @@
+"""
+Çevrimdışı benchmark çalıştırıcısı.
+
+Uygulamayı sahte Gemini ve YouTube ile süreç içinde (ASGI) veya localhost
+üzerinden (uvicorn) çalıştırır, bileşen ölçümlerini yapar ve sonuçları
+commit'ler arasında karşılaştırılabilecek bir JSON dosyasına yazar:
+
+    python benchmarks/run.py                       # tümü, ASGI
+    python benchmarks/run.py --transport http      # localhost üzerinden
+    python benchmarks/run.py --quick --skip-app    # hızlı bileşen ölçümü
+    python benchmarks/compare.py eski.json yeni.json
+
+Uygulama ayarları (SUMMARY_PIPELINE, DETAILED_MODE, EXTRACTIVE_RATIO, ...)
+her zamanki gibi ortam değişkenleriyle verilir; kullanılan değerler
+sonucun app_settings alanına yazılır.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(REPO_ROOT / "frontend"))
+
+from components import COMPONENTS, ComponentContext, run_components
+from fakes import FakeGemini, FakeYouTube, install
+from fixtures import load_fixtures
+from harness import AsgiClient, HttpClient, memory_snapshot
+from scenarios import SCENARIOS, BenchContext
+
+# main import edilmeden önce ayarlanır; ortamda verilen değerler korunur.
+# Gemini kotası varsayılan olarak ölçümü sınırlamayacak kadar yüksektir;
+# kota davranışını ölçmek için GEMINI_RPM=15 gibi bir değer verilebilir.
+APP_ENV_DEFAULTS = {
+    "GOOGLE_API_KEY": "benchmark",
+    "YOUTUBE_API_KEY": "benchmark",
+    "YTDLP_PROCESSES": "0",
+    "GEMINI_RPM": "100000",
+    "GEMINI_MAX_QUEUE": "1000",
+    "GEMINI_BACKOFF_BASE": "0.2",
+    "GEMINI_BACKOFF_MAX": "2",
+    "LOG_LEVEL": "WARNING",
+}
+
+# Sonuçla birlikte kaydedilen uygulama ayarları (main modülündeki adlar)
+APP_SETTINGS = (
+    "SUMMARY_PIPELINE",
+    "DETAILED_MODE",
+    "EXTRACTIVE_RATIO",
+    "EXTRACTIVE_MIN_TOKENS",
+    "CHUNKING_THRESHOLD_TOKENS",
+    "CHUNK_MAX_TOKENS",
+    "CHUNK_CONCURRENCY",
+    "CAPTION_NORMALIZE",
+    "TRANSCRIPT_HEDGE_DELAY",
+    "BLOCKING_IO_WORKERS",
+    "PROMPT_VERSION",
+)
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta(args: argparse.Namespace) -> dict:
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {
+            k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()
+        },
+    }
+
+
+async def _run_app(ctx: BenchContext, names: list[str]) -> tuple[dict, dict | None]:
+    await ctx.client.start()
+    results = {}
+    try:
+        for name in names:
+            print(f"[senaryo] {name}", flush=True)
+            started = time.perf_counter()
+            results[name] = await SCENARIOS[name](ctx)
+            results[name]["scenario_seconds"] = round(time.perf_counter() - started, 3)
+        stats = await ctx.client.request("GET", "/stats")
+    finally:
+        await ctx.client.stop()
+    return results, stats.json() if stats.status == 200 else None
+
+
+def run_app(args, gemini: FakeGemini, youtube: FakeYouTube) -> dict:
+    """Uygulama senaryoları; scenarios, app_stats ve app_settings döner."""
+    workdir = args.workdir
+    for key, value in {
+        **APP_ENV_DEFAULTS,
+        "SUMMARY_CACHE_DIR": str(workdir / "cache"),
+        "TRACE_LOG_PATH": str(workdir / "spans.jsonl"),
+    }.items():
+        os.environ.setdefault(key, value)
+    try:
+        import main
+    except ImportError as e:
+        return {"scenarios": {"skipped": f"uygulama yüklenemedi: {e}"}}
+
+    install(main, gemini, youtube)
+    if args.transport == "http":
+        client = HttpClient(main.app, args.concurrency)
+    else:
+        client = AsgiClient(main.app)
+    ctx = BenchContext(
+        main=main,
+        client=client,
+        gemini=gemini,
+        youtube=youtube,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        health_requests=args.health_requests,
+        long_requests=args.long_requests,
+        metrics_requests=args.metrics_requests,
+        rate_limit_rate=args.rate_limit_rate,
+        frontend_poll_interval=args.frontend_poll_interval,
+        ytdlp_cpu_seconds=args.ytdlp_cpu,
+    )
+    scenarios, stats = asyncio.run(_run_app(ctx, args.scenarios or list(SCENARIOS)))
+    return {
+        "scenarios": scenarios,
+        "app_stats": stats,
+        "app_settings": {name: getattr(main, name) for name in APP_SETTINGS},
+        "fakes": {"gemini": gemini.stats(), "youtube": youtube.stats()},
+    }
+
+
+def _print_summary(results: dict) -> None:
+    def rows(prefix: str, node):
+        if not isinstance(node, dict):
+            return
+        latency = node.get("latency")
+        if isinstance(latency, dict) and latency:
+            yield prefix, latency, node.get("throughput_rps")
+        for key, value in node.items():
+            if key != "latency":
+                yield from rows(f"{prefix}.{key}" if prefix else key, value)
+
+    for path, latency, rps in rows("", results.get("scenarios", {})):
+        print(
+            f"  {path:<40} p50 {latency['p50_ms']:>9.1f}ms  p95 {latency['p95_ms']:>9.1f}ms"
+            f"  p99 {latency['p99_ms']:>9.1f}ms  {rps or 0:>8.1f} req/s"
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS))
+    parser.add_argument("--components", nargs="+", choices=list(COMPONENTS))
+    parser.add_argument("--skip-app", action="store_true")
+    parser.add_argument("--skip-components", action="store_true")
+    parser.add_argument(
+        "--quick", action="store_true", help="Az istekle hızlı duman testi"
+    )
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--health-requests", type=int, default=2000)
+    parser.add_argument("--long-requests", type=int, default=4)
+    parser.add_argument("--metrics-requests", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--operations", type=int, default=20_000)
+    parser.add_argument(
+        "--hours", type=float, default=3.0, help="Sentetik transcript süresi"
+    )
+    parser.add_argument(
+        "--fixture",
+        type=Path,
+        action="append",
+        default=[],
+        help="Ek kayıtlı altyazı (.srt veya .json3), birden fazla verilebilir",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gemini-latency", type=float, default=0.8)
+    parser.add_argument("--gemini-token-latency", type=float, default=0.002)
+    parser.add_argument("--gemini-output-tokens", type=int, default=600)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.2)
+    parser.add_argument("--youtube-latency", type=float, default=0.4)
+    parser.add_argument("--ytdlp-latency", type=float, default=1.5)
+    parser.add_argument(
+        "--ytdlp-cpu",
+        type=float,
+        default=0.3,
+        help="ytdlp_gil'de sahte extract_info'nun GIL'i tuttuğu süre (saniye)",
+    )
+    parser.add_argument(
+        "--frontend-poll-interval",
+        type=float,
+        default=5.0,
+        help="frontend_consumer'daki eski durum sorgusu aralığı (saniye)",
+    )
+    parser.add_argument("--workdir", type=Path)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.requests = min(args.requests, 8)
+        args.concurrency = min(args.concurrency, 4)
+        args.health_requests = min(args.health_requests, 200)
+        args.long_requests = 1
+        args.metrics_requests = min(args.metrics_requests, 20)
+        args.repeat = min(args.repeat, 2)
+        args.operations = min(args.operations, 2000)
+        args.hours = min(args.hours, 1.0)
+    return args
+
+
+def main(argv: list[str] | None = None) -> Path:
+    args = parse_args(argv)
+    # Verilmezse önbellekler ve kuyruk geçici bir dizinde tutulup silinir
+    temporary = args.workdir is None
+    args.workdir = args.workdir or Path(tempfile.mkdtemp(prefix="ytsum-bench-"))
+    args.workdir.mkdir(parents=True, exist_ok=True)
+
+    fixtures = load_fixtures(args.fixture, args.hours, args.seed)
+    gemini = FakeGemini(
+        first_token_latency=args.gemini_latency,
+        token_latency=args.gemini_token_latency,
+        output_tokens=args.gemini_output_tokens,
+        seed=args.seed,
+    )
+    youtube = FakeYouTube(
+        fixtures,
+        api_latency=args.youtube_latency,
+        ytdlp_latency=args.ytdlp_latency,
+        seed=args.seed + 1,
+    )
+    youtube.server.start()
+
+    results: dict = {
+        "meta": _meta(args),
+        "fixtures": {name: f.describe() for name, f in fixtures.items()},
+    }
+    try:
+        if not args.skip_components:
+            results["components"] = run_components(
+                ComponentContext(
+                    fixtures,
+                    youtube,
+                    args.workdir,
+                    repeat=args.repeat,
+                    operations=args.operations,
+                ),
+                args.components,
+            )
+        if not args.skip_app:
+            results.update(run_app(args, gemini, youtube))
+    finally:
+        youtube.server.stop()
+        if temporary:
+            shutil.rmtree(args.workdir, ignore_errors=True)
+    results["memory"] = memory_snapshot()
+
+    commit = (results["meta"]["commit"] or "nocommit")[:10]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    output = args.output or BENCH_DIR / "results" / f"{stamp}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(results, ensure_ascii=False, indent=2, default=str),
+        encoding="utf-8",
+    )
+    _print_summary(results)
+    print(f"Sonuçlar: {output}")
+    return output
+
+
+if __name__ == "__main__":
+    main()
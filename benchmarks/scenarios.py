@@ -0,0 +1,574 @@
+"""
+Uygulama senaryoları.
+
+Her senaryo sahte Gemini/YouTube'a bağlanmış uygulamaya istemci (ASGI veya
+HTTP) üzerinden yük verir; gecikme dağılımını, throughput'u, Server-Timing
+başlığındaki aşama sürelerini, bellek ölçümünü ve sahte istemcilerin
+sayaç farklarını (Gemini çağrısı, gönderilen prompt boyutu, 429 sayısı)
+döndürür.
+
+Senaryolar SCENARIOS sırasıyla çalışır. transcript_fallback ve ytdlp_gil
+youtube_transcript_api devresini açtığından en sondadır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable
+
+from fakes import FakeGemini, FakeYouTube, cpu_bound_fetch
+from harness import Response, Sample, memory_snapshot, run_load, summarize
+
+
+@dataclass
+class BenchContext:
+    main: object
+    client: object
+    gemini: FakeGemini
+    youtube: FakeYouTube
+    requests: int
+    concurrency: int
+    health_requests: int = 2000
+    long_requests: int = 4
+    metrics_requests: int = 200
+    rate_limit_rate: float = 0.2
+    poll_interval: float = 0.05
+    # user-008 öncesi frontend'in durum sorgusu aralığı (app.py'de 5 sn)
+    frontend_poll_interval: float = 5.0
+    # ytdlp_gil'deki sahte extract_info'nun GIL'i tuttuğu süre (saniye)
+    ytdlp_cpu_seconds: float = 0.3
+    detail_timeout: float = 300.0
+    # Senaryolar arası paylaşılan değerler (ör. önbelleği ısıtılmış video'lar)
+    shared: dict = field(default_factory=dict)
+
+
+SCENARIOS: dict[str, Callable[[BenchContext], Awaitable[dict]]] = {}
+
+
+def scenario(name: str):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+
+    return register
+
+
+def _watch_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def _server_timings(response: Response) -> dict[str, float]:
+    """Server-Timing başlığındaki aşama sürelerini (saniye) döndürür."""
+    timings = {}
+    for item in response.headers.get("server-timing", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if name and params.startswith("dur="):
+            timings[f"server.{name}"] = float(params[4:]) / 1000
+    return timings
+
+
+def _delta(after: dict, before: dict) -> dict:
+    result = {}
+    for key, value in after.items():
+        if isinstance(value, dict):
+            result[key] = _delta(value, before.get(key, {}))
+        elif isinstance(value, (int, float)):
+            result[key] = value - before.get(key, 0)
+    return result
+
+
+async def _measure(ctx: BenchContext, load: Awaitable) -> dict:
+    """load (örnekler, süre) döndürür; sonuca sayaç farkları ve bellek eklenir."""
+    gemini_before = ctx.gemini.stats()
+    youtube_before = ctx.youtube.stats()
+    scheduler_before = ctx.main.gemini_scheduler.stats()
+    samples, wall = await load
+    result = summarize(samples, wall)
+    result["gemini"] = _delta(ctx.gemini.stats(), gemini_before)
+    result["youtube"] = _delta(ctx.youtube.stats(), youtube_before)
+    result["gemini_scheduler"] = {
+        key: value
+        for key, value in _delta(
+            ctx.main.gemini_scheduler.stats(), scheduler_before
+        ).items()
+        if key in ("rate_limited", "retries_exhausted", "rejected")
+    }
+    result["memory"] = memory_snapshot()
+    return result
+
+
+async def _get(ctx: BenchContext, path: str, params: dict | None = None) -> Sample:
+    started = time.perf_counter()
+    response = await ctx.client.request("GET", path, params=params)
+    return Sample(
+        response.status == 200, response.status, time.perf_counter() - started
+    )
+
+
+async def _wait_detail(ctx: BenchContext, task_id: str, started: float):
+    """Detaylı özet tamamlanınca isteğin başından geçen süre; hata ise None."""
+    deadline = started + ctx.detail_timeout
+    while time.perf_counter() < deadline:
+        response = await ctx.client.request("GET", f"/summary-status/{task_id}")
+        status = response.json().get("status") if response.status == 200 else None
+        if status == "completed":
+            return time.perf_counter() - started
+        if status == "error":
+            return None
+        await asyncio.sleep(ctx.poll_interval)
+    return None
+
+
+async def _summarize(
+    ctx: BenchContext, video_id: str, wait_detail: bool = False
+) -> tuple[Sample, dict]:
+    started = time.perf_counter()
+    response = await ctx.client.request(
+        "POST", "/summarize", json_body={"url": _watch_url(video_id)}
+    )
+    sample = Sample(
+        response.status == 200, response.status, time.perf_counter() - started
+    )
+    if not sample.ok:
+        return sample, {}
+    data = response.json()
+    sample.timings.update(_server_timings(response))
+    if wait_detail and not data.get("cached"):
+        ready = await _wait_detail(ctx, data["task_id"], started)
+        if ready is None:
+            sample.ok = False
+        else:
+            sample.timings["detail_ready"] = ready
+    return sample, data
+
+
+def _summarize_load(
+    ctx: BenchContext,
+    fixture: str,
+    requests: int,
+    concurrency: int,
+    wait_detail: bool,
+    video_ids: list[str] | None = None,
+):
+    async def send(i: int) -> Sample:
+        video_id = ctx.youtube.new_video_id(fixture)
+        if video_ids is not None:
+            video_ids.append(video_id)
+        sample, _ = await _summarize(ctx, video_id, wait_detail)
+        return sample
+
+    return run_load(send, requests, concurrency)
+
+
+@scenario("health")
+async def health(ctx: BenchContext) -> dict:
+    """Boştaki uygulamada /health; istek başına framework maliyeti."""
+    return await _measure(
+        ctx,
+        run_load(lambda i: _get(ctx, "/health"), ctx.health_requests, ctx.concurrency),
+    )
+
+
+@scenario("video_details")
+async def video_details(ctx: BenchContext) -> dict:
+    """Aynı video'lar önce önbellek boşken, sonra önbellekten istenir."""
+    video_ids = [ctx.youtube.new_video_id("srt") for _ in range(ctx.requests)]
+
+    async def send(i: int) -> Sample:
+        started = time.perf_counter()
+        response = await ctx.client.request(
+            "POST", "/video-details", json_body={"url": _watch_url(video_ids[i])}
+        )
+        return Sample(
+            response.status == 200, response.status, time.perf_counter() - started
+        )
+
+    return {
+        "cold": await _measure(ctx, run_load(send, ctx.requests, ctx.concurrency)),
+        "warm": await _measure(ctx, run_load(send, ctx.requests, ctx.concurrency)),
+    }
+
+
+@scenario("video_details_batch")
+async def video_details_batch(ctx: BenchContext) -> dict:
+    """50'şer URL'lik toplu istekler; API çağrısı sayısı youtube altında."""
+    batches = [
+        [_watch_url(ctx.youtube.new_video_id("srt")) for _ in range(50)]
+        for _ in range(max(ctx.requests // 5, 2))
+    ]
+
+    async def send(i: int) -> Sample:
+        started = time.perf_counter()
+        response = await ctx.client.request(
+            "POST", "/video-details/batch", json_body={"urls": batches[i]}
+        )
+        return Sample(
+            response.status == 200, response.status, time.perf_counter() - started
+        )
+
+    return {
+        "batch_size": 50,
+        "cold": await _measure(ctx, run_load(send, len(batches), ctx.concurrency)),
+        "warm": await _measure(ctx, run_load(send, len(batches), ctx.concurrency)),
+    }
+
+
+@scenario("summarize_cold")
+async def summarize_cold(ctx: BenchContext) -> dict:
+    """
+    Her istek yeni bir video: transcript indirme + Gemini. latency ana
+    başlıkların gelişi, detail_ready detaylı özetin tamamlanmasıdır
+    (/summary-status poll_interval aralıkla sorgulanır).
+    """
+    video_ids: list[str] = []
+    result = await _measure(
+        ctx,
+        _summarize_load(
+            ctx, "srt", ctx.requests, ctx.concurrency, True, video_ids=video_ids
+        ),
+    )
+    ctx.shared["warm_video_ids"] = video_ids
+    return result
+
+
+@scenario("summarize_cached")
+async def summarize_cached(ctx: BenchContext) -> dict:
+    """summarize_cold'un video'ları tekrar istenir; özet önbelleğinden döner."""
+    video_ids = ctx.shared.get("warm_video_ids")
+    if not video_ids:
+        video_ids = []
+        await _summarize_load(
+            ctx, "srt", ctx.concurrency, ctx.concurrency, True, video_ids=video_ids
+        )
+    cached = 0
+
+    async def send(i: int) -> Sample:
+        nonlocal cached
+        sample, data = await _summarize(ctx, video_ids[i % len(video_ids)])
+        cached += bool(data.get("cached"))
+        return sample
+
+    result = await _measure(ctx, run_load(send, ctx.requests, ctx.concurrency))
+    result["cached_responses"] = cached
+    return result
+
+
+@scenario("summarize_coalesced")
+async def summarize_coalesced(ctx: BenchContext) -> dict:
+    """
+    Her turda concurrency kadar istek aynı yeni video için aynı anda gelir;
+    gemini.calls tur başına tek işin çalıştığını gösterir.
+    """
+    rounds = max(ctx.requests // ctx.concurrency, 1)
+    coalesced = 0
+
+    async def load():
+        nonlocal coalesced
+        samples: list[Sample] = []
+        started = time.perf_counter()
+        for _ in range(rounds):
+            video_id = ctx.youtube.new_video_id("srt")
+            results = await asyncio.gather(
+                *(_summarize(ctx, video_id) for _ in range(ctx.concurrency))
+            )
+            for sample, data in results:
+                samples.append(sample)
+                coalesced += bool(data.get("coalesced"))
+        return samples, time.perf_counter() - started
+
+    result = await _measure(ctx, load())
+    result["rounds"] = rounds
+    result["coalesced_responses"] = coalesced
+    return result
+
+
+@scenario("summarize_stream")
+async def summarize_stream(ctx: BenchContext) -> dict:
+    """SSE akışı: ilk bayt, ilk ana başlık parçası, ilk detay ve bitiş süreleri."""
+
+    async def send(i: int) -> Sample:
+        video_id = ctx.youtube.new_video_id("srt")
+        started = time.perf_counter()
+        response = await ctx.client.request(
+            "GET", "/summarize/stream", params={"url": _watch_url(video_id)}
+        )
+        sample = Sample(
+            response.status == 200 and b"event: done" in response.body,
+            response.status,
+            time.perf_counter() - started,
+        )
+        markers = {
+            "ttfb": response.ttfb,
+            "first_bullet": response.time_to(b"event: bullets\n"),
+            "bullets_done": response.time_to(b"event: bullets_done"),
+            "first_detail": response.time_to(b"event: detail"),
+        }
+        sample.timings.update(
+            {name: value for name, value in markers.items() if value is not None}
+        )
+        return sample
+
+    return await _measure(ctx, run_load(send, ctx.requests, ctx.concurrency))
+
+
+@scenario("summarize_long")
+async def summarize_long(ctx: BenchContext) -> dict:
+    """Saatlerce süren sentetik transcript: normalizasyon, çıkarım ve map-reduce."""
+    result = await _measure(
+        ctx,
+        _summarize_load(
+            ctx, "synthetic", ctx.long_requests, min(ctx.concurrency, 2), True
+        ),
+    )
+    result["fixture"] = ctx.youtube.fixtures["synthetic"].describe()
+    return result
+
+
+async def _health_during(ctx: BenchContext, background: asyncio.Task) -> dict:
+    """background sürerken /health gecikmesi."""
+
+    async def probe():
+        samples: list[Sample] = []
+        started = time.perf_counter()
+        while not background.done():
+            samples.append(await _get(ctx, "/health"))
+            await asyncio.sleep(0.01)
+        return samples, time.perf_counter() - started
+
+    return await _measure(ctx, probe())
+
+
+@scenario("health_under_load")
+async def health_under_load(ctx: BenchContext) -> dict:
+    """
+    summarize_cold yükü sürerken /health gecikmesi. Bloklayan işler event
+    loop'u tutarsa burada görünür.
+    """
+    background = asyncio.create_task(
+        _summarize_load(ctx, "srt", ctx.requests, ctx.concurrency, True)
+    )
+    health_result = await _health_during(ctx, background)
+    return {
+        "health": health_result,
+        "summarize": summarize(*background.result()),
+    }
+
+
+@scenario("summarize_rate_limited")
+async def summarize_rate_limited(ctx: BenchContext) -> dict:
+    """Gemini çağrılarının rate_limit_rate oranı 429 ile döner."""
+    ctx.gemini.rate_limit_rate = ctx.rate_limit_rate
+    try:
+        result = await _measure(
+            ctx, _summarize_load(ctx, "srt", ctx.requests, ctx.concurrency, True)
+        )
+    finally:
+        ctx.gemini.rate_limit_rate = 0.0
+    result["injected_rate_limit_rate"] = ctx.rate_limit_rate
+    return result
+
+
+@scenario("metrics_scrape")
+async def metrics_scrape(ctx: BenchContext) -> dict:
+    """Önceki senaryoların doldurduğu metriklerle /metrics."""
+    response = await ctx.client.request("GET", "/metrics")
+    result = await _measure(
+        ctx,
+        run_load(lambda i: _get(ctx, "/metrics"), ctx.metrics_requests, 4),
+    )
+    result["body_bytes"] = len(response.body)
+    return result
+
+
+def _legacy_poll_consumer(base_url: str, video_url: str, poll_interval: float):
+    """
+    Akıştan önceki app.py: POST /summarize, en fazla 60 kez /summary-status
+    ve poll_interval bekleme, sonunda /download-summary. Oturum paylaşılmaz.
+    (Sample, HTTP istek sayısı) döner; süreler script thread'inde ölçülür.
+    """
+    import requests
+
+    started = time.perf_counter()
+    calls = 1
+    response = requests.post(
+        f"{base_url}/summarize", json={"url": video_url}, timeout=60
+    )
+    sample = Sample(False, response.status_code, 0.0)
+    if response.status_code == 200:
+        sample.timings["bullets_visible"] = time.perf_counter() - started
+        task_id = response.json()["task_id"]
+        for _ in range(60):
+            calls += 1
+            status = requests.get(f"{base_url}/summary-status/{task_id}", timeout=30)
+            state = status.json().get("status") if status.status_code == 200 else None
+            if state in (None, "processing"):
+                time.sleep(poll_interval)
+                continue
+            if state == "completed":
+                sample.timings["detail_visible"] = time.perf_counter() - started
+                calls += 1
+                download = requests.get(
+                    f"{base_url}/download-summary/{task_id}", timeout=30
+                )
+                sample.ok = download.status_code == 200
+            break
+    sample.latency = time.perf_counter() - started
+    return sample, calls
+
+
+def _stream_consumer(session, base_url: str, video_url: str):
+    """Bugünkü app.py: frontend/summary_stream.py ile tek SSE bağlantısı."""
+    from summary_stream import StreamError, iter_sse_events, open_summary_stream
+
+    started = time.perf_counter()
+    sample = Sample(False, 200, 0.0)
+    try:
+        with open_summary_stream(
+            session, f"{base_url}/summarize/stream", video_url
+        ) as response:
+            for event, _ in iter_sse_events(response):
+                elapsed = time.perf_counter() - started
+                if event == "bullets_done":
+                    sample.timings["bullets_visible"] = elapsed
+                elif event == "detail":
+                    sample.timings.setdefault("first_detail_visible", elapsed)
+                elif event == "done":
+                    sample.timings["detail_visible"] = elapsed
+                    sample.ok = True
+                    break
+                elif event == "error":
+                    break
+    except StreamError:
+        sample.status = 0
+    sample.latency = time.perf_counter() - started
+    return sample, 1
+
+
+@scenario("frontend_consumer")
+async def frontend_consumer(ctx: BenchContext) -> dict:
+    """
+    Streamlit script thread'inin kullanıcı başına tutulma süresi (latency),
+    eski durum sorgulama döngüsü ile bugünkü SSE tüketicisi için. Her
+    kullanıcı ayrı bir thread'dir; detail_visible detaylı özetin ekrana
+    geldiği an, polling'de sonraki sorguya kadar gecikir. Gerçek HTTP
+    gerektiğinden yalnızca --transport http ile çalışır.
+    """
+    base_url = getattr(ctx.client, "base_url", None)
+    if base_url is None:
+        return {"skipped": "yalnızca --transport http ile çalışır"}
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    # frontend/app.py'deki get_http_session ile aynı havuz
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=50))
+    threads = ThreadPoolExecutor(
+        max_workers=ctx.concurrency, thread_name_prefix="bench-frontend"
+    )
+    loop = asyncio.get_running_loop()
+
+    async def measure(consumer) -> dict:
+        calls: list[int] = []
+
+        async def send(i: int) -> Sample:
+            video_url = _watch_url(ctx.youtube.new_video_id("srt"))
+            sample, count = await loop.run_in_executor(threads, consumer, video_url)
+            calls.append(count)
+            return sample
+
+        result = await _measure(ctx, run_load(send, ctx.requests, ctx.concurrency))
+        result["http_requests_per_user"] = (
+            round(sum(calls) / len(calls), 2) if calls else None
+        )
+        return result
+
+    try:
+        return {
+            "poll_interval": ctx.frontend_poll_interval,
+            "polling": await measure(
+                lambda url: _legacy_poll_consumer(
+                    base_url, url, ctx.frontend_poll_interval
+                )
+            ),
+            "stream": await measure(
+                lambda url: _stream_consumer(session, base_url, url)
+            ),
+        }
+    finally:
+        threads.shutdown(wait=False)
+        session.close()
+
+
+@scenario("transcript_fallback")
+async def transcript_fallback(ctx: BenchContext) -> dict:
+    """
+    youtube_transcript_api her istekte engellenir; transcript yt-dlp yolundan
+    (json3 localhost'tan akış halinde) gelir. Devre açıldıktan sonra ilk
+    yöntem hiç denenmez.
+    """
+    ctx.youtube.api_failure_rate = 1.0
+    try:
+        return await _measure(
+            ctx, _summarize_load(ctx, "srt", ctx.requests, ctx.concurrency, False)
+        )
+    finally:
+        ctx.youtube.api_failure_rate = 0.0
+
+
+@scenario("ytdlp_gil")
+async def ytdlp_gil(ctx: BenchContext) -> dict:
+    """
+    youtube_transcript_api engellenir; yt-dlp yolu GIL'i ytdlp_cpu_seconds
+    boyunca tutan sahte çıkarıcıyla (fakes.cpu_bound_fetch) çalışır. /health
+    gecikmesi, çıkarıcı API sürecindeki thread havuzunda (YTDLP_PROCESSES=0)
+    ve süreç havuzunda çalışırken yan yana ölçülür.
+    """
+    from ytdlp_fetcher import YtdlpProcessPool
+
+    main = ctx.main
+    extract = partial(
+        cpu_bound_fetch,
+        ctx.youtube.server.url,
+        ctx.youtube.fixtures["srt"].language,
+        ctx.ytdlp_cpu_seconds,
+    )
+    workers = max(1, min(ctx.concurrency, (os.cpu_count() or 2) - 1))
+    pool = YtdlpProcessPool(max_workers=workers, timeout=60, target=extract)
+    saved = (main.YTDLP_PROCESSES, main.fetch_subtitles, main.ytdlp_pool)
+
+    async def run(processes: int) -> dict:
+        main.YTDLP_PROCESSES = processes
+        # Isınma turu: süreçler spawn edilip modüller yüklensin
+        await _summarize_load(ctx, "srt", workers, workers, False)
+        background = asyncio.create_task(
+            _summarize_load(ctx, "srt", ctx.requests, ctx.concurrency, False)
+        )
+        health_result = await _health_during(ctx, background)
+        return {
+            "health": health_result,
+            "summarize": summarize(*background.result()),
+        }
+
+    ctx.youtube.api_failure_rate = 1.0
+    main.fetch_subtitles = extract
+    main.ytdlp_pool = pool
+    try:
+        threads = await run(0)
+        pool.start()
+        processes = await run(workers)
+        return {
+            "cpu_seconds_per_extract": ctx.ytdlp_cpu_seconds,
+            "processes": workers,
+            "in_process_threads": threads,
+            "process_pool": {**processes, "pool": pool.stats()},
+        }
+    finally:
+        ctx.youtube.api_failure_rate = 0.0
+        main.YTDLP_PROCESSES, main.fetch_subtitles, main.ytdlp_pool = saved
+        pool.shutdown()
@@ -1,11 +1,13 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import re
 from datetime import datetime
 import isodate
 import os
 
+from summary_stream import StreamError, iter_sse_events, open_summary_stream
 
 # Sayfa yapılandırması
 st.set_page_config(
@@ -250,6 +252,35 @@ def get_backend_base_url() -> str:
     return value.rstrip("/")
 
 
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Tüm kullanıcılar için ortak, keep-alive bağlantı havuzlu HTTP oturumu."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def format_bullet_points(bullet_text):
+    """Ana başlıkları numaralı HTML listesine dönüştürür"""
+    # • veya - ile başlayan maddeleri ayır ve liste haline getir
+    bullets = re.split(r"(?=•)|(?=-\s)", bullet_text)
+    bullets = [
+        b.strip().lstrip("•-").strip()
+        for b in bullets
+        if b.strip() and len(b.strip()) > 2
+    ]
+    if not bullets:
+        return None
+
+    bullet_html = '<div class="bullet-points-container"><ul>'
+    for i, bullet in enumerate(bullets, 1):
+        bullet_html += f'<li><span class="bullet-number">#{i}</span><span class="bullet-text">{bullet}</span></li>'
+    bullet_html += "</ul></div>"
+    return bullet_html
+
+
 def format_detailed_summary(summary_text):
     """Detaylı özeti güzel HTML formatına dönüştürür"""
     html_output = '<div class="detailed-summary-container">'
@@ -356,16 +387,17 @@ Video linkini yapıştırın ve özeti alın!
 
 # API endpoint'leri
 BACKEND_BASE_URL = get_backend_base_url()
-API_URL = f"{BACKEND_BASE_URL}/summarize"
+STREAM_URL = f"{BACKEND_BASE_URL}/summarize/stream"
 VIDEO_DETAILS_URL = f"{BACKEND_BASE_URL}/video-details"
-STATUS_URL = f"{BACKEND_BASE_URL}/summary-status"
-DOWNLOAD_URL = f"{BACKEND_BASE_URL}/download-summary"
+
+# Detaylı özet akarken ekran en fazla bu sıklıkla yeniden çizilir (saniye)
+RENDER_INTERVAL = 0.5
 
 
 @st.cache_data(show_spinner=False)
 def fetch_video_details(url: str):
     """Video detaylarını cache'ler — rerun'larda tekrar istek atmaz."""
-    response = requests.post(VIDEO_DETAILS_URL, json={"url": url}, timeout=60)
+    response = get_http_session().post(VIDEO_DETAILS_URL, json={"url": url}, timeout=60)
     if response.status_code == 200:
         return response.json()
     return None
@@ -374,7 +406,7 @@ def fetch_video_details(url: str):
 @st.cache_data(show_spinner=False)
 def fetch_thumbnail_bytes(thumbnail_url: str) -> bytes:
     """Thumbnail'i cache'ler — rerun'larda tekrar indirilmez."""
-    return requests.get(thumbnail_url, timeout=30).content
+    return get_http_session().get(thumbnail_url, timeout=30).content
 
 
 video_url = st.text_input(
@@ -458,105 +490,81 @@ if video_url:
 
         # Özetleme butonu
         if st.button("Video'yu Özetle"):
-            with st.spinner("Video özetleniyor..."):
-                # API'ye istek gönderme
-                response = requests.post(API_URL, json={"url": video_url}, timeout=60)
-
-                if response.status_code == 200:
-                    result = response.json()
-                    task_id = result["task_id"]
-
-                    # Ana başlıkları hemen göster
+            # Özet SSE ile parça parça gelir; ayrı durum sorgusu ve indirme
+            # isteği gerekmez, script thread'i akış bitince serbest kalır.
+            try:
+                with open_summary_stream(
+                    get_http_session(), STREAM_URL, video_url
+                ) as response:
                     st.subheader("📋 Ana Başlıklar")
+                    bullets_placeholder = st.empty()
+                    bullets_placeholder.info("Ana başlıklar hazırlanıyor...")
 
-                    # Bullet points'ı düzgün formata çevir
-                    bullet_text = result["bullet_points"]
-                    # • veya - ile başlayan maddeleri ayır ve liste haline getir
-                    bullets = re.split(r"(?=•)|(?=-\s)", bullet_text)
-                    bullets = [
-                        b.strip().lstrip("•-").strip()
-                        for b in bullets
-                        if b.strip() and len(b.strip()) > 2
-                    ]
-
-                    # HTML liste olarak göster
-                    if bullets:
-                        bullet_html = '<div class="bullet-points-container"><ul>'
-                        for i, bullet in enumerate(bullets, 1):
-                            bullet_html += f'<li><span class="bullet-number">#{i}</span><span class="bullet-text">{bullet}</span></li>'
-                        bullet_html += "</ul></div>"
-                        st.markdown(bullet_html, unsafe_allow_html=True)
-                    else:
-                        st.markdown(bullet_text)
-
-                    # Detaylı özet için ayrı bir bölüm
                     st.subheader("📝 Detaylı Özet")
                     status_placeholder = st.empty()
                     detailed_summary_placeholder = st.empty()
 
-                    # Durumu kontrol et
-                    max_retries = 60  # 5 dakika (5 saniye aralıklarla)
-                    for _ in range(max_retries):
-                        status_response = requests.get(
-                            f"{STATUS_URL}/{task_id}", timeout=30
-                        )
-
-                        if status_response.status_code != 200:
-                            status_placeholder.info(
-                                "Detaylı özet hazırlanıyor... (durum alınamadı, tekrar deneniyor)"
-                            )
-                            time.sleep(5)
-                            continue
-
-                        status_data = status_response.json()
-
-                        if status_data.get("status") == "processing":
+                    task_id = None
+                    bullet_text = ""
+                    detail_text = ""
+                    last_render = 0.0
+                    finished = False
+
+                    for event, data in iter_sse_events(response):
+                        if event == "meta":
+                            task_id = data["task_id"]
+                        elif event == "bullets":
+                            bullet_text += data["text"]
+                            bullets_placeholder.markdown(bullet_text)
+                        elif event == "bullets_done":
+                            bullet_text = data["text"]
+                            bullet_html = format_bullet_points(bullet_text)
+                            if bullet_html:
+                                bullets_placeholder.markdown(
+                                    bullet_html, unsafe_allow_html=True
+                                )
+                            else:
+                                bullets_placeholder.markdown(bullet_text)
                             status_placeholder.info("Detaylı özet hazırlanıyor...")
-                            time.sleep(5)
-                            continue
-
-                        if status_data.get("status") == "error":
+                        elif event == "detail":
+                            detail_text += data["text"]
+                            # Her parçada değil, belirli aralıklarla yeniden çiz
+                            if time.monotonic() - last_render >= RENDER_INTERVAL:
+                                last_render = time.monotonic()
+                                detailed_summary_placeholder.markdown(
+                                    format_detailed_summary(detail_text),
+                                    unsafe_allow_html=True,
+                                )
+                        elif event == "error":
                             status_placeholder.error(
-                                status_data.get("result", "Detaylı özet oluşturulamadı")
+                                data.get("detail", "Detaylı özet oluşturulamadı")
                             )
                             break
+                        elif event == "done":
+                            finished = True
+                            break
+            except StreamError as e:
+                st.error(f"Hata oluştu: {e}")
+                st.stop()
+
+            if finished:
+                status_placeholder.success("Detaylı özet hazır")
+                detailed_summary_placeholder.markdown(
+                    format_detailed_summary(detail_text), unsafe_allow_html=True
+                )
 
-                        # completed
-                        status_placeholder.success("Detaylı özet hazır")
-                        formatted_summary = format_detailed_summary(
-                            status_data.get("result", "")
-                        )
-                        detailed_summary_placeholder.markdown(
-                            formatted_summary, unsafe_allow_html=True
-                        )
-
-                        # İndirme butonu ekle
-                        try:
-                            download_response = requests.get(
-                                f"{DOWNLOAD_URL}/{task_id}", timeout=30
-                            )
-                            if download_response.status_code == 200:
-                                st.download_button(
-                                    label="📥 Özeti İndir",
-                                    data=download_response.content,
-                                    file_name=f"video_summary_{task_id}.txt",
-                                    mime="text/plain",
-                                    key=f"download_{task_id}",
-                                )
-                            else:
-                                st.warning(
-                                    "Özet indirilemedi. Lütfen daha sonra tekrar deneyin."
-                                )
-                        except Exception as e:
-                            st.error(f"İndirme hatası: {str(e)}")
-
-                        break
-
-                else:
-                    error_message = response.json().get(
-                        "detail", "Bilinmeyen bir hata oluştu"
-                    )
-                    st.error(f"Hata oluştu: {error_message}")
+                # İndirme verisi zaten alınmış metinden hazırlanır
+                st.download_button(
+                    label="📥 Özeti İndir",
+                    data=detail_text.encode("utf-8"),
+                    file_name=f"video_summary_{task_id}.txt",
+                    mime="text/plain",
+                    key=f"download_{task_id}",
+                )
+            elif detail_text or bullet_text:
+                status_placeholder.warning(
+                    "Bağlantı özet tamamlanmadan kapandı. Lütfen tekrar deneyin."
+                )
 
     except requests.exceptions.Timeout:
         st.error(
@@ -0,0 +1,51 @@
+"""
+Backend'in /summarize/stream uç noktasını okuyan istemci.
+
+Streamlit'e bağlı değildir: app.py olayları ekrana çizer, benchmark
+(benchmarks/scenarios.py, frontend_consumer) aynı kodu kullanıcı başına
+script thread'inin ne kadar tutulduğunu ölçmek için çalıştırır.
+"""
+
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+
+
+class StreamError(Exception):
+    """Akış 200 dışında bir durumla açıldı; mesaj backend'in detail alanıdır."""
+
+
+@contextmanager
+def open_summary_stream(session, stream_url: str, video_url: str, timeout=(10, 300)):
+    """
+    Özet akışını açar ve yanıtı döndürür. Blok bitince bağlantı havuza döner.
+    Backend hata dönerse StreamError yükseltilir.
+    """
+    with session.get(
+        stream_url, params={"url": video_url}, stream=True, timeout=timeout
+    ) as response:
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("detail", "Bilinmeyen bir hata oluştu")
+            except ValueError:
+                detail = "Bilinmeyen bir hata oluştu"
+            raise StreamError(detail)
+        yield response
+
+
+def iter_sse_events(response):
+    """Server-Sent Events akışını (olay, veri) çiftleri olarak okur."""
+    response.encoding = response.encoding or "utf-8"
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:") :].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:") :].strip())
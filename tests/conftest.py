@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Backend modülleri düz bir klasörde durur ve birbirini doğrudan import eder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,181 @@
+"""
+Testler için süreç içi, küçük bir RESP2 sunucusu.
+
+RedisStateBackend'in kullandığı komutları (GET/SET EX, sorted set
+komutları, EXPIRE, MULTI/EXEC, AUTH/SELECT) bellekte uygular. Saat
+advance() ile ileri alınabilir; drop_connections() ve fail_next boşta
+kapanan ve komut ortasında kopan bağlantıları taklit eder.
+"""
+
+from __future__ import annotations
+
+import socket
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server.owner
+        with server.lock:
+            server.connections.append(self.request)
+            server.connects += 1
+        queued = None
+        while True:
+            try:
+                args = self._read_command()
+            except (OSError, ValueError):
+                return
+            if args is None:
+                return
+            with server.lock:
+                server.received.append(args)
+                if server.fail_next:
+                    # Komut alındı ama yanıt gelmeden bağlantı koptu
+                    server.fail_next = False
+                    self.request.close()
+                    return
+            name = args[0].upper()
+            if name == "MULTI":
+                queued = []
+                reply = "+OK"
+            elif name == "EXEC":
+                reply = [server.apply(cmd) for cmd in queued or []]
+                queued = None
+            elif queued is not None:
+                queued.append(args)
+                reply = "+QUEUED"
+            else:
+                reply = server.apply(args)
+            try:
+                self.wfile.write(_encode(reply))
+            except OSError:
+                return
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2].decode("utf-8"))
+        return args
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, str) and reply[:1] in "+-":
+        return reply.encode("utf-8") + b"\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(_encode(r) for r in reply)
+    data = reply.encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class RespServer:
+    def __init__(self, password: str | None = None):
+        self.password = password
+        self.data: dict[str, object] = {}
+        self.expires: dict[str, float] = {}
+        self.offset = 0.0
+        self.lock = threading.RLock()
+        self.connections: list[socket.socket] = []
+        self.received: list[list[str]] = []
+        self.connects = 0
+        self.fail_next = False
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/1"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.drop_connections()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def advance(self, seconds: float) -> None:
+        self.offset += seconds
+
+    def drop_connections(self) -> None:
+        """Sunucunun boştaki bağlantıları kapatması (timeout, yeniden başlatma)."""
+        with self.lock:
+            for conn in self.connections:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                conn.close()
+            self.connections.clear()
+
+    def ttl(self, key: str) -> float | None:
+        with self.lock:
+            expires = self.expires.get(key)
+            return None if expires is None else expires - self._now()
+
+    def _now(self) -> float:
+        return time.time() + self.offset
+
+    def _live(self, key: str):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= self._now():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def apply(self, args: list[str]):
+        with self.lock:
+            name, rest = args[0].upper(), args[1:]
+            if name == "AUTH":
+                return "+OK" if rest[0] == self.password else "-WRONGPASS"
+            if name in ("SELECT", "PING"):
+                return "+OK"
+            if name == "GET":
+                return self._live(rest[0])
+            if name == "SET":
+                self.data[rest[0]] = rest[1]
+                self.expires.pop(rest[0], None)
+                if len(rest) == 4 and rest[2].upper() == "EX":
+                    self.expires[rest[0]] = self._now() + int(rest[3])
+                return "+OK"
+            if name == "EXPIRE":
+                if self._live(rest[0]) is None:
+                    return 0
+                self.expires[rest[0]] = self._now() + int(rest[1])
+                return 1
+            zset = self._live(rest[0])
+            if zset is None:
+                zset = {}
+            if name == "ZADD":
+                added = int(rest[2] not in zset)
+                zset[rest[2]] = float(rest[1])
+                self.data[rest[0]] = zset
+                return added
+            if name == "ZREMRANGEBYSCORE":
+                low = float(rest[1].replace("inf", "Infinity"))
+                high = float(rest[2])
+                gone = [m for m, score in zset.items() if low <= score <= high]
+                for member in gone:
+                    del zset[member]
+                return len(gone)
+            if name == "ZCARD":
+                return len(zset)
+            if name == "ZREM":
+                return int(zset.pop(rest[1], None) is not None)
+            return f"-ERR bilinmeyen komut {name}"
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from chunking import keep_valid_timestamps, map_reduce_transcript, split_transcript
+from transcript_store import Transcript
+
+
+def _transcript(count: int, step_ms: int = 10_000) -> Transcript:
+    return Transcript.from_segments(
+        (i * step_ms, step_ms, f"satır {i} " + "kelime " * 20) for i in range(count)
+    )
+
+
+def test_split_respects_token_and_time_limits():
+    transcript = _transcript(30)
+    lines = list(transcript.lines())
+
+    by_tokens = split_transcript(transcript, max_tokens=100)
+    assert [line for chunk in by_tokens for line in chunk] == lines
+    assert all(len(chunk) >= 1 for chunk in by_tokens) and len(by_tokens) > 1
+
+    by_time = split_transcript(transcript, max_tokens=10**6, max_seconds=60)
+    assert [len(chunk) for chunk in by_time] == [6] * 5
+
+
+def test_keep_valid_timestamps_drops_invented_lines():
+    chunk = ["[00:00-00:10] merhaba", "[00:10-00:20] dünya"]
+    notes = "[00:00-00:10] doğru\n[09:00-09:10] uydurma\nbaşlıksız satır"
+
+    assert keep_valid_timestamps(notes, chunk) == "[00:00-00:10] doğru\nbaşlıksız satır"
+
+
+def test_map_reduce_keeps_video_order():
+    transcript = _transcript(12)
+    chunks = split_transcript(transcript, max_tokens=100)
+
+    async def generate(prompt: str) -> str:
+        part = int(prompt.split("PART ")[1].split(" ")[0])
+        # Sonraki parçalar önce biter
+        await asyncio.sleep(0.01 * (len(chunks) - part))
+        return f"not {part}"
+
+    notes, count = asyncio.run(map_reduce_transcript(transcript, generate, 100, 4))
+    assert count == len(chunks)
+    assert notes.split("\n\n") == [f"not {i + 1}" for i in range(len(chunks))]
+
+
+def test_map_reduce_empty_transcript():
+    async def generate(prompt: str) -> str:
+        raise AssertionError("çağrılmamalı")
+
+    empty = Transcript.from_segments([])
+    assert asyncio.run(map_reduce_transcript(empty, generate, 100, 4)) == ("", 0)
+
+
+def test_failed_chunk_cancels_siblings():
+    transcript = _transcript(12)
+    started, cancelled = [], []
+
+    async def generate(prompt: str) -> str:
+        index = len(started)
+        started.append(index)
+        if index == 0:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("kota")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return "not"
+
+    with pytest.raises(RuntimeError, match="kota"):
+        asyncio.run(map_reduce_transcript(transcript, generate, 100, 3))
+    # Başlamış kardeşlerin hepsi iptal edildi, kalan parçalar hiç başlamadı
+    assert cancelled == started[1:]
+    assert len(started) < len(split_transcript(transcript, 100))
@@ -0,0 +1,67 @@
+import pytest
+
+from combined import BULLETS, DETAIL, CombinedOutputSplitter
+from prompts import SUMMARY_DELIMITER
+
+OUTPUT = f"- Birinci madde\n- İkinci madde\n{SUMMARY_DELIMITER}\n## Detay\nMetin."
+
+
+def _split(chunks: list[str]) -> tuple[str, str, bool]:
+    """Parçaları besler; (ana başlıklar, detay, detay var mı) döndürür."""
+    splitter = CombinedOutputSplitter()
+    parts = []
+    for chunk in chunks:
+        parts.extend(splitter.feed(chunk))
+    parts.extend(splitter.flush())
+    assert all(text for _, text in parts)
+    # Detay başladıktan sonra ana başlık gelmez
+    kinds = [kind for kind, _ in parts]
+    assert kinds == sorted(kinds, key=[BULLETS, DETAIL].index)
+    bullets = "".join(text for kind, text in parts if kind == BULLETS)
+    detail = "".join(text for kind, text in parts if kind == DETAIL)
+    return bullets, detail, splitter.has_detail
+
+
+def test_single_chunk():
+    assert _split([OUTPUT]) == (
+        "- Birinci madde\n- İkinci madde\n",
+        "## Detay\nMetin.",
+        True,
+    )
+
+
+@pytest.mark.parametrize("cut", range(1, len(OUTPUT)))
+def test_delimiter_split_across_chunks(cut):
+    """Ayırıcı hangi noktadan bölünürse bölünsün sonuç aynıdır."""
+    assert _split([OUTPUT[:cut], OUTPUT[cut:]]) == _split([OUTPUT])
+
+
+def test_character_by_character():
+    assert _split(list(OUTPUT)) == _split([OUTPUT])
+
+
+def test_missing_delimiter_is_all_bullets():
+    text = "- Madde\n===DETAY== eksik ayırıcı\n"
+    assert _split([text[:12], text[12:]]) == (text, "", False)
+
+
+def test_short_output_without_delimiter():
+    assert _split(["- a"]) == ("- a", "", False)
+    assert _split([]) == ("", "", False)
+
+
+def test_delimiter_at_start_and_empty_detail():
+    assert _split([SUMMARY_DELIMITER, "\n  detay"]) == ("", "detay", True)
+    # Ayırıcıdan sonra yalnızca boşluk gelirse detay yok sayılır
+    assert _split(["- a\n", SUMMARY_DELIMITER, "\n\n"]) == ("- a\n", "", False)
+
+
+def test_held_back_prefix_is_released():
+    """Ayırıcı öneki gibi görünen metin, ayırıcı çıkmazsa ana başlıklara döner."""
+    splitter = CombinedOutputSplitter()
+    # Yalnızca ayırıcının başı olabilecek sonek bekletilir
+    assert splitter.feed("- a ===DET") == [(BULLETS, "- a ")]
+    assert splitter.feed("") == []
+    assert splitter.feed("ay yok =") == [(BULLETS, "===DETay yok ")]
+    assert splitter.flush() == [(BULLETS, "=")]
+    assert not splitter.has_detail
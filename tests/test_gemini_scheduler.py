@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+
+from gemini_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    GeminiScheduler,
+    QueueFullError,
+    RetriesExhaustedError,
+    is_rate_limit_error,
+    retry_after_hint,
+)
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Yapacak iş kalmayınca saati bir sonraki zamanlayıcıya atlatan loop."""
+
+    def __init__(self):
+        super().__init__()
+        self._now = 0.0
+
+    def time(self) -> float:
+        return self._now
+
+    def _run_once(self):
+        if not self._ready and self._scheduled:
+            self._now = max(self._now, self._scheduled[0].when())
+        super()._run_once()
+
+
+def run_virtual(test):
+    """test(loop) coroutine'ini sanal saatli loop'ta çalıştırır."""
+    loop = VirtualTimeLoop()
+    try:
+        return loop.run_until_complete(test(loop))
+    finally:
+        loop.close()
+
+
+class ResourceExhausted(Exception):
+    """google.api_core'daki 429 hatasıyla aynı adı taşır."""
+
+
+class FakeClient:
+    """Sıradaki yanıtları (metin veya hata) döndüren sahte Gemini istemcisi."""
+
+    def __init__(self, loop, script=()):
+        self.loop = loop
+        self.script = list(script)
+        self.calls: list[tuple[str, float]] = []
+
+    async def generate(self, name: str) -> str:
+        self.calls.append((name, self.loop.time()))
+        if self.script:
+            outcome = self.script.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+        return f"yanıt {name}"
+
+
+def _scheduler(loop, **kwargs) -> GeminiScheduler:
+    return GeminiScheduler(clock=loop.time, **kwargs)
+
+
+async def _stop(scheduler: GeminiScheduler) -> None:
+    scheduler._dispatcher.cancel()
+    await asyncio.gather(scheduler._dispatcher, return_exceptions=True)
+
+
+def test_request_bucket_spaces_calls():
+    async def test(loop):
+        scheduler = _scheduler(loop, requests_per_minute=2)
+        client = FakeClient(loop)
+        await asyncio.gather(
+            *(scheduler.run(lambda i=i: client.generate(i), 1) for i in range(4))
+        )
+        await _stop(scheduler)
+        return [at for _, at in client.calls]
+
+    # Kapasite 2: ikisi hemen, sonra dakikada 2 (30 sn'de bir)
+    assert run_virtual(test) == pytest.approx([0, 0, 30, 60])
+
+
+def test_token_bucket_waits_for_budget():
+    async def test(loop):
+        scheduler = _scheduler(loop, tokens_per_minute=1000)
+        client = FakeClient(loop)
+        await scheduler.run(lambda: client.generate("a"), 600)
+        await scheduler.run(lambda: client.generate("b"), 600)
+        await _stop(scheduler)
+        return [at for _, at in client.calls]
+
+    # 400 token kaldı; 200 token için 1000/60 token/sn ile 12 sn
+    assert run_virtual(test) == pytest.approx([0, 12])
+
+
+def test_interactive_jumps_ahead_of_background():
+    async def test(loop):
+        scheduler = _scheduler(loop, requests_per_minute=1)
+        client = FakeClient(loop)
+        first = asyncio.ensure_future(scheduler.run(lambda: client.generate("ilk"), 1))
+        await asyncio.sleep(0)
+        background = asyncio.ensure_future(
+            scheduler.run(lambda: client.generate("arka"), 1, PRIORITY_BACKGROUND)
+        )
+        await asyncio.sleep(1)
+        interactive = asyncio.ensure_future(
+            scheduler.run(lambda: client.generate("ön"), 1, PRIORITY_INTERACTIVE)
+        )
+        await asyncio.gather(first, background, interactive)
+        await _stop(scheduler)
+        return [name for name, _ in client.calls]
+
+    assert run_virtual(test) == ["ilk", "ön", "arka"]
+
+
+def test_rate_limit_pauses_whole_queue_and_retries():
+    async def test(loop):
+        scheduler = _scheduler(loop, requests_per_minute=600)
+        client = FakeClient(loop, [ResourceExhausted("429 retry in 10s")])
+        first = asyncio.ensure_future(scheduler.run(lambda: client.generate("a"), 1))
+        await asyncio.sleep(1)  # a 429 aldı, kuyruk duraklatıldı
+        second = await scheduler.run(lambda: client.generate("b"), 1)
+        results = [await first, second]
+        stats = scheduler.stats()
+        await _stop(scheduler)
+        return results, client.calls, stats
+
+    results, calls, stats = run_virtual(test)
+    assert results == ["yanıt a", "yanıt b"]
+    assert calls[0] == ("a", 0)
+    # 429'dan sonra kuyruktaki hiçbir çağrı ipucundaki süre dolmadan yapılmaz
+    assert len(calls) == 3 and all(10 <= at <= 11 for _, at in calls[1:])
+    assert stats["rate_limited"] == 1 and stats["dispatched"] == 3
+
+
+def test_retries_exhausted():
+    async def test(loop):
+        scheduler = _scheduler(loop, max_retries=2, backoff_base=1, backoff_max=2)
+        client = FakeClient(loop, [ResourceExhausted("kota")] * 2)
+        with pytest.raises(RetriesExhaustedError):
+            await scheduler.run(lambda: client.generate("a"), 1)
+        stats = scheduler.stats()
+        await _stop(scheduler)
+        return stats
+
+    assert run_virtual(test)["retries_exhausted"] == 1
+
+
+def test_other_errors_are_not_retried():
+    async def test(loop):
+        scheduler = _scheduler(loop)
+        client = FakeClient(loop, [ValueError("geçersiz prompt")])
+        with pytest.raises(ValueError):
+            await scheduler.run(lambda: client.generate("a"), 1)
+        await _stop(scheduler)
+        return client.calls
+
+    assert len(run_virtual(test)) == 1
+
+
+def test_admission_rejects_when_queue_full():
+    async def test(loop):
+        scheduler = _scheduler(loop, requests_per_minute=1, max_queue=1)
+        client = FakeClient(loop)
+        await scheduler.run(lambda: client.generate("a"), 1)  # bucket boşaldı
+        waiting = asyncio.ensure_future(scheduler.run(lambda: client.generate("b"), 1))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError) as error:
+            await scheduler.run(lambda: client.generate("c"), 1)
+        # Arka plan işleri kabul kontrolüne takılmaz
+        background = asyncio.ensure_future(
+            scheduler.run(lambda: client.generate("d"), 1, PRIORITY_BACKGROUND)
+        )
+        await asyncio.gather(waiting, background)
+        await _stop(scheduler)
+        return error.value.retry_after
+
+    assert run_virtual(test) > 0
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (ResourceExhausted("quota"), True),
+        (type("E", (Exception,), {"code": 429})("x"), True),
+        (type("E", (Exception,), {"status_code": 429})("x"), True),
+        (Exception("429 Too Many Requests"), True),
+        (Exception("Rate limit exceeded"), True),
+        (Exception("RESOURCE_EXHAUSTED"), True),
+        (Exception("generation rate is high"), False),
+        (Exception("invalid temperature"), False),
+        (Exception("operation 4290 failed"), False),
+        (type("E", (Exception,), {"code": 500})("server"), False),
+    ],
+)
+def test_is_rate_limit_error(error, expected):
+    assert is_rate_limit_error(error) is expected
+
+
+def test_retry_after_hint():
+    assert retry_after_hint(Exception("Please retry in 7.5s")) == 7.5
+    assert retry_after_hint(Exception("retry_delay { seconds: 30 }")) == 30
+    assert retry_after_hint(type("E", (Exception,), {"retry_after": 3})()) == 3
+    assert retry_after_hint(Exception("kota")) is None
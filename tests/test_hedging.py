@@ -0,0 +1,51 @@
+import asyncio
+
+from hedging import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, hedged_race
+
+
+def _half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+    return breaker
+
+
+async def _fast():
+    return "api"
+
+
+async def _slow():
+    await asyncio.sleep(0.2)
+    return "ytdlp"
+
+
+def test_unstarted_method_keeps_half_open_probe():
+    """İlk yöntem hedge süresinden önce kazanırsa ikincinin yoklama hakkı boşa gitmez."""
+    breakers = {"api": CircuitBreaker(), "ytdlp": _half_open_breaker()}
+    methods = [("api", _fast), ("ytdlp", _slow)]
+
+    result = asyncio.run(hedged_race(methods, breakers, hedge_delay=1.0))
+
+    assert result == ("api", "api")
+    assert breakers["ytdlp"].allow()
+    assert breakers["ytdlp"].state == HALF_OPEN
+
+
+def test_half_open_method_is_probed_on_next_race():
+    breakers = {"api": CircuitBreaker(), "ytdlp": _half_open_breaker()}
+    asyncio.run(hedged_race([("api", _fast), ("ytdlp", _slow)], breakers, 1.0))
+
+    result = asyncio.run(hedged_race([("ytdlp", _fast)], breakers, 1.0))
+
+    assert result == ("api", "ytdlp")
+    assert breakers["ytdlp"].state == CLOSED
+
+
+def test_all_open_breakers_still_try_methods():
+    breakers = {"api": _half_open_breaker(), "ytdlp": _half_open_breaker()}
+    for breaker in breakers.values():
+        breaker.reset_timeout = 60.0
+
+    result = asyncio.run(hedged_race([("api", _fast)], breakers, 1.0))
+
+    assert result == ("api", "api")
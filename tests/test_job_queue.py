@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+import job_queue
+from job_queue import DONE, FAILED, QUEUED, RUNNING, JobLease, JobQueue, JobWorker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Kira sürelerini beklemeden test etmek için elle ilerletilen saat."""
+    now = [1000.0]
+    monkeypatch.setattr(job_queue.time, "time", lambda: now[0])
+    return now
+
+
+def _queue(tmp_path, **kwargs) -> JobQueue:
+    return JobQueue(tmp_path / "jobs.sqlite3", visibility_timeout=60, **kwargs)
+
+
+def test_idempotent_key_returns_existing_job(tmp_path):
+    queue = _queue(tmp_path)
+    job_id, created = queue.enqueue("detail", {"n": 1}, key="video:a")
+    assert created
+
+    # Bekleyen, çalışan ve biten iş için aynı kimlik döner
+    assert queue.enqueue("detail", {"n": 2}, key="video:a") == (job_id, False)
+    queue.claim("w1")
+    assert queue.enqueue("detail", {"n": 2}, key="video:a") == (job_id, False)
+    queue.complete(job_id, "w1")
+    assert queue.enqueue("detail", {"n": 2}, key="video:a") == (job_id, False)
+    assert queue.enqueue("detail", {}, key="video:b")[1]
+
+
+def test_failed_key_is_replaced_by_new_job(tmp_path):
+    queue = _queue(tmp_path, max_attempts=1)
+    job_id, _ = queue.enqueue("detail", {}, key="video:a")
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "hata")
+    assert queue.status(job_id) == (FAILED, "hata")
+
+    new_id, created = queue.enqueue("detail", {}, key="video:a")
+    assert created and new_id != job_id
+    assert queue.status(job_id) is None
+
+
+def test_expired_lease_is_reclaimed(tmp_path, clock):
+    queue = _queue(tmp_path)
+    job_id, _ = queue.enqueue("detail", {"n": 1})
+    assert queue.claim("w1").attempts == 1
+    assert queue.claim("w2") is None
+
+    # Kirayı uzatan worker işini korur
+    clock[0] += 50
+    assert queue.heartbeat(job_id, "w1")
+    clock[0] += 50
+    assert queue.claim("w2") is None
+
+    # w1 çöktü: kira dolunca iş w2'ye geçer, w1 artık kirayı uzatamaz
+    clock[0] += 61
+    job = queue.claim("w2")
+    assert (job.job_id, job.payload, job.attempts) == (job_id, {"n": 1}, 2)
+    assert not queue.heartbeat(job_id, "w1")
+    queue.complete(job_id, "w1")
+    assert queue.status(job_id) == (RUNNING, None)
+    queue.complete(job_id, "w2")
+    assert queue.status(job_id) == (DONE, None)
+
+
+def test_expired_lease_without_attempts_left_is_reaped(tmp_path, clock):
+    queue = _queue(tmp_path, max_attempts=1)
+    job_id, _ = queue.enqueue("detail", {})
+    queue.claim("w1")
+    clock[0] += 61
+    assert queue.claim("w2") is None
+    assert [job.job_id for job in queue.reap_expired()] == [job_id]
+    assert queue.status(job_id) == (FAILED, "kira süresi doldu")
+
+
+def test_fail_requeues_until_attempts_run_out(tmp_path):
+    queue = _queue(tmp_path, max_attempts=2)
+    job_id, _ = queue.enqueue("detail", {})
+    queue.claim("w1")
+    assert not queue.fail(job_id, "w1", "ilk")
+    assert queue.status(job_id) == (QUEUED, "ilk")
+    queue.claim("w2")
+    assert queue.fail(job_id, "w2", "ikinci")
+    assert queue.status(job_id) == (FAILED, "ikinci")
+
+
+def test_worker_drain_releases_unfinished_jobs(tmp_path):
+    queue = _queue(tmp_path)
+    fast_id, _ = queue.enqueue("fast", {})
+    slow_id, _ = queue.enqueue("slow", {})
+
+    async def fast(job):
+        await asyncio.sleep(0.01)
+
+    async def slow(job):
+        await asyncio.sleep(30)
+
+    async def test():
+        worker = JobWorker(
+            queue,
+            {"fast": fast, "slow": slow},
+            poll_interval=0.01,
+            drain_timeout=0.1,
+        )
+        task = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.05)
+        worker.stop()
+        await asyncio.wait_for(task, 5)
+        return worker.stats()
+
+    stats = asyncio.run(test())
+    assert stats["completed"] == 1 and stats["released"] == 1
+    assert queue.status(fast_id)[0] == DONE
+    # Bırakılan iş deneme sayılmadan kuyruğa döner
+    assert queue.status(slow_id)[0] == QUEUED
+    assert queue.claim("w2").attempts == 1
+
+
+def test_lease_registers_running_job(tmp_path, clock):
+    """JobLease ile kaydedilen iş kira dolmadıkça alınmaz, çökünce devralınır."""
+    queue = _queue(tmp_path)
+
+    async def test():
+        lease = JobLease(queue, "api")
+        await lease.acquire("detail", {"n": 1}, "task-1")
+        return lease
+
+    lease = asyncio.run(test())
+    assert lease.job_id == "task-1"
+    assert queue.status("task-1") == (RUNNING, None)
+    assert queue.claim("w1") is None
+
+    clock[0] += 61
+    job = queue.claim("w1")
+    assert (job.job_id, job.payload, job.attempts) == ("task-1", {"n": 1}, 2)
+
+
+@pytest.mark.parametrize(
+    "finish, expected",
+    [
+        (lambda lease: lease.complete(), DONE),
+        (lambda lease: lease.release(), QUEUED),
+        (lambda lease: lease.fail("hata"), QUEUED),
+    ],
+)
+def test_lease_finish(tmp_path, finish, expected):
+    queue = _queue(tmp_path)
+
+    async def test():
+        lease = JobLease(queue, "api")
+        await lease.acquire("detail", {}, "task-1")
+        await finish(lease)
+        return lease
+
+    lease = asyncio.run(test())
+    assert queue.status("task-1")[0] == expected
+    assert lease._heartbeat.cancelled()
+    if expected == QUEUED:
+        # Bırakılan veya hata alan iş bir worker tarafından devralınır
+        assert queue.claim("w1").job_id == "task-1"
@@ -0,0 +1,74 @@
+import pytest
+
+from normalize import NormalizationStats, build_transcript, normalize_segments
+
+# YouTube otomatik altyazısı: her satır öncekinin sonunu tekrar eder
+ROLLING = [
+    (0, 3000, "bugün size python"),
+    (1500, 3000, "size python anlatacağım."),
+    (3000, 3000, "Python anlatacağım. İlk olarak"),
+    (4500, 3000, "ilk olarak kurulum"),
+    (6000, 3000, "olarak kurulum yapacağız."),
+]
+
+
+def test_rolling_captions_are_deduplicated():
+    stats = NormalizationStats()
+    segments = list(normalize_segments(ROLLING, stats=stats))
+    assert segments == [
+        (0, 3000, "bugün size python anlatacağım."),
+        # Büyük/küçük harf (Türkçe İ dahil) ve noktalama farkı örtüşmeyi bozmaz
+        (3000, 6000, "İlk olarak kurulum yapacağız."),
+    ]
+    assert stats.input_segments == 5 and stats.output_segments == 2
+    assert 0 < stats.token_reduction < 1
+
+
+@pytest.mark.parametrize("segments", [[], [(0, 1000, "   ")]])
+def test_empty_input(segments):
+    stats = NormalizationStats()
+    assert list(normalize_segments(segments, stats=stats)) == []
+    assert stats.output_segments == 0
+    assert stats.token_reduction == (0.0 if not segments else 1.0)
+
+
+def test_single_line_is_kept():
+    assert list(normalize_segments([(500, 1000, "tek satır")])) == [
+        (500, 1000, "tek satır")
+    ]
+
+
+def test_single_word_repeat_needs_time_overlap():
+    """Ayrık zamanlardaki tek kelimelik tekrar gerçek konuşma sayılır."""
+    assert list(normalize_segments([(0, 1000, "evet"), (2000, 1000, "evet")])) == [
+        (0, 3000, "evet evet")
+    ]
+    assert list(
+        normalize_segments([(0, 3000, "evet"), (1000, 3000, "evet tamam.")])
+    ) == [(0, 4000, "evet tamam.")]
+
+
+def test_full_repeat_extends_previous_segment():
+    segments = [(0, 2000, "aynı cümle"), (1000, 3000, "aynı cümle")]
+    assert list(normalize_segments(segments)) == [(0, 4000, "aynı cümle")]
+
+
+def test_merges_until_duration_or_length_limit():
+    words = [(i * 1000, 1000, "kelime") for i in range(20)]
+    segments = list(normalize_segments(words, max_segment_ms=5000))
+    assert [s[:2] for s in segments] == [(i * 5000, 5000) for i in range(4)]
+
+    segments = list(normalize_segments(words, max_chars=21))
+    assert all(len(text) <= 20 for _, _, text in segments)
+    assert sum(len(text.split()) for _, _, text in segments) == 20
+
+
+def test_build_transcript_meta():
+    transcript = build_transcript(ROLLING, "tr")
+    assert len(transcript) == 2
+    assert transcript.meta["language"] == "tr"
+    assert transcript.meta["normalization"]["output_segments"] == 2
+
+    raw = build_transcript(ROLLING, "tr", normalize=False)
+    assert len(raw) == len(ROLLING)
+    assert raw.meta == {"language": "tr"}
@@ -0,0 +1,115 @@
+import time
+
+import pytest
+
+from resp_server import RespServer
+from state_backend import (
+    MemoryStateBackend,
+    RedisStateBackend,
+    RespClient,
+    SQLiteStateBackend,
+    create_state_backend,
+)
+from task_store import TaskStore
+
+
+@pytest.fixture
+def resp_server():
+    server = RespServer(password="gizli")
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def redis_backend(resp_server):
+    backend = RedisStateBackend(resp_server.url, ttl_seconds=60)
+    yield backend
+    backend.client._close()
+
+
+def test_redis_task_roundtrip_with_ttl(redis_backend, resp_server):
+    value = {"status": "completed", "result": "özet"}
+    redis_backend.set_task("t1", value)
+
+    assert redis_backend.get_task("t1") == value
+    assert redis_backend.get_task("yok") is None
+    assert 59 <= resp_server.ttl("ytsum:task:t1") <= 60
+    assert ["AUTH", "gizli"] in resp_server.received
+    assert ["SELECT", "1"] in resp_server.received
+
+    resp_server.advance(61)
+    assert redis_backend.get_task("t1") is None
+
+
+def test_redis_rate_limit_window(redis_backend, resp_server):
+    assert redis_backend.hit_rate_limit("ip", window=0.2, limit=2)
+    assert redis_backend.hit_rate_limit("ip", window=0.2, limit=2)
+    assert not redis_backend.hit_rate_limit("ip", window=0.2, limit=2)
+    # Reddedilen istek pencereden geri alınır
+    assert len(resp_server.data["ytsum:rate:ip"]) == 2
+    assert redis_backend.hit_rate_limit("other", window=0.2, limit=2)
+
+    time.sleep(0.25)
+    assert redis_backend.hit_rate_limit("ip", window=0.2, limit=2)
+
+
+def test_resp_client_reconnects_after_idle_close(resp_server):
+    client = RespClient(resp_server.url)
+    assert client.execute("SET", "k", "v") == "OK"
+    resp_server.drop_connections()
+    time.sleep(0.05)
+
+    assert client.execute("GET", "k") == b"v"
+    assert resp_server.connects == 2
+
+
+def test_resp_client_execute_retries_once(resp_server):
+    client = RespClient(resp_server.url)
+    client.execute("SET", "k", "v")
+    resp_server.fail_next = True
+
+    assert client.execute("GET", "k") == b"v"
+    assert resp_server.connects == 2
+
+
+def test_resp_client_pipeline_is_not_replayed(resp_server):
+    client = RespClient(resp_server.url)
+    client.execute("PING")
+    resp_server.fail_next = True
+
+    with pytest.raises((OSError, ConnectionError)):
+        client.pipeline(("MULTI",), ("ZADD", "z", 1, "a"), ("EXEC",))
+    time.sleep(0.05)
+    assert sum(1 for args in resp_server.received if args[0] == "MULTI") == 1
+    # Bağlantı kapatıldı; sonraki komut yeni bağlantıda çalışır
+    assert client.execute("PING") == "OK"
+
+
+def test_memory_rate_limit_drops_idle_keys():
+    backend = MemoryStateBackend(TaskStore())
+    for ip in ("a", "b", "c"):
+        assert backend.hit_rate_limit(ip, window=0.05, limit=1)
+    assert not backend.hit_rate_limit("a", window=0.05, limit=1)
+    time.sleep(0.06)
+
+    assert backend.hit_rate_limit("d", window=0.05, limit=1)
+    assert backend.stats()["rate_limit_keys"] == 1
+
+
+def test_sqlite_rate_limit_and_ttl(tmp_path):
+    backend = SQLiteStateBackend(tmp_path / "state.db", ttl_seconds=0.1)
+    backend.set_task("t1", {"status": "processing"})
+    assert backend.get_task("t1") == {"status": "processing"}
+    assert backend.hit_rate_limit("ip", window=60, limit=1)
+    assert not backend.hit_rate_limit("ip", window=60, limit=1)
+
+    time.sleep(0.11)
+    assert backend.get_task("t1") is None
+
+
+def test_create_state_backend_is_case_insensitive(tmp_path):
+    backend = create_state_backend(
+        "SQLite", str(tmp_path / "s.db"), TaskStore(), ttl_seconds=60
+    )
+    assert backend.name == "sqlite"
@@ -0,0 +1,90 @@
+import time
+
+from summary_cache import SummaryCache
+
+
+def _cache(tmp_path, **kwargs) -> SummaryCache:
+    return SummaryCache(tmp_path / "cache.db", **kwargs)
+
+
+def _put(cache: SummaryCache, video_id: str, transcript_hash: str = "h1") -> str:
+    cache.put(video_id, transcript_hash, "model", "v1", {"video": video_id})
+    return SummaryCache.make_key(video_id, transcript_hash, "model", "v1")
+
+
+def test_put_get_roundtrip(tmp_path):
+    cache = _cache(tmp_path)
+    key = _put(cache, "abc")
+
+    assert cache.get(key) == {"video": "abc"}
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1 and stats["misses"] == 1
+
+
+def test_disk_hit_is_promoted_to_memory(tmp_path):
+    cache = _cache(tmp_path, max_memory_entries=1)
+    first = _put(cache, "a")
+    _put(cache, "b")  # a bellekten düşer, diskte kalır
+
+    assert cache.get(first) == {"video": "a"}
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get(first) == {"video": "a"}
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_survives_reopen(tmp_path):
+    key = _put(_cache(tmp_path), "abc")
+
+    assert _cache(tmp_path).get(key) == {"video": "abc"}
+
+
+def test_disk_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, max_memory_entries=1, max_disk_entries=2)
+    a = _put(cache, "a")
+    time.sleep(0.01)
+    b = _put(cache, "b")
+    time.sleep(0.01)
+    cache.get(a)  # a'nın erişim zamanı bir sonraki kayıtta diske yazılır
+    time.sleep(0.01)
+    c = _put(cache, "c")
+
+    reopened = _cache(tmp_path)
+    assert reopened.get(a) is not None
+    assert reopened.get(b) is None
+    assert reopened.get(c) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_not_served(tmp_path):
+    cache = _cache(tmp_path, ttl_seconds=0.05)
+    key = _put(cache, "abc")
+    time.sleep(0.06)
+
+    assert cache.get(key) is None
+    assert cache.get_latest("abc", "model", "v1") is None
+
+
+def test_get_latest_follows_newest_transcript(tmp_path):
+    cache = _cache(tmp_path)
+    _put(cache, "abc", "h1")
+    cache.put("abc", "h2", "model", "v1", {"video": "abc", "rev": 2})
+
+    assert cache.get_latest("abc", "model", "v1") == {"video": "abc", "rev": 2}
+    assert cache.get_latest("abc", "model", "v2") is None
+    assert cache.get_latest("other", "model", "v1") is None
+    # Takma ad diskten de çözülür
+    assert _cache(tmp_path).get_latest("abc", "model", "v1")["rev"] == 2
+
+
+def test_alias_dropped_with_evicted_summary(tmp_path):
+    cache = _cache(tmp_path, max_memory_entries=1, max_disk_entries=1)
+    _put(cache, "a")
+    time.sleep(0.01)
+    _put(cache, "b")
+
+    reopened = _cache(tmp_path)
+    assert reopened.get_latest("a", "model", "v1") is None
+    assert reopened.get_latest("b", "model", "v1") == {"video": "b"}
+    count = reopened._db.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+    assert count == 1
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+import task_store
+from task_store import TaskStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(task_store.time, "time", lambda: now[0])
+    return now
+
+
+def _done(result: str) -> dict:
+    return {"status": "completed", "result": result}
+
+
+def _flush(store: TaskStore) -> None:
+    """Yazıcı thread'deki diske taşıma işlerinin bitmesini bekler."""
+    store._writer.submit(lambda: None).result()
+
+
+def test_evicts_oldest_finished_and_keeps_processing():
+    store = TaskStore(max_entries=2)
+    store["a"] = _done("a")
+    store["b"] = _done("b")
+    store["a"] = _done("a2")  # Güncellenen task sıranın sonuna geçer
+    store["p"] = {"status": "processing", "result": None}
+
+    assert store.get("b") is None
+    assert store["a"]["result"] == "a2"
+    assert "p" in store
+    assert store.stats()["dropped"] == 1
+
+    # İşlenmekte olan task'lar sınır aşılsa da düşürülmez
+    store["q"] = {"status": "processing", "result": None}
+    store["r"] = {"status": "processing", "result": None}
+    assert store.get("a") is None
+    assert all(task_id in store for task_id in "pqr")
+
+
+def test_max_bytes_bound():
+    store = TaskStore(max_bytes=20_000)
+    for i in range(5):
+        store[f"t{i}"] = _done("x" * 5000)
+    assert store.stats()["memory_bytes"] <= 20_000
+    assert store.get("t0") is None and "t4" in store
+
+
+def test_spill_and_reload(tmp_path):
+    store = TaskStore(max_entries=1, spill_dir=tmp_path)
+    store["a"] = _done("ğüşiöç")
+    store["b"] = _done("b")
+    # Diske yazılana kadar da okunabilir
+    assert store["a"]["result"] == "ğüşiöç"
+    _flush(store)
+
+    assert (tmp_path / "a.json").exists()
+    assert len(store) == 1
+    assert store["a"] == _done("ğüşiöç")
+    stats = store.stats()
+    assert stats["spilled"] == 1 and stats["reloaded"] == 1
+    assert stats["spilled_on_disk"] == 1
+
+
+def test_unsafe_task_id_is_not_spilled(tmp_path):
+    store = TaskStore(max_entries=1, spill_dir=tmp_path)
+    store["../kaçış"] = _done("a")
+    store["b"] = _done("b")
+    _flush(store)
+    assert list(tmp_path.iterdir()) == []
+    assert store.get("../kaçış") is None
+    assert store.stats()["dropped"] == 1
+
+
+def test_finished_and_stuck_tasks_expire(clock):
+    store = TaskStore(ttl_seconds=100, processing_ttl_seconds=30)
+    store["bitti"] = _done("x")
+    store["takıldı"] = {"status": "processing", "result": None}
+    clock[0] += 40
+    assert store.get("takıldı") is None
+    assert "bitti" in store
+    clock[0] += 70
+    assert store.get("bitti") is None
+    assert store.stats()["expired"] == 2
+
+
+def test_set_expires_old_entries_without_get(clock):
+    store = TaskStore(ttl_seconds=100, processing_ttl_seconds=30)
+    store["eski"] = _done("x")
+    store["takıldı"] = {"status": "processing", "result": None}
+    clock[0] += 150
+    store["yeni"] = _done("y")
+    assert len(store) == 1
+
+
+def test_expired_spill_file_is_ignored(tmp_path, clock):
+    store = TaskStore(max_entries=1, ttl_seconds=100, spill_dir=tmp_path)
+    store["a"] = _done("a")
+    store["b"] = _done("b")
+    _flush(store)
+    old = clock[0] - 200
+    os.utime(tmp_path / "a.json", (old, old))
+
+    assert store.get("a") is None
+    assert not (tmp_path / "a.json").exists()
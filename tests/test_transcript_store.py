@@ -0,0 +1,108 @@
+import os
+import time
+
+import pytest
+
+from transcript_store import Transcript, TranscriptStore
+
+
+def _transcript(lines: list[str], meta: dict | None = None) -> Transcript:
+    return Transcript.from_segments(
+        ((i * 2000, 1500, text) for i, text in enumerate(lines)), meta
+    )
+
+
+def test_from_segments_interns_and_normalizes():
+    transcript = Transcript.from_segments(
+        [
+            (-5, 1000, "merhaba  dünya"),
+            (1000, 1000, "  "),  # Boş satır atlanır
+            (2000, 1000, "ikinci\nsatır"),
+            (3000, 1000, "merhaba dünya"),
+        ]
+    )
+    assert list(transcript.segments()) == [
+        (0, 1000, "merhaba dünya"),
+        (2000, 1000, "ikinci satır"),
+        (3000, 1000, "merhaba dünya"),
+    ]
+    # Aynı metin blob'da tek kez tutulur
+    assert transcript.text_offset[0] == transcript.text_offset[2]
+    assert transcript.blob == "merhaba dünyaikinci satır".encode("utf-8")
+    assert transcript.render().splitlines()[1] == "[00:02-00:03] ikinci satır"
+
+
+@pytest.mark.parametrize(
+    "lines", [[], ["tek satır"], ["çok", "satırlı", "çok", "transcript 🎬"]]
+)
+def test_store_roundtrip(tmp_path, lines):
+    """Diske yazılıp mmap ile okunan transcript, yazılanla aynıdır."""
+    store = TranscriptStore(tmp_path)
+    original = _transcript(lines, {"lang": "tr"})
+    store.put("vid", original)
+
+    loaded = store.get("vid")
+    assert len(loaded) == len(lines)
+    assert list(loaded.segments()) == list(original.segments())
+    assert loaded.render() == original.render()
+    assert loaded.digest == original.digest
+    assert loaded.meta == {"lang": "tr"}
+    assert store.stats()["hits"] == 1
+
+
+def test_corrupt_or_missing_file_is_a_miss(tmp_path):
+    store = TranscriptStore(tmp_path)
+    assert store.get("yok") is None
+    (tmp_path / "bozuk.ytt").write_bytes(b"XXXX" + bytes(16))
+    assert store.get("bozuk") is None
+    assert store.stats()["misses"] == 2
+
+
+def test_evicts_least_recently_used(tmp_path):
+    store = TranscriptStore(tmp_path, max_entries=2)
+    store.put("a", _transcript(["a"]))
+    store.put("b", _transcript(["b"]))
+    store.get("a")  # a yeniden kullanıldı, en eski b
+    store.put("c", _transcript(["c"]))
+
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.ytt", "c.ytt"]
+    assert store.stats()["evictions"] == 1
+
+
+def test_max_bytes_bound(tmp_path):
+    size = len(_transcript(["x" * 100]).to_bytes())
+    store = TranscriptStore(tmp_path, max_bytes=size * 2)
+    for name in "abc":
+        store.put(name, _transcript([name * 100]))
+    assert store.stats()["entries"] == 2
+    assert store.stats()["disk_bytes"] == size * 2
+    assert store.get("a") is None
+
+
+def test_expired_file_is_removed_on_get(tmp_path):
+    store = TranscriptStore(tmp_path, ttl_seconds=60)
+    store.put("eski", _transcript(["eski"]))
+    old = time.time() - 120
+    os.utime(tmp_path / "eski.ytt", (old, old))
+
+    assert store.get("eski") is None
+    assert not (tmp_path / "eski.ytt").exists()
+    assert store.stats()["entries"] == 0
+
+
+def test_sweep_indexes_foreign_files_and_cleans_up(tmp_path):
+    """Başka süreçlerin yazdığı dosyalar eklenir; eski .tmp ve süresi dolanlar silinir."""
+    store = TranscriptStore(tmp_path, ttl_seconds=60, sweep_interval=30)
+    (tmp_path / "yeni.ytt").write_bytes(_transcript(["yeni"]).to_bytes())
+    (tmp_path / "eski.ytt").write_bytes(_transcript(["eski"]).to_bytes())
+    (tmp_path / "yarim.tmp").write_bytes(b"...")
+    old = time.time() - 120
+    os.utime(tmp_path / "eski.ytt", (old, old))
+    os.utime(tmp_path / "yarim.tmp", (old, old))
+
+    store.sweep()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["yeni.ytt"]
+    assert store.stats()["entries"] == 1
+    assert store.get("yeni").render() == "[00:00-00:01] yeni"
@@ -0,0 +1,106 @@
+import time
+
+from video_details import VideoDetailsService
+
+
+def _video(video_id: str) -> dict:
+    return {
+        "id": video_id,
+        "snippet": {
+            "title": f"Video {video_id}",
+            "description": "",
+            "thumbnails": {"high": {"url": "https://i.ytimg.com/x.jpg"}},
+            "channelTitle": "kanal",
+            "publishedAt": "2024-01-01T00:00:00Z",
+        },
+        "contentDetails": {"duration": "PT1M", "caption": "true"},
+        "statistics": {"viewCount": "1"},
+    }
+
+
+class NotModified(Exception):
+    def __init__(self):
+        super().__init__("304")
+        self.resp = type("Resp", (), {"status": 304})()
+
+
+class FakeYouTubeClient:
+    """googleapiclient'in videos().list(...).execute() zincirini taklit eder."""
+
+    def __init__(self, existing: set[str]):
+        self.existing = existing
+        self.requests: list[tuple[list[str], dict]] = []
+
+    def videos(self):
+        return self
+
+    def list(self, part: str, id: str):
+        client = self
+        ids = id.split(",")
+
+        class Request:
+            headers: dict = {}
+
+            def execute(self):
+                client.requests.append((ids, dict(self.headers)))
+                if self.headers.get("If-None-Match") == "etag-1":
+                    raise NotModified()
+                items = [_video(i) for i in ids if i in client.existing]
+                return {"etag": "etag-1", "items": items}
+
+        request = Request()
+        request.headers = {}
+        return request
+
+
+def _service(client, **kwargs) -> VideoDetailsService:
+    return VideoDetailsService(lambda: client, **kwargs)
+
+
+def test_found_video_is_cached():
+    client = FakeYouTubeClient({"a"})
+    service = _service(client)
+
+    assert service.get("a")["title"] == "Video a"
+    assert service.get("a")["title"] == "Video a"
+    assert len(client.requests) == 1
+    assert service.stats()["hits"] == 1
+
+
+def test_missing_video_is_negative_cached():
+    client = FakeYouTubeClient(set())
+    service = _service(client, negative_ttl_seconds=0.05)
+
+    assert service.get("yok") is None
+    assert service.get("yok") is None
+    assert len(client.requests) == 1
+    assert service.stats()["negative_hits"] == 1
+    assert service.stats()["quota"]["units_used"] == 1
+
+    time.sleep(0.06)
+    assert service.get("yok") is None
+    assert len(client.requests) == 2
+
+
+def test_get_many_negative_caches_missing_ids():
+    client = FakeYouTubeClient({"a", "b"})
+    service = _service(client)
+
+    first = service.get_many(["a", "b", "yok"])
+    assert first["yok"] is None and first["a"]["title"] == "Video a"
+    second = service.get_many(["a", "yok", "b"])
+    assert second == first
+    assert len(client.requests) == 1
+    assert service.get("yok") is None
+    assert len(client.requests) == 1
+
+
+def test_stale_entry_is_revalidated_with_etag():
+    client = FakeYouTubeClient({"a"})
+    service = _service(client, ttl_seconds=0.05)
+    details = service.get("a")
+    time.sleep(0.06)
+
+    assert service.get("a") == details
+    assert client.requests[-1][1] == {"If-None-Match": "etag-1"}
+    assert service.stats()["revalidated"] == 1
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import ytdlp_fetcher
+
+
+class FakeYoutubeDL:
+    def __init__(self, opts: dict):
+        self.opts = opts
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_youtube_dl_is_per_thread(monkeypatch):
+    """Her thread kendi örneğini alır; ayar değişince yalnızca kendi örneği kapanır."""
+    monkeypatch.setattr(ytdlp_fetcher.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr(ytdlp_fetcher, "_ydl_local", threading.local())
+
+    main_ydl = ytdlp_fetcher._get_youtube_dl(None, None)
+    assert ytdlp_fetcher._get_youtube_dl(None, None) is main_ydl
+
+    seen = {}
+
+    def other_thread():
+        first = ytdlp_fetcher._get_youtube_dl(None, None)
+        second = ytdlp_fetcher._get_youtube_dl("http://proxy:8080", None)
+        seen.update(first=first, second=second)
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+
+    assert seen["first"] is not main_ydl
+    assert seen["first"].closed
+    assert seen["second"].opts["proxy"] == "http://proxy:8080"
+    # Diğer thread'in ayar değişikliği bu thread'in örneğine dokunmaz
+    assert not main_ydl.closed
+    assert ytdlp_fetcher._get_youtube_dl(None, None) is main_ydl
+
+
+def _sleep_job(seconds: float, value: str) -> str:
+    """Alt süreçte çalışan sahte yt-dlp işi (spawn için modül düzeyinde)."""
+    time.sleep(seconds)
+    return value
+
+
+def _run_pool(pool: ytdlp_fetcher.YtdlpProcessPool, test):
+    async def main():
+        pool.start()
+        try:
+            return await test()
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_pool_timeout_excludes_queue_wait():
+    """Havuz kuyruğunda beklenen süre timeout'a sayılmaz."""
+    pool = ytdlp_fetcher.YtdlpProcessPool(max_workers=1, timeout=1.0, target=_sleep_job)
+
+    async def test():
+        await pool.run(0, "ısınma")
+        return await asyncio.gather(pool.run(0.7, "a"), pool.run(0.7, "b"))
+
+    assert _run_pool(pool, test) == ["a", "b"]
+    assert pool.stats()["timeouts"] == 0
+
+
+def test_pool_timeout_resubmits_sibling_jobs():
+    """Takılan işin süreci sonlandırılır; bozulan havuzdaki kardeş iş yeniden çalışır."""
+    pool = ytdlp_fetcher.YtdlpProcessPool(max_workers=2, timeout=1.0, target=_sleep_job)
+
+    async def test():
+        await asyncio.gather(pool.run(0, "ısınma"), pool.run(0, "ısınma"))
+        stuck = asyncio.ensure_future(pool.run(30, "takıldı"))
+        await asyncio.sleep(0.5)
+        # Takılan iş sonlandırıldığında hâlâ çalışıyor olacak
+        sibling = await pool.run(0.8, "kardeş")
+        with pytest.raises(TimeoutError):
+            await stuck
+        return sibling
+
+    assert _run_pool(pool, test) == "kardeş"
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["resubmitted"] == 1
+    assert stats["failed"] == 0
+    assert stats["in_flight"] == 0
+
+
+JSON3 = {
+    "wireMagic": "pb3",
+    "pens": [{}],
+    "events": [
+        # Pencere tanımı: "segs" yok
+        {"tStartMs": 0, "dDurationMs": 90000, "id": 1, "wpWinPosId": 1},
+        {"tStartMs": 100, "dDurationMs": 2000, "segs": [{"utf8": "Merhaba"}]},
+        {
+            "tStartMs": 2100,
+            "dDurationMs": 1500,
+            "segs": [{"utf8": "çalışma "}, {"utf8": "örneği 🎬", "tOffsetMs": 300}],
+        },
+        {"tStartMs": 3600, "segs": [{"utf8": "\n"}]},
+        {"tStartMs": 3700, "dDurationMs": 500, "segs": [{}]},
+        {"tStartMs": 4000, "dDurationMs": 800, "segs": [{"utf8": ' "son" '}]},
+    ],
+}
+JSON3_SEGMENTS = [
+    (100, 2000, "Merhaba"),
+    (2100, 1500, "çalışma örneği 🎬"),
+    (4000, 800, '"son"'),
+]
+
+
+def _chunks(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+def test_json3_stream_chunk_boundaries(size):
+    """Parça sınırı anahtarın, olayın veya çok baytlı karakterin ortasına düşebilir."""
+    data = json.dumps(JSON3, ensure_ascii=False, indent=1).encode("utf-8")
+    assert list(ytdlp_fetcher.iter_json3_segments(_chunks(data, size))) == (
+        JSON3_SEGMENTS
+    )
+
+
+def test_json3_without_events():
+    data = json.dumps({"wireMagic": "pb3", "pens": []}).encode()
+    assert list(ytdlp_fetcher.iter_json3_segments(_chunks(data, 5))) == []
+    assert list(ytdlp_fetcher.iter_json3_segments([b'{"events": []}'])) == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b'{"events": {"a": 1}}',
+        b'{"events": [{"tStartMs": 1, "segs": [{"utf8": "a"}]}, {"tSta',
+        b'{"events": [{"tStartMs": 1, "segs": [{"utf8": "a"}]}',
+    ],
+)
+def test_json3_malformed(data):
+    with pytest.raises(ValueError):
+        list(ytdlp_fetcher.iter_json3_segments(_chunks(data, 4)))
+
+
+def test_get_sub_url_prefers_json3():
+    formats = [{"ext": "vtt", "url": "v"}, {"ext": "json3", "url": "j"}]
+    assert ytdlp_fetcher.get_sub_url(formats) == "j"
+    assert ytdlp_fetcher.get_sub_url(formats[:1]) == "v"
+    assert ytdlp_fetcher.get_sub_url([]) is None